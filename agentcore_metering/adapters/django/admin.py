@@ -36,6 +36,7 @@ class LLMUsageAdmin(admin.ModelAdmin):
         "cost",
         "cost_currency",
         "cached_tokens",
+        "cache_hit_ratio",
         "reasoning_tokens",
         "success",
         "error",
@@ -16,6 +16,39 @@ DEFAULT_CLEANUP_ENABLED = True
 DEFAULT_CLEANUP_CRONTAB = "0 2 * * *"
 DEFAULT_AGGREGATION_CRONTAB = "5 * * * *"
 
+# Run the independent token-stats aggregate queries, and the hour/day/month
+# series aggregation, on worker threads.
+# Off by default: each thread opens its own DB connection.
+DEFAULT_PARALLEL_AGGREGATION = False
+
+# Buffer tracked LLMUsage rows in-process and write them with multi-row
+# INSERTs (COPY for large PostgreSQL batches). 0/1 writes each row
+# immediately (default).
+DEFAULT_USAGE_BUFFER_SIZE = 0
+DEFAULT_USAGE_BUFFER_MAX_AGE_SECONDS = 5.0
+
+# Persist tracked LLMUsage rows from a Celery task instead of inline.
+# Off by default; optional queue name routes the writes (None = default).
+DEFAULT_ASYNC_USAGE_WRITES = False
+DEFAULT_USAGE_WRITE_QUEUE = None
+
+# Seconds to cache resolved litellm params per (user, model_uuid).
+# 0 disables the cache (default); saves/deletes of LLMConfig clear it.
+DEFAULT_LLM_PARAMS_CACHE_TTL_SECONDS = 0
+
+# Chunks a background thread may read ahead of a streaming call's consumer.
+# 0 reads on the consumer's thread (default).
+DEFAULT_STREAM_PREFETCH = 0
+
+# Opt-in response cache for call_and_track(cache_key=...): seconds a
+# completion is reused, and the Django cache alias it is stored in.
+DEFAULT_RESPONSE_CACHE_TTL_SECONDS = 3600
+DEFAULT_RESPONSE_CACHE_ALIAS = "default"
+
+# Texts up to this many characters get a len // 4 token estimate instead of
+# the tokenizer in the usage fallback. 0 always tokenizes (default).
+DEFAULT_FAST_TOKEN_APPROX_CHARS = 0
+
 # Timezone for "yesterday" / "last month" when computing aggregation range.
 # Celery may run at 02:00 Shanghai; we aggregate Shanghai's yesterday.
 DEFAULT_AGGREGATION_TIMEZONE = "Asia/Shanghai"
@@ -96,6 +129,150 @@ def get_aggregation_timezone() -> str:
     )
 
 
+def get_parallel_aggregation() -> bool:
+    """
+    Whether token stats run summary, by_model and series queries, and the
+    aggregation task its granularities, concurrently (settings
+    AGENTCORE_METERING_PARALLEL_AGG, default False).
+    """
+    return bool(
+        getattr(
+            settings,
+            "AGENTCORE_METERING_PARALLEL_AGG",
+            DEFAULT_PARALLEL_AGGREGATION,
+        )
+    )
+
+
+def get_usage_buffer_size() -> int:
+    """
+    Number of LLMUsage rows to buffer before a bulk write (settings
+    AGENTCORE_METERING_USAGE_BUFFER_SIZE, default 0 = write immediately).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_USAGE_BUFFER_SIZE",
+        DEFAULT_USAGE_BUFFER_SIZE,
+    )
+    return val if isinstance(val, int) and val > 0 else 0
+
+
+def get_usage_buffer_max_age() -> float:
+    """
+    Seconds the oldest buffered row may wait before the buffer is flushed
+    (settings AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE, default 5).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE",
+        DEFAULT_USAGE_BUFFER_MAX_AGE_SECONDS,
+    )
+    if isinstance(val, (int, float)) and val >= 0:
+        return float(val)
+    return DEFAULT_USAGE_BUFFER_MAX_AGE_SECONDS
+
+
+def get_async_usage_writes() -> bool:
+    """
+    Whether the tracker hands usage rows to save_llm_usage_task instead of
+    writing them on the calling thread (settings
+    AGENTCORE_METERING_ASYNC_USAGE_WRITES, default False).
+    """
+    return bool(
+        getattr(
+            settings,
+            "AGENTCORE_METERING_ASYNC_USAGE_WRITES",
+            DEFAULT_ASYNC_USAGE_WRITES,
+        )
+    )
+
+
+def get_usage_write_queue():
+    """
+    Celery queue for save_llm_usage_task (settings
+    AGENTCORE_METERING_USAGE_WRITE_QUEUE, default None = default queue).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_USAGE_WRITE_QUEUE",
+        DEFAULT_USAGE_WRITE_QUEUE,
+    )
+    if isinstance(val, str) and val.strip():
+        return val.strip()
+    return None
+
+
+def get_llm_params_cache_ttl() -> float:
+    """
+    Seconds get_litellm_params may reuse a resolved config (settings
+    AGENTCORE_METERING_LLM_PARAMS_CACHE_TTL, default 0 = no cache).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_LLM_PARAMS_CACHE_TTL",
+        DEFAULT_LLM_PARAMS_CACHE_TTL_SECONDS,
+    )
+    if isinstance(val, (int, float)) and val > 0:
+        return float(val)
+    return 0.0
+
+
+def get_stream_prefetch() -> int:
+    """
+    Stream chunks read ahead on a background thread (settings
+    AGENTCORE_METERING_STREAM_PREFETCH, default 0 = no prefetch).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_STREAM_PREFETCH",
+        DEFAULT_STREAM_PREFETCH,
+    )
+    return val if isinstance(val, int) and val > 0 else 0
+
+
+def get_response_cache_ttl() -> int:
+    """
+    Seconds a cached completion is served for call_and_track(cache_key=...)
+    (settings AGENTCORE_METERING_RESPONSE_CACHE_TTL, default 3600).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_RESPONSE_CACHE_TTL",
+        DEFAULT_RESPONSE_CACHE_TTL_SECONDS,
+    )
+    if isinstance(val, int) and val > 0:
+        return val
+    return DEFAULT_RESPONSE_CACHE_TTL_SECONDS
+
+
+def get_response_cache_alias() -> str:
+    """
+    Django cache alias for cached completions (settings
+    AGENTCORE_METERING_RESPONSE_CACHE_ALIAS, default "default").
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_RESPONSE_CACHE_ALIAS",
+        DEFAULT_RESPONSE_CACHE_ALIAS,
+    )
+    if isinstance(val, str) and val.strip():
+        return val.strip()
+    return DEFAULT_RESPONSE_CACHE_ALIAS
+
+
+def get_fast_token_approx_chars() -> int:
+    """
+    Max text length estimated as len // 4 tokens instead of tokenized
+    (settings AGENTCORE_METERING_FAST_TOKEN_APPROX_CHARS, default 0 = off).
+    """
+    val = getattr(
+        settings,
+        "AGENTCORE_METERING_FAST_TOKEN_APPROX_CHARS",
+        DEFAULT_FAST_TOKEN_APPROX_CHARS,
+    )
+    return val if isinstance(val, int) and val > 0 else 0
+
+
 def _crontab_from_expression(expr: str):
     """Parse 5-field cron into Celery crontab. On parse error returns None."""
     if not crontab or not expr:
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+BRIN_INDEX_NAME = "llmusage_created_brin"
+
+
+def create_brin_index(apps, schema_editor):
+    # NOTE(Ray): BRIN is PostgreSQL-only; other backends keep the btree on
+    # created_at, so this is a no-op there.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {BRIN_INDEX_NAME} "
+        "ON llm_tracker_usage USING brin (created_at) "
+        "WITH (pages_per_range = 32)"
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {BRIN_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agentcore_metering", "0018_alter_llmusageseries_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
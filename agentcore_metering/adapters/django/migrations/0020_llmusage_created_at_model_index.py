@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agentcore_metering", "0019_llmusage_created_at_brin"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="llmusage",
+            index=models.Index(
+                fields=["created_at", "model"],
+                name="llm_tracker_created_d65b51_idx",
+            ),
+        ),
+        # NOTE(Ray): (created_at, model) serves every created_at-leading
+        # lookup, so the single-column btrees on created_at only cost writes.
+        migrations.RemoveIndex(
+            model_name="llmusage",
+            name="llm_tracker_created_60798a_idx",
+        ),
+        migrations.AlterField(
+            model_name="llmusage",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                help_text="When the record was saved after call completed (t_end).",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agentcore_metering', '0020_llmusage_created_at_model_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='llmusage',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='When the call completed and the record was built (t_end); kept as-is when buffered rows are written later.'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agentcore_metering', '0021_alter_llmusage_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsageSeriesWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour (for day view)'), ('day', 'Day (for month view)'), ('month', 'Month (for year view)')], max_length=10, unique=True)),
+                ('aggregated_until', models.DateTimeField(help_text='Reference time of the last default-range aggregation run.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Usage Series Watermark',
+                'verbose_name_plural': 'LLM Usage Series Watermarks',
+                'db_table': 'llm_usage_series_watermark',
+            },
+        ),
+    ]
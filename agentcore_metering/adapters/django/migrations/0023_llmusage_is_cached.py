@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agentcore_metering", "0022_llmusageserieswatermark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="llmusage",
+            name="is_cached",
+            field=models.BooleanField(
+                default=False,
+                help_text=(
+                    "Served from the response cache; no provider call was made"
+                ),
+            ),
+        ),
+    ]
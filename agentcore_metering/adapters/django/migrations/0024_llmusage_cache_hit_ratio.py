@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F
+from django.db.models.functions import Cast, Round
+
+
+def backfill_cache_hit_ratio(apps, schema_editor):
+    # NOTE(Ray): New rows get the ratio on write; existing rows with cached
+    # tokens are filled in two set-based UPDATEs (ratio capped at 1).
+    LLMUsage = apps.get_model("agentcore_metering", "LLMUsage")
+    rows = LLMUsage.objects.using(schema_editor.connection.alias).filter(
+        prompt_tokens__gt=0, cached_tokens__gt=0
+    )
+    rows.filter(cached_tokens__gte=F("prompt_tokens")).update(
+        cache_hit_ratio=Decimal("1")
+    )
+    rows.filter(cached_tokens__lt=F("prompt_tokens")).update(
+        cache_hit_ratio=Round(
+            Cast(
+                F("cached_tokens"),
+                DecimalField(max_digits=20, decimal_places=10),
+            )
+            / F("prompt_tokens"),
+            4,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agentcore_metering", "0023_llmusage_is_cached"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="llmusage",
+            name="cache_hit_ratio",
+            field=models.DecimalField(
+                decimal_places=4,
+                default=Decimal("0"),
+                help_text=(
+                    "cached_tokens / prompt_tokens (0-1), set when the row is "
+                    "written"
+                ),
+                max_digits=5,
+            ),
+        ),
+        migrations.RunPython(
+            backfill_cache_hit_ratio, migrations.RunPython.noop
+        ),
+    ]
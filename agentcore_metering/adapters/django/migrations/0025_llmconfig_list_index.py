@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agentcore_metering", "0024_llmusage_cache_hit_ratio"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="llmconfig",
+            index=models.Index(
+                fields=["model_type", "scope", "created_at", "id"],
+                name="agentcore_m_model_t_7d1bc1_idx",
+            ),
+        ),
+    ]
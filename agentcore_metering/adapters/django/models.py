@@ -2,9 +2,11 @@
 LLM Usage model for tracking token consumption and cost analysis.
 """
 import uuid
+from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -54,6 +56,15 @@ class LLMUsage(models.Model):
         default=0,
         help_text="Number of cached tokens (if applicable)",
     )
+    cache_hit_ratio = models.DecimalField(
+        max_digits=5,
+        decimal_places=4,
+        default=Decimal("0"),
+        help_text=(
+            "cached_tokens / prompt_tokens (0-1), set when the row is "
+            "written"
+        ),
+    )
     reasoning_tokens = models.IntegerField(
         default=0,
         help_text="Number of reasoning tokens (for o1 models)",
@@ -117,10 +128,19 @@ class LLMUsage(models.Model):
             "Used for TTFT = first_chunk_at - started_at."
         ),
     )
+    is_cached = models.BooleanField(
+        default=False,
+        help_text=(
+            "Served from the response cache; no provider call was made"
+        ),
+    )
     created_at = models.DateTimeField(
-        auto_now_add=True,
-        db_index=True,
-        help_text="When the record was saved after call completed (t_end).",
+        default=timezone.now,
+        editable=False,
+        help_text=(
+            "When the call completed and the record was built (t_end); "
+            "kept as-is when buffered rows are written later."
+        ),
     )
 
     class Meta:
@@ -133,7 +153,8 @@ class LLMUsage(models.Model):
             models.Index(fields=["model", "-created_at"]),
             models.Index(fields=["total_tokens", "-created_at"]),
             models.Index(fields=["success", "-created_at"]),
-            models.Index(fields=["created_at"]),
+            # Also serves created_at-only range scans; no separate btree.
+            models.Index(fields=["created_at", "model"]),
         ]
 
     def __str__(self) -> str:
@@ -211,6 +232,32 @@ class LLMUsageSeries(models.Model):
         return f"{self.granularity} {self.bucket} {self.model}"
 
 
+class LLMUsageSeriesWatermark(models.Model):
+    """
+    Per-granularity point up to which LLMUsage was rolled into
+    LLMUsageSeries by the scheduled task. Lets default-range runs start from
+    the last run instead of rescanning (or redoing) the whole window.
+    """
+
+    granularity = models.CharField(
+        max_length=10,
+        choices=LLMUsageSeries.Granularity.choices,
+        unique=True,
+    )
+    aggregated_until = models.DateTimeField(
+        help_text="Reference time of the last default-range aggregation run.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "llm_usage_series_watermark"
+        verbose_name = _("LLM Usage Series Watermark")
+        verbose_name_plural = _("LLM Usage Series Watermarks")
+
+    def __str__(self) -> str:
+        return f"{self.granularity} until {self.aggregated_until}"
+
+
 class LLMConfig(models.Model):
     """
     LLM provider configuration: multiple entries per scope (global or user).
@@ -296,6 +343,11 @@ class LLMConfig(models.Model):
         verbose_name = _("LLM Config")
         verbose_name_plural = _("LLM Configs")
         ordering = ["created_at", "id"]
+        # Matches the admin list queries: model_type (and scope) filtered,
+        # then ordered by scope, created_at, id without a sort step.
+        indexes = [
+            models.Index(fields=["model_type", "scope", "created_at", "id"]),
+        ]
 
     def __str__(self) -> str:
         if self.scope == self.Scope.GLOBAL:
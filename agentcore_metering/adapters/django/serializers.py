@@ -287,6 +287,10 @@ class LLMUsageItemSerializer(serializers.Serializer):
     prompt_tokens = serializers.IntegerField(allow_null=True)
     completion_tokens = serializers.IntegerField(allow_null=True)
     total_tokens = serializers.IntegerField(allow_null=True)
+    cached_tokens = serializers.IntegerField(allow_null=True)
+    cache_hit_ratio = serializers.FloatField(
+        help_text="cached_tokens / prompt_tokens (0-1)"
+    )
     cost = serializers.FloatField(allow_null=True)
     cost_currency = serializers.CharField(allow_null=True)
     success = serializers.BooleanField()
@@ -8,8 +8,10 @@ from agentcore_metering.adapters.django.services.config_source import (
     get_config_list_from_db,
 )
 from agentcore_metering.adapters.django.services.runtime_config import (
+    clear_litellm_params_cache,
     get_litellm_params,
     get_provider_params_schema,
+    invalidate_litellm_params_cache,
     validate_llm_config,
 )
 from agentcore_metering.adapters.django.services.usage_list import (
@@ -30,6 +32,7 @@ from agentcore_metering.adapters.django.services.usage_chart_series import (
 
 __all__ = [
     "aggregate_usage_to_series",
+    "clear_litellm_params_cache",
     "get_config_from_db",
     "get_global_config",
     "set_global_config",
@@ -40,5 +43,6 @@ __all__ = [
     "get_provider_params_schema",
     "get_series_for_charts",
     "get_token_stats_from_query",
+    "invalidate_litellm_params_cache",
     "validate_llm_config",
 ]
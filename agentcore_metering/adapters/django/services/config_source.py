@@ -11,6 +11,7 @@ is present — the caller is then responsible for handling the None return.
 from typing import Any, Dict, List, Optional, Union
 
 from agentcore_metering.adapters.django.models import LLMConfig
+from agentcore_metering.adapters.django.utils import _norm_provider
 
 
 def _get_earliest_active_configs(
@@ -38,7 +39,7 @@ def _get_earliest_active_configs(
 
 def _config_to_dict(row: LLMConfig) -> Dict[str, Any]:
     return {
-        "provider": (row.provider or "openai").strip().lower(),
+        "provider": _norm_provider(row.provider),
         "config": row.config or {},
     }
 
@@ -97,6 +98,12 @@ def set_default_llm_config(config: LLMConfig) -> None:
         scope=LLMConfig.Scope.GLOBAL,
         model_type=LLMConfig.MODEL_TYPE_LLM,
     ).exclude(pk=config.pk).update(is_default=False)
+    # NOTE(Ray): .update() sends no post_save; drop cached params explicitly.
+    from agentcore_metering.adapters.django.services.runtime_config import (
+        clear_litellm_params_cache,
+    )
+
+    clear_litellm_params_cache()
 
 
 def get_default_llm_config_uuid() -> Optional[str]:
@@ -10,6 +10,7 @@ from typing import Any, Dict, Optional
 from agentcore_metering.adapters.django.llm_static.load import (
     get_provider_defaults,
 )
+from agentcore_metering.adapters.django.utils import _norm_provider
 from agentcore_metering.constants import (
     DEFAULT_MAX_TOKENS,
     DEFAULT_TEMPERATURE,
@@ -51,7 +52,7 @@ def _model_string(provider: str, config: dict) -> str:
     Build LiteLLM model string. Default to each platform's smallest/cheapest
     model to avoid cost from misconfiguration.
     """
-    provider = (provider or "openai").strip().lower()
+    provider = _norm_provider(provider)
     model = (config.get("model") or "").strip() or DEFAULT_MODELS.get(
         provider, "gpt-4o-mini"
     )
@@ -95,7 +96,7 @@ def _model_string(provider: str, config: dict) -> str:
 
 
 def _litellm_kwargs_from_config(provider: str, config: dict) -> Dict[str, Any]:
-    provider = (provider or "openai").strip().lower()
+    provider = _norm_provider(provider)
     config = config or {}
     model = _model_string(provider, config)
     # For OpenAI-compatible gateways using custom model ids
@@ -173,7 +174,7 @@ def _litellm_kwargs_from_config(provider: str, config: dict) -> Dict[str, Any]:
 
 def _validate_config(provider: str, config: dict) -> None:
     """Raise ValueError if required keys are missing for the provider."""
-    provider = (provider or "openai").strip().lower()
+    provider = _norm_provider(provider)
     if provider in PROVIDERS_REQUIRING_API_BASE:
         if not config.get("api_key") or not config.get("api_base"):
             if provider == "openai_compatible":
@@ -217,7 +218,7 @@ def build_litellm_params_from_config(
     Raises:
         ValueError: If required config (e.g. api_key) is missing.
     """
-    provider = (provider or "openai").strip().lower()
+    provider = _norm_provider(provider)
     config = config or {}
     _validate_config(provider, config)
     return _litellm_kwargs_from_config(provider, config)
@@ -1,11 +1,22 @@
 """Deterministic, per-call retry handling around LiteLLM completions."""
 
+import asyncio
 import email.utils
 import logging
+import queue
 import random
+import threading
 import time
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Generator, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Optional,
+)
 
 from agentcore_metering.constants import LITELLM_NUM_RETRIES
 
@@ -23,6 +34,11 @@ _DISABLED_LITELLM_RETRY_POLICY = {
     "TimeoutErrorRetries": 0,
 }
 
+# Marks the end of a prefetched stream; paired with the error, if any.
+_PREFETCH_DONE = object()
+# How often a blocked prefetch producer checks whether the consumer left.
+_PREFETCH_POLL_SECONDS = 0.1
+
 _TRANSIENT_EXCEPTION_NAMES = frozenset(
     {
         "APIConnectionError",
@@ -168,22 +184,23 @@ def _attempt_params(
     return attempt
 
 
-def _wait_for_retry(
+def _retry_delay(
     exc: Exception,
     retry_number: int,
     deadline: Optional[float],
     params: Dict[str, Any],
-) -> bool:
+) -> Optional[float]:
+    """Delay before the next attempt, or None when the budget is spent."""
     remaining = _remaining_timeout(deadline)
     if remaining is not None and remaining <= 0:
-        return False
+        return None
     delay = calculate_retry_delay(
         exc,
         retry_number,
         remaining_timeout=remaining,
     )
     if remaining is not None and delay >= remaining:
-        return False
+        return None
     logger.warning(
         "Retrying LiteLLM call model=%s attempt=%s delay=%.3fs error=%s",
         params.get("model", "unknown"),
@@ -191,6 +208,18 @@ def _wait_for_retry(
         delay,
         type(exc).__name__,
     )
+    return delay
+
+
+def _wait_for_retry(
+    exc: Exception,
+    retry_number: int,
+    deadline: Optional[float],
+    params: Dict[str, Any],
+) -> bool:
+    delay = _retry_delay(exc, retry_number, deadline, params)
+    if delay is None:
+        return False
     if delay > 0:
         time.sleep(delay)
     return True
@@ -221,20 +250,102 @@ def completion_with_retry(
     raise RuntimeError("unreachable retry state")
 
 
+async def acompletion_with_retry(
+    acompletion: Callable[..., Awaitable[Any]], params: Dict[str, Any]
+) -> Any:
+    """Async completion_with_retry: same budget, backoff via asyncio.sleep."""
+    retries = _configured_retries(params)
+    deadline = _deadline(params)
+    for attempt_number in range(retries + 1):
+        remaining = _remaining_timeout(deadline)
+        try:
+            return await acompletion(**_attempt_params(params, remaining))
+        except Exception as exc:
+            if attempt_number >= retries or not is_retryable_exception(exc):
+                raise
+            delay = _retry_delay(exc, attempt_number, deadline, params)
+            if delay is None:
+                raise
+            if delay > 0:
+                await asyncio.sleep(delay)
+    raise RuntimeError("unreachable retry state")
+
+
+def _prefetch(iterable: Iterable[Any], size: int) -> Generator[Any, None, None]:
+    """
+    Yield items of iterable read up to size ahead on a daemon thread, so the
+    next network read overlaps the caller's work on the current item.
+
+    NOTE(Ray): Errors from the producer are re-raised here, at the position
+    they occurred, so retry decisions still see the consumer's view. When
+    the consumer stops early the producer stops at its next put and closes
+    the provider stream.
+    """
+    buf: "queue.Queue" = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def _put(entry: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buf.put(entry, timeout=_PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    break
+            else:
+                _put((_PREFETCH_DONE, None))
+        except BaseException as exc:
+            _put((_PREFETCH_DONE, exc))
+        finally:
+            if stop.is_set():
+                close = getattr(iterable, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as exc:
+                        logger.debug("closing prefetched stream failed: %s", exc)
+
+    threading.Thread(
+        target=_produce, name="litellm-stream-prefetch", daemon=True
+    ).start()
+    try:
+        while True:
+            item, exc = buf.get()
+            if item is _PREFETCH_DONE:
+                if exc is not None:
+                    raise exc
+                return
+            yield item
+    finally:
+        stop.set()
+
+
 def iter_completion_with_retry(
     completion: Callable[..., Any],
     params: Dict[str, Any],
     *,
     has_emitted: Callable[[], bool],
     on_retry: Optional[Callable[[], None]] = None,
+    prefetch: int = 0,
 ) -> Generator[Any, None, None]:
-    """Yield stream chunks, replaying only before caller-visible output."""
+    """
+    Yield stream chunks, replaying only before caller-visible output.
+    prefetch > 0 reads up to that many chunks ahead on a background thread.
+    """
     retries = _configured_retries(params)
     deadline = _deadline(params)
     for attempt_number in range(retries + 1):
         remaining = _remaining_timeout(deadline)
         try:
             response = completion(**_attempt_params(params, remaining))
+            if prefetch > 0:
+                response = _prefetch(response, prefetch)
             yield from response
             return
         except Exception as exc:
@@ -12,12 +12,16 @@ OpenRouter.
 """
 
 import logging
+import threading
+import time
 from decimal import Decimal
 from typing import Any, Dict, Generator, Optional, Tuple
 
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.utils.translation import activate, gettext as _
 
+from agentcore_metering.adapters.django.conf import get_llm_params_cache_ttl
 from agentcore_metering.adapters.django.models import LLMConfig, LLMUsage
 from agentcore_metering.adapters.django.services.config_source import (
     get_config_from_db,
@@ -32,9 +36,8 @@ from agentcore_metering.adapters.django.services.litellm_retry import (
     completion_with_retry,
 )
 from agentcore_metering.adapters.django.utils import (
-    _read_field,
-    _read_nested_int,
-    _safe_int,
+    _extract_usage,
+    _to_decimal,
 )
 from agentcore_metering.constants import (
     DEFAULT_COST_CURRENCY,
@@ -184,42 +187,13 @@ def _extract_usage_from_response(
     response. Returns (actual_model, prompt_tokens, completion_tokens,
     total_tokens, cached_tokens, reasoning_tokens, cost).
     """
-    usage_obj = getattr(response, "usage", None)
-    prompt_tokens = 0
-    completion_tokens = 0
-    total_tokens = 0
-    cached_tokens = 0
-    reasoning_tokens = 0
-    if usage_obj:
-        prompt_tokens = _safe_int(_read_field(usage_obj, "prompt_tokens", 0))
-        completion_tokens = _safe_int(
-            _read_field(usage_obj, "completion_tokens", 0)
-        )
-        total_tokens = _safe_int(
-            _read_field(usage_obj, "total_tokens", 0)
-        ) or (prompt_tokens + completion_tokens)
-        cached_tokens = _safe_int(_read_field(usage_obj, "cached_tokens", 0))
-        reasoning_tokens = _safe_int(
-            _read_field(usage_obj, "reasoning_tokens", 0)
-        )
-        if cached_tokens == 0:
-            prompt_details = _read_field(
-                usage_obj, "prompt_tokens_details", None
-            ) or _read_field(usage_obj, "input_token_details", None)
-            cached_tokens = _read_nested_int(
-                prompt_details,
-                ("cached_tokens", "cache_read_tokens", "cache_read"),
-                0,
-            )
-        if reasoning_tokens == 0:
-            completion_details = _read_field(
-                usage_obj, "completion_tokens_details", None
-            ) or _read_field(usage_obj, "output_token_details", None)
-            reasoning_tokens = _read_nested_int(
-                completion_details,
-                ("reasoning_tokens", "reasoning"),
-                0,
-            )
+    (
+        prompt_tokens,
+        completion_tokens,
+        total_tokens,
+        cached_tokens,
+        reasoning_tokens,
+    ) = _extract_usage(getattr(response, "usage", None))
 
     actual_model = getattr(response, "model", None) or params.get(
         "model", "unknown"
@@ -229,7 +203,7 @@ def _extract_usage_from_response(
         from litellm import completion_cost
         raw_cost = completion_cost(completion_response=response)
         if raw_cost is not None:
-            cost = Decimal(str(raw_cost))
+            cost = _to_decimal(raw_cost)
     except (TypeError, ValueError) as e:
         logger.debug(f"completion_cost or Decimal failed: {e}")
     except Exception as e:
@@ -556,6 +530,77 @@ def run_test_call_stream(
     return usage_dict
 
 
+_params_cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = {}
+_params_cache_lock = threading.Lock()
+_PARAMS_CACHE_MAX_ENTRIES = 1024
+
+
+def clear_litellm_params_cache(**kwargs) -> None:
+    """Drop all cached litellm params."""
+    with _params_cache_lock:
+        _params_cache.clear()
+
+
+def invalidate_litellm_params_cache(
+    user_id: Optional[int] = None, model_uuid: Optional[str] = None
+) -> None:
+    """
+    Drop cached params resolved for user_id or for model_uuid. With neither,
+    clears the whole cache.
+    """
+    if user_id is None and model_uuid is None:
+        clear_litellm_params_cache()
+        return
+    model_uuid = str(model_uuid) if model_uuid else None
+    with _params_cache_lock:
+        stale = [
+            key
+            for key in _params_cache
+            if (user_id is not None and key[0] == user_id)
+            or (model_uuid is not None and key[1] == model_uuid)
+        ]
+        for key in stale:
+            del _params_cache[key]
+
+
+def _on_llm_config_change(sender, instance: LLMConfig, **kwargs) -> None:
+    """
+    post_save/post_delete receiver. A user-scope config only affects that
+    user's resolution (and lookups by its uuid); anything else may change
+    the global fallback, so clear everything.
+    """
+    if instance.scope == LLMConfig.Scope.USER and instance.user_id is not None:
+        invalidate_litellm_params_cache(instance.user_id, instance.uuid)
+    else:
+        clear_litellm_params_cache()
+
+
+def _cache_params(key: Tuple[Any, ...], params: Dict[str, Any], ttl: float):
+    now = time.monotonic()
+    with _params_cache_lock:
+        if len(_params_cache) >= _PARAMS_CACHE_MAX_ENTRIES:
+            # Drop expired entries, then the oldest insertions.
+            for k in [k for k, v in _params_cache.items() if v[0] <= now]:
+                del _params_cache[k]
+            while len(_params_cache) >= _PARAMS_CACHE_MAX_ENTRIES:
+                del _params_cache[next(iter(_params_cache))]
+        _params_cache[key] = (now + ttl, dict(params))
+
+
+# NOTE(Ray): Queryset .update() (e.g. set_default_llm_config) bypasses these
+# signals; callers doing bulk updates must call clear_litellm_params_cache.
+post_save.connect(
+    _on_llm_config_change,
+    sender=LLMConfig,
+    dispatch_uid="agentcore_metering_llm_params_cache_save",
+)
+post_delete.connect(
+    _on_llm_config_change,
+    sender=LLMConfig,
+    dispatch_uid="agentcore_metering_llm_params_cache_delete",
+)
+
+
 def get_litellm_params(
     user_id: Optional[int] = None,
     model_uuid: Optional[str] = None,
@@ -564,6 +609,10 @@ def get_litellm_params(
     """
     Build litellm.completion() kwargs from DB only.
 
+    With AGENTCORE_METERING_LLM_PARAMS_CACHE_TTL > 0 the resolved params are
+    reused per (user_id, model_uuid, strict_user_scope) for that many
+    seconds. A fresh dict is returned on every call; callers may mutate it.
+
     When model_uuid is provided, uses that LLM config (by uuid). Otherwise
     uses the earliest enabled LLM config (user scope then global). No
     settings fallback; config must exist in DB.
@@ -580,6 +629,14 @@ def get_litellm_params(
         ValueError: If no config in DB or required config (e.g. api_key)
         is missing.
     """
+    ttl = get_llm_params_cache_ttl()
+    key = (user_id, str(model_uuid) if model_uuid else None, strict_user_scope)
+    if ttl:
+        with _params_cache_lock:
+            hit = _params_cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return dict(hit[1])
+
     cfg = get_config_from_db(
         user_id=user_id, model_uuid=model_uuid, strict_user_scope=strict_user_scope
     )
@@ -588,7 +645,10 @@ def get_litellm_params(
         provider = cfg["provider"]
         config = cfg["config"] or {}
         _validate_config(provider, config)
-        return _litellm_kwargs_from_config(provider, config)
+        params = _litellm_kwargs_from_config(provider, config)
+        if ttl:
+            _cache_params(key, params, ttl)
+        return params
 
     if model_uuid is not None:
         raise ValueError(
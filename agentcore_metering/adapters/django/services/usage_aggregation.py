@@ -3,20 +3,80 @@ LLM usage aggregation for admin cost analysis (summary, by_model, time series).
 
 TIME_ZONE is UTC; date ranges and bucket values are in UTC. Frontend converts.
 """
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone as utc_tz
-from typing import Any, Optional
-
-from django.db.models import Count, Q, Sum
-from django.db.models.functions import TruncDate, TruncHour, TruncMonth
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.db import connections
+from django.db.models import (
+    CharField,
+    Count,
+    DateTimeField,
+    F,
+    FloatField,
+    IntegerField,
+    Max,
+    QuerySet,
+    Sum,
+    Value,
+)
+from django.db.models.functions import (
+    Cast,
+    Coalesce,
+    TruncDate,
+    TruncHour,
+    TruncMonth,
+)
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
+from django.utils.http import quote_etag
 
+from agentcore_metering.adapters.django.conf import get_parallel_aggregation
 from agentcore_metering.adapters.django.models import LLMUsage
+from agentcore_metering.constants import DEFAULT_COST_CURRENCY
+
+
+def _cost_sum() -> Coalesce:
+    """
+    Sum of cost cast to float in SQL, so the driver returns a float directly
+    instead of a Decimal that we would convert in Python afterwards. Empty
+    groups yield 0.0 rather than NULL.
+    """
+    return Coalesce(Sum(Cast("cost", FloatField())), Value(0.0))
+
+
+def _int_sum(field: str) -> Coalesce:
+    """Integer Sum that yields 0 instead of NULL for empty groups."""
+    return Coalesce(Sum(field), 0, output_field=IntegerField())
+
+
+def _usage_aggregates() -> dict:
+    """Token and cost aggregates shared by summary, by_model and series."""
+    return {
+        "total_calls": Count("id"),
+        "total_prompt_tokens": _int_sum("prompt_tokens"),
+        "total_completion_tokens": _int_sum("completion_tokens"),
+        "total_tokens": _int_sum("total_tokens"),
+        "total_cached_tokens": _int_sum("cached_tokens"),
+        "total_reasoning_tokens": _int_sum("reasoning_tokens"),
+        "total_cost": _cost_sum(),
+    }
 
 
 def _parse_date(value: Optional[str]) -> Optional[datetime]:
-    if not value:
+    if not value or not isinstance(value, str):
         return None
+    return _parse_date_cached(value)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_cached(value: str) -> Optional[datetime]:
+    """
+    Parse a non-empty date string. Cached because query filters repeat the
+    same start/end strings across requests; results are immutable.
+    """
     try:
         dt = parse_datetime(value)
         if dt:
@@ -35,36 +95,34 @@ def _ensure_aware_datetime(dt: datetime) -> datetime:
     return dt.astimezone(utc_tz.utc)
 
 
-def _bucket_key_for_fill(
+def _bucket_value_for_fill(
     bucket: date | datetime | None,
     granularity: str,
-) -> str | None:
+) -> date | datetime | None:
     """
-    Normalize bucket to a string key for fill lookup so DB and expected match.
+    Normalize bucket to a comparable value so DB and expected buckets match.
 
-    We build by_bucket from DB rows and look up by the key from
-    _build_expected_buckets. If the two sides use different string formats,
-    by_bucket.get(bucket_str) returns None and that bucket is filled with
-    zeros, so the whole series can appear as zero.
+    The fill walks DB rows and _build_expected_buckets side by side and
+    compares normalized values. If the two sides used different shapes, no
+    row would ever match and every bucket would be filled with zeros, so the
+    whole series can appear as zero.
 
     Typical scenario (SQLite): the DB returns naive datetime from
-    TruncHour/TruncMonth so r["bucket"].isoformat() is "2026-02-21T03:00:00"
-    (no timezone). Our expected buckets are timezone-aware UTC, so
-    bucket.isoformat() is "2026-02-21T03:00:00+00:00". The strings differ and
-    the lookup fails. PostgreSQL with USE_TZ=True usually returns aware
-    datetimes so keys may match without this, but normalization keeps behavior
-    consistent across backends.
+    TruncHour/TruncMonth ("2026-02-21T03:00:00", no timezone) while our
+    expected buckets are timezone-aware UTC ("2026-02-21T03:00:00+00:00").
+    PostgreSQL with USE_TZ=True usually returns aware datetimes so values may
+    match without this, but normalization keeps behavior consistent across
+    backends.
 
     Other cases: TruncDate (month granularity) may return a date while we
-    generate datetime; or microsecond/format differences. This function
-    unifies to the same key shape per granularity (hour -> aware UTC no
-    microsecond; month -> date iso; year -> first-of-month aware UTC).
+    generate datetime; or microsecond differences. This function unifies to
+    the same shape per granularity (hour -> aware UTC no microsecond;
+    month -> date; year -> first-of-month aware UTC).
     """
     if bucket is None:
         return None
     if granularity == "month":
-        d = bucket.date() if isinstance(bucket, datetime) else bucket
-        return d.isoformat()
+        return bucket.date() if isinstance(bucket, datetime) else bucket
     if granularity == "year":
         if isinstance(bucket, datetime):
             dt = _ensure_aware_datetime(bucket)
@@ -73,16 +131,23 @@ def _bucket_key_for_fill(
                 bucket.year, bucket.month, 1,
                 tzinfo=utc_tz.utc,
             )
-        dt = dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        return dt.isoformat()
+        return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     if isinstance(bucket, datetime):
         dt = _ensure_aware_datetime(bucket)
     else:
         dt = datetime.combine(
             bucket, datetime.min.time()
         ).replace(tzinfo=utc_tz.utc)
-    dt = dt.replace(microsecond=0)
-    return dt.isoformat()
+    return dt.replace(microsecond=0)
+
+
+def _bucket_key_for_fill(
+    bucket: date | datetime | None,
+    granularity: str,
+) -> str | None:
+    """ISO string of _bucket_value_for_fill; used for zero-filled buckets."""
+    value = _bucket_value_for_fill(bucket, granularity)
+    return value.isoformat() if value is not None else None
 
 
 def _parse_end_date(value: Optional[str]) -> Optional[datetime]:
@@ -90,10 +155,17 @@ def _parse_end_date(value: Optional[str]) -> Optional[datetime]:
     Parse end_date; if value is date-only (no time part), return end of that
     day so that the whole day is included in range filters.
     """
-    dt = _parse_date(value)
+    if not value or not isinstance(value, str):
+        return None
+    return _parse_end_date_cached(value)
+
+
+@lru_cache(maxsize=1024)
+def _parse_end_date_cached(value: str) -> Optional[datetime]:
+    dt = _parse_date_cached(value)
     if dt is None:
         return None
-    value = (value or "").strip()
+    value = value.strip()
     if "T" not in value and " " not in value and len(value) <= 10:
         return dt.replace(
             hour=23, minute=59, second=59, microsecond=999999
@@ -101,13 +173,12 @@ def _parse_end_date(value: Optional[str]) -> Optional[datetime]:
     return dt
 
 
-def get_summary_stats(start_date=None, end_date=None, user_id=None):
+def _filtered_usage(start_date=None, end_date=None, user_id=None):
     """
-    Return aggregate token and cost stats for the given date range and user.
+    LLMUsage rows for the optional range and user.
 
-    Optional filters: start_date, end_date (timezone-aware), user_id.
-    Returns dict with total_* tokens, total_calls, successful_calls,
-    failed_calls, total_cost, total_cost_currency.
+    Callers group or aggregate on top of this, so the filters land in WHERE
+    and narrow the scan before GROUP BY.
     """
     qs = LLMUsage.objects.all()
     if user_id:
@@ -116,36 +187,50 @@ def get_summary_stats(start_date=None, end_date=None, user_id=None):
         qs = qs.filter(created_at__gte=start_date)
     if end_date:
         qs = qs.filter(created_at__lte=end_date)
-    agg = qs.aggregate(
-        total_calls=Count("id"),
-        total_prompt_tokens=Sum("prompt_tokens"),
-        total_completion_tokens=Sum("completion_tokens"),
-        total_tokens=Sum("total_tokens"),
-        total_cached_tokens=Sum("cached_tokens"),
-        total_reasoning_tokens=Sum("reasoning_tokens"),
-        total_cost=Sum("cost"),
-        successful_calls=Count("id", filter=Q(success=True)),
-        failed_calls=Count("id", filter=Q(success=False)),
+    return qs
+
+
+def _successful_calls_sum() -> Coalesce:
+    return Coalesce(
+        Sum(Cast("success", IntegerField())),
+        0,
+        output_field=IntegerField(),
     )
-    total_cost = agg.get("total_cost")
-    if total_cost is not None:
-        total_cost = float(total_cost)
-    else:
-        total_cost = 0
+
+
+def _summary_from_aggregates(agg: dict) -> dict:
+    total_calls = agg["total_calls"]
+    successful_calls = agg["successful_calls"]
     return {
-        "total_prompt_tokens": agg["total_prompt_tokens"] or 0,
-        "total_completion_tokens": agg["total_completion_tokens"] or 0,
-        "total_tokens": agg["total_tokens"] or 0,
-        "total_cached_tokens": agg["total_cached_tokens"] or 0,
-        "total_reasoning_tokens": agg["total_reasoning_tokens"] or 0,
-        "total_cost": total_cost,
-        "total_cost_currency": "USD",
-        "total_calls": agg["total_calls"] or 0,
-        "successful_calls": agg["successful_calls"] or 0,
-        "failed_calls": agg["failed_calls"] or 0,
+        "total_prompt_tokens": agg["total_prompt_tokens"],
+        "total_completion_tokens": agg["total_completion_tokens"],
+        "total_tokens": agg["total_tokens"],
+        "total_cached_tokens": agg["total_cached_tokens"],
+        "total_reasoning_tokens": agg["total_reasoning_tokens"],
+        "total_cost": agg["total_cost"],
+        "total_cost_currency": DEFAULT_COST_CURRENCY,
+        "total_calls": total_calls,
+        "successful_calls": successful_calls,
+        "failed_calls": total_calls - successful_calls,
     }
 
 
+def get_summary_stats(start_date=None, end_date=None, user_id=None):
+    """
+    Return aggregate token and cost stats for the given date range and user.
+
+    Optional filters: start_date, end_date (timezone-aware), user_id.
+    Returns dict with total_* tokens, total_calls, successful_calls,
+    failed_calls, total_cost, total_cost_currency.
+    """
+    qs = _filtered_usage(start_date, end_date, user_id)
+    agg = qs.aggregate(
+        **_usage_aggregates(),
+        successful_calls=_successful_calls_sum(),
+    )
+    return _summary_from_aggregates(agg)
+
+
 def get_stats_by_model(start_date=None, end_date=None, user_id=None):
     """
     Return per-model aggregate stats (calls, tokens, cost) for the given range.
@@ -153,29 +238,50 @@ def get_stats_by_model(start_date=None, end_date=None, user_id=None):
     Optional filters: start_date, end_date, user_id.
     Ordered by total_tokens desc.
     """
-    qs = LLMUsage.objects.values("model").annotate(
-        total_calls=Count("id"),
-        total_prompt_tokens=Sum("prompt_tokens"),
-        total_completion_tokens=Sum("completion_tokens"),
-        total_tokens=Sum("total_tokens"),
-        total_cached_tokens=Sum("cached_tokens"),
-        total_reasoning_tokens=Sum("reasoning_tokens"),
-        total_cost=Sum("cost"),
+    qs = _filtered_usage(start_date, end_date, user_id).values(
+        "model"
+    ).annotate(
+        **_usage_aggregates(),
+        total_cost_currency=Value(
+            DEFAULT_COST_CURRENCY, output_field=CharField()
+        ),
     ).order_by("-total_tokens")
-    if user_id:
-        qs = qs.filter(user_id=user_id)
-    if start_date:
-        qs = qs.filter(created_at__gte=start_date)
-    if end_date:
-        qs = qs.filter(created_at__lte=end_date)
     return list(qs)
 
 
+_ZERO_SERIES_POINT = {
+    "bucket": None,
+    "total_calls": 0,
+    "total_prompt_tokens": 0,
+    "total_completion_tokens": 0,
+    "total_tokens": 0,
+    "total_cached_tokens": 0,
+    "total_reasoning_tokens": 0,
+    "total_cost": 0,
+}
+
+
+def _series_point(row: dict) -> dict:
+    """Time-series point for one aggregated bucket row."""
+    bucket = row["bucket"]
+    return {
+        "bucket": bucket.isoformat() if bucket is not None else None,
+        "total_calls": row["total_calls"],
+        "total_prompt_tokens": row["total_prompt_tokens"],
+        "total_completion_tokens": row["total_completion_tokens"],
+        "total_tokens": row["total_tokens"],
+        "total_cached_tokens": row["total_cached_tokens"],
+        "total_reasoning_tokens": row["total_reasoning_tokens"],
+        "total_cost": row["total_cost"],
+    }
+
+
 def get_time_series_stats(
     granularity: str,
     start_date=None,
     end_date=None,
     user_id=None,
+    expected_buckets: Optional[list[date | datetime]] = None,
 ):
     """
     Returns time-series token usage points for charting.
@@ -184,85 +290,81 @@ def get_time_series_stats(
     - day: points bucketed by hour
     - month: points bucketed by day
     - year: points bucketed by month
+
+    expected_buckets: optional output of _build_expected_buckets for the same
+    granularity and range, so callers that already built it skip a rebuild.
     """
     granularity = (granularity or "").strip().lower()
-    if granularity == "day":
-        trunc = TruncHour("created_at")
-    elif granularity == "month":
-        trunc = TruncDate("created_at")
-    elif granularity == "year":
-        trunc = TruncMonth("created_at")
-    else:
-        raise ValueError(
-            "Unsupported granularity. Use one of: day, month, year."
-        )
-
+    trunc = _time_series_trunc(granularity)
     qs = (
-        LLMUsage.objects.annotate(bucket=trunc)
+        _filtered_usage(start_date, end_date, user_id)
+        .annotate(bucket=trunc)
         .values("bucket")
-        .annotate(
-            total_calls=Count("id"),
-            total_prompt_tokens=Sum("prompt_tokens"),
-            total_completion_tokens=Sum("completion_tokens"),
-            total_tokens=Sum("total_tokens"),
-            total_cached_tokens=Sum("cached_tokens"),
-            total_reasoning_tokens=Sum("reasoning_tokens"),
-            total_cost=Sum("cost"),
-        )
+        .annotate(**_usage_aggregates())
         .order_by("bucket")
     )
-    if user_id:
-        qs = qs.filter(user_id=user_id)
-    if start_date:
-        qs = qs.filter(created_at__gte=start_date)
-    if end_date:
-        qs = qs.filter(created_at__lte=end_date)
+    return _fill_time_series(
+        list(qs), granularity, start_date, end_date, expected_buckets
+    )
+
+
+_TIME_SERIES_TRUNC = {
+    "day": TruncHour,
+    "month": TruncDate,
+    "year": TruncMonth,
+}
+
+
+def _time_series_trunc(granularity: str):
+    trunc_cls = _TIME_SERIES_TRUNC.get(granularity)
+    if trunc_cls is None:
+        raise ValueError(
+            "Unsupported granularity. Use one of: day, month, year."
+        )
+    return trunc_cls("created_at")
 
-    def _row(i):
-        bucket = i["bucket"]
-        bucket_str = bucket.isoformat() if bucket is not None else None
-        cost = i.get("total_cost")
-        cost = float(cost) if cost is not None else 0
-        return {
-            "bucket": bucket_str,
-            "total_calls": i["total_calls"],
-            "total_prompt_tokens": i["total_prompt_tokens"] or 0,
-            "total_completion_tokens": i["total_completion_tokens"] or 0,
-            "total_tokens": i["total_tokens"] or 0,
-            "total_cached_tokens": i["total_cached_tokens"] or 0,
-            "total_reasoning_tokens": i["total_reasoning_tokens"] or 0,
-            "total_cost": cost,
-        }
 
-    rows_list = list(qs)
-    rows = [_row(r) for r in rows_list]
+def _fill_time_series(
+    rows_list: list,
+    granularity: str,
+    start_date,
+    end_date,
+    expected_buckets: Optional[list[date | datetime]] = None,
+) -> list:
+    """
+    Format bucket rows (ordered by bucket) as series points; with a full
+    date range, also insert zero points for buckets without usage.
+    """
     if not start_date or not end_date:
-        return rows
+        return [_series_point(r) for r in rows_list]
 
-    filled = []
-    by_bucket = {
-        _bucket_key_for_fill(r["bucket"], granularity): _row(r)
-        for r in rows_list
-    }
-    for bucket in _build_expected_buckets(
-        granularity=granularity,
-        start_date=start_date,
-        end_date=end_date,
-    ):
-        bucket_str = _bucket_key_for_fill(bucket, granularity)
-        filled.append(
-            by_bucket.get(bucket_str)
-            or {
-                "bucket": bucket_str,
-                "total_calls": 0,
-                "total_prompt_tokens": 0,
-                "total_completion_tokens": 0,
-                "total_tokens": 0,
-                "total_cached_tokens": 0,
-                "total_reasoning_tokens": 0,
-                "total_cost": 0,
-            }
+    if expected_buckets is None:
+        expected_buckets = _build_expected_buckets(
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
         )
+    # Both sides are ordered by bucket, so merge them positionally instead of
+    # building a lookup dict keyed by ISO strings.
+    filled = []
+    row_values = [
+        _bucket_value_for_fill(r["bucket"], granularity) for r in rows_list
+    ]
+    pos = 0
+    n_rows = len(rows_list)
+    for bucket in expected_buckets:
+        value = _bucket_value_for_fill(bucket, granularity)
+        while pos < n_rows and (
+            row_values[pos] is None or row_values[pos] < value
+        ):
+            pos += 1
+        if pos < n_rows and row_values[pos] == value:
+            filled.append(_series_point(rows_list[pos]))
+            pos += 1
+            continue
+        point = _ZERO_SERIES_POINT.copy()
+        point["bucket"] = value.isoformat()
+        filled.append(point)
     return filled
 
 
@@ -276,61 +378,196 @@ def _build_expected_buckets(
     day -> datetime (TruncHour), month -> date (TruncDate),
     year -> datetime first-of-month (TruncMonth).
     """
-    if granularity == "day":
-        return _hour_buckets(start_date, end_date)
-    if granularity == "month":
-        return _day_buckets(start_date, end_date)
-    if granularity == "year":
-        return _month_buckets(start_date, end_date)
-    return []
+    build = _BUCKET_BUILDERS.get(granularity)
+    if build is None:
+        return []
+    return build(start_date, end_date)
 
 
 def _hour_buckets(start_date: datetime, end_date: datetime) -> list[datetime]:
     start_date = _ensure_aware_datetime(start_date)
     end_date = _ensure_aware_datetime(end_date)
-    current = start_date.replace(minute=0, second=0, microsecond=0)
-    end = end_date.replace(minute=0, second=0, microsecond=0)
-    out = []
-    while current <= end:
-        out.append(current)
-        current = current + timedelta(hours=1)
-    return out
+    first = start_date.replace(minute=0, second=0, microsecond=0)
+    last = end_date.replace(minute=0, second=0, microsecond=0)
+    count = (last - first) // timedelta(hours=1) + 1
+    return [first + timedelta(hours=i) for i in range(max(count, 0))]
 
 
 def _day_buckets(start_date: datetime, end_date: datetime) -> list[date]:
-    current = start_date.date()
-    end = end_date.date()
-    out = []
-    while current <= end:
-        out.append(current)
-        current = current + timedelta(days=1)
-    return out
+    first = start_date.date()
+    count = (end_date.date() - first).days + 1
+    return [first + timedelta(days=i) for i in range(max(count, 0))]
 
 
 def _month_buckets(start_date: datetime, end_date: datetime) -> list[datetime]:
     start_date = _ensure_aware_datetime(start_date)
-    end_year = end_date.year
-    end_month = end_date.month
-    end = datetime(
-        end_year, end_month, 1,
-        hour=0, minute=0, second=0, microsecond=0,
-        tzinfo=utc_tz.utc,
+    first = start_date.year * 12 + start_date.month - 1
+    last = end_date.year * 12 + end_date.month - 1
+    return [
+        datetime(index // 12, index % 12 + 1, 1, tzinfo=utc_tz.utc)
+        for index in range(first, last + 1)
+    ]
+
+
+_BUCKET_BUILDERS = {
+    "day": _hour_buckets,
+    "month": _day_buckets,
+    "year": _month_buckets,
+}
+
+
+def usage_validators(
+    kind: str,
+    params: Any,
+    qs: QuerySet,
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Build (etag, last_modified) for a response computed from qs and params.
+
+    One cheap MAX(created_at)/COUNT query identifies the state of the
+    filtered usage rows; the count catches deletions (e.g. retention cleanup)
+    that leave the latest timestamp unchanged.
+    """
+    agg = qs.aggregate(latest=Max("created_at"), count=Count("id"))
+    raw = repr((
+        kind,
+        sorted((str(k), str(v)) for k, v in params.items()),
+        agg["latest"].isoformat() if agg["latest"] else None,
+        agg["count"],
+    ))
+    # NOTE(Ray): Not a security digest; flag it so FIPS builds allow md5.
+    etag = quote_etag(
+        hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
     )
-    current = start_date.replace(
-        day=1,
-        hour=0,
-        minute=0,
-        second=0,
-        microsecond=0,
+    return etag, agg["latest"]
+
+
+def get_token_stats_validators(
+    params: Any,
+) -> Optional[Tuple[str, Optional[datetime]]]:
+    """
+    Return (etag, last_modified) for get_token_stats_from_query(params), or
+    None when the response also reads LLMUsageSeries (use_series), whose
+    upserts are not visible in LLMUsage timestamps.
+    Raises ValueError for unsupported granularity, before any ETag is
+    compared, so a bad request is never answered with 304.
+    """
+    granularity = (params.get("granularity") or "").strip().lower()
+    if granularity:
+        _time_series_trunc(granularity)
+    if str(params.get("use_series") or "").strip() in ("1", "true", "yes"):
+        return None
+    user_id = params.get("user_id") or None
+    if user_id is not None and str(user_id).strip() == "":
+        user_id = None
+    qs = _filtered_usage(
+        _parse_date(params.get("start_date")),
+        _parse_end_date(params.get("end_date")),
+        user_id,
     )
-    out = []
-    while current <= end:
-        out.append(current)
-        if current.month == 12:
-            current = current.replace(year=current.year + 1, month=1)
+    return usage_validators("token-stats", params, qs)
+
+
+def get_usage_stats_combined(
+    start_date=None,
+    end_date=None,
+    user_id=None,
+    granularity: str = "",
+    expected_buckets: Optional[list[date | datetime]] = None,
+) -> Dict[str, Any]:
+    """
+    Summary, per-model and (with granularity) time-series stats in one query.
+
+    The grouped queries share one filtered base and are sent as a single
+    UNION ALL, each row tagged with its kind, so the database is hit once
+    instead of three times. Returns {"summary", "by_model", "series"} in the
+    shapes of get_summary_stats, get_stats_by_model and
+    get_time_series_stats ("series" is None without granularity).
+    Raises ValueError for unsupported granularity.
+    """
+    granularity = (granularity or "").strip().lower()
+    base = _filtered_usage(start_date, end_date, user_id)
+    aggregates = {
+        **_usage_aggregates(),
+        "successful_calls": _successful_calls_sum(),
+    }
+    no_model = Value(None, output_field=CharField())
+    no_bucket = Value(None, output_field=DateTimeField())
+
+    def _tagged(kind, group_model, bucket):
+        return (
+            base.annotate(
+                kind=Value(kind, output_field=CharField()),
+                group_model=group_model,
+                bucket=bucket,
+            )
+            .values("kind", "group_model", "bucket")
+            .annotate(**aggregates)
+            .order_by()
+        )
+
+    parts = [
+        _tagged("summary", no_model, no_bucket),
+        _tagged("by_model", F("model"), no_bucket),
+    ]
+    if granularity:
+        # NOTE(Ray): The first query of a UNION decides result converters;
+        # lead with the series so bucket values keep the Trunc output type.
+        parts.insert(
+            0, _tagged("series", no_model, _time_series_trunc(granularity))
+        )
+    rows = list(parts[0].union(*parts[1:], all=True))
+
+    summary = None
+    by_model = []
+    series_rows = []
+    for row in rows:
+        kind = row["kind"]
+        if kind == "summary":
+            summary = _summary_from_aggregates(row)
+        elif kind == "by_model":
+            by_model.append({
+                "model": row["group_model"],
+                **{name: row[name] for name in _usage_aggregates()},
+                "total_cost_currency": DEFAULT_COST_CURRENCY,
+            })
         else:
-            current = current.replace(month=current.month + 1)
-    return out
+            series_rows.append(row)
+    by_model.sort(key=lambda r: r["total_tokens"], reverse=True)
+    series = None
+    if granularity:
+        series_rows.sort(key=lambda r: r["bucket"])
+        series = _fill_time_series(
+            series_rows, granularity, start_date, end_date, expected_buckets
+        )
+    return {"summary": summary, "by_model": by_model, "series": series}
+
+
+def _call_with_own_connection(fn: Callable, kwargs: dict) -> Any:
+    """Run fn on a worker thread and close the connections it opened."""
+    try:
+        return fn(**kwargs)
+    finally:
+        connections.close_all()
+
+
+def _run_aggregates_parallel(
+    calls: Dict[str, Tuple[Callable, dict]],
+    filters: dict,
+) -> Dict[str, Any]:
+    """
+    Run independent aggregate queries concurrently so wall time approaches
+    the slowest query instead of the sum. Exceptions (e.g. ValueError for
+    bad granularity) propagate from future.result().
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = {
+            name: executor.submit(
+                _call_with_own_connection, fn, {**filters, **kwargs}
+            )
+            for name, (fn, kwargs) in calls.items()
+        }
+        return {name: f.result() for name, f in futures.items()}
 
 
 def get_token_stats_from_query(params: Any) -> dict:
@@ -351,42 +588,51 @@ def get_token_stats_from_query(params: Any) -> dict:
     user_id = params.get("user_id") or None
     if user_id is not None and str(user_id).strip() == "":
         user_id = None
-    granularity = params.get("granularity")
+    granularity = (params.get("granularity") or "").strip().lower()
     use_series = (
         str(params.get("use_series") or "").strip() in ("1", "true", "yes")
     )
 
-    summary = get_summary_stats(
-        start_date=start_date, end_date=end_date, user_id=user_id
-    )
-    by_model = get_stats_by_model(
-        start_date=start_date, end_date=end_date, user_id=user_id
-    )
-    for i in by_model:
-        cost = i.get("total_cost")
-        i["total_cost"] = float(cost) if cost is not None else 0
-        i["total_cost_currency"] = "USD"
-    series = None
+    buckets = None
     expected_buckets = None
     if granularity and start_date and end_date:
+        buckets = _build_expected_buckets(
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+        )
         expected_buckets = [
-            b.isoformat() if b is not None else None
-            for b in _build_expected_buckets(
-                granularity=granularity,
-                start_date=start_date,
-                end_date=end_date,
-            )
+            b.isoformat() if b is not None else None for b in buckets
         ]
+    calls = {
+        "summary": (get_summary_stats, {}),
+        "by_model": (get_stats_by_model, {}),
+    }
     if granularity:
-        series_items = get_time_series_stats(
+        calls["series"] = (
+            get_time_series_stats,
+            {"granularity": granularity, "expected_buckets": buckets},
+        )
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "user_id": user_id,
+    }
+    if get_parallel_aggregation():
+        outputs = _run_aggregates_parallel(calls, filters)
+    else:
+        outputs = get_usage_stats_combined(
+            **filters,
             granularity=granularity,
-            start_date=start_date,
-            end_date=end_date,
-            user_id=user_id,
+            expected_buckets=buckets,
         )
+    summary = outputs["summary"]
+    by_model = outputs["by_model"]
+    series = None
+    if granularity:
         series = {
-            "granularity": (granularity or "").strip().lower(),
-            "items": series_items,
+            "granularity": granularity,
+            "items": outputs["series"],
         }
     result = {
         "summary": summary,
@@ -413,7 +659,7 @@ def get_token_stats_from_query(params: Any) -> dict:
             ):
                 series_gran = (
                     usage_chart_series.VIEW_TO_SERIES_GRANULARITY.get(
-                        (granularity or "").strip().lower()
+                        granularity
                     )
                 )
                 if series_gran:
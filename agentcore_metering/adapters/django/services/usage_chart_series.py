@@ -4,12 +4,35 @@ Pre-aggregated LLM usage series for chart API (by-model curves).
 Granularity: hour (day view), day (month view), month (year view).
 """
 import logging
-from collections import defaultdict
 from datetime import datetime
-from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
 
-from django.db import transaction
+from django.db import connection
+from django.db.models import (
+    Avg,
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+)
+from django.db.models.functions import (
+    Cast,
+    Coalesce,
+    Extract,
+    Greatest,
+    NullIf,
+    TruncDay,
+    TruncHour,
+    TruncMonth,
+)
 
 from agentcore_metering.adapters.django.models import LLMUsage, LLMUsageSeries
 from agentcore_metering.adapters.django.services.usage_aggregation import (
@@ -28,142 +51,142 @@ VIEW_TO_SERIES_GRANULARITY = {
     "year": SERIES_GRANULARITY_MONTH,
 }
 
+UPSERT_BATCH_SIZE = 1000
+SERIES_READ_CHUNK_SIZE = 5000
 
-def _truncate_bucket(dt: datetime, granularity: str) -> datetime:
-    dt = _ensure_aware_datetime(dt)
-    if granularity == SERIES_GRANULARITY_HOUR:
-        return dt.replace(minute=0, second=0, microsecond=0)
-    if granularity == SERIES_GRANULARITY_DAY:
-        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
-    if granularity == SERIES_GRANULARITY_MONTH:
-        return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    return dt
+_SERIES_UNIQUE_FIELDS = ["granularity", "bucket", "model"]
+_SERIES_UPDATE_FIELDS = [
+    "call_count",
+    "success_count",
+    "avg_e2e_latency_sec",
+    "avg_ttft_sec",
+    "avg_output_tps",
+    "total_prompt_tokens",
+    "total_completion_tokens",
+    "total_tokens",
+    "total_cached_tokens",
+    "total_reasoning_tokens",
+    "total_cost",
+    "cost_currency",
+]
 
+_SERIES_TRUNC = {
+    SERIES_GRANULARITY_HOUR: TruncHour,
+    SERIES_GRANULARITY_DAY: TruncDay,
+    SERIES_GRANULARITY_MONTH: TruncMonth,
+}
 
-def aggregate_usage_to_series(
-    granularity: str,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-) -> int:
+
+def _elapsed_seconds(end_field: str, start_field: str):
+    """Seconds between two datetime columns as a float SQL expression."""
+    delta = ExpressionWrapper(
+        F(end_field) - F(start_field), output_field=DurationField()
+    )
+    if connection.features.has_native_duration_field:
+        return Extract(delta, "epoch", output_field=FloatField())
+    # NOTE(Ray): Backends without a native interval type (SQLite, MySQL)
+    # represent the difference as integer microseconds.
+    return Cast(delta, FloatField()) / Value(1000000.0)
+
+
+def _grouped_series_rows(
+    qs: QuerySet, granularity: str, empty_model: str = ""
+) -> QuerySet:
     """
-    Aggregate LLMUsage into LLMUsageSeries for the given granularity and range.
+    Group usage rows by (bucket, model) in SQL and compute series metrics.
+    NULL and "" models group together under empty_model.
 
-    Series is global (no per-user); granularity: hour, day, or month.
-    Returns number of (bucket, model) rows upserted.
+    Latency averages only include rows that carry the needed timestamps,
+    matching the per-call definitions (e2e = created_at - started_at,
+    ttft = first_chunk_at - started_at for streaming calls).
     """
-    if granularity not in (
-        SERIES_GRANULARITY_HOUR,
-        SERIES_GRANULARITY_DAY,
-        SERIES_GRANULARITY_MONTH,
-    ):
-        raise ValueError(
-            f"granularity must be one of: hour, day, month; "
-            f"got {granularity!r}"
+    e2e_sec = _elapsed_seconds("created_at", "started_at")
+    ttft_sec = _elapsed_seconds("first_chunk_at", "started_at")
+    return (
+        qs.annotate(
+            bucket=_SERIES_TRUNC[granularity](
+                "created_at", tzinfo=dt_timezone.utc
+            ),
+            model_key=Coalesce(NullIf("model", Value("")), Value(empty_model)),
         )
-    start_date = _ensure_aware_datetime(start_date) if start_date else None
-    end_date = _ensure_aware_datetime(end_date) if end_date else None
-    if not start_date or not end_date:
-        raise ValueError("start_date and end_date are required")
+        # NOTE(Ray): Clear LLMUsage.Meta.ordering so it neither sorts the
+        # scanned rows nor leaks into GROUP BY.
+        .order_by()
+        .values("bucket", "model_key")
+        .annotate(
+            call_count=Count("pk"),
+            success_count=Count("pk", filter=Q(success=True)),
+            avg_e2e=Avg(
+                Greatest(e2e_sec, Value(0.0)),
+                filter=Q(started_at__isnull=False),
+            ),
+            avg_ttft=Avg(
+                Greatest(ttft_sec, Value(0.0)),
+                filter=Q(
+                    is_streaming=True,
+                    first_chunk_at__isnull=False,
+                    started_at__isnull=False,
+                ),
+            ),
+            avg_tps=Avg(
+                Cast("completion_tokens", FloatField()) / e2e_sec,
+                filter=Q(
+                    started_at__isnull=False,
+                    created_at__gt=F("started_at"),
+                    completion_tokens__isnull=False,
+                ),
+            ),
+            prompt_tokens=Coalesce(Sum("prompt_tokens"), 0),
+            completion_tokens=Coalesce(Sum("completion_tokens"), 0),
+            total_tokens=Coalesce(Sum("total_tokens"), 0),
+            cached_tokens=Coalesce(Sum("cached_tokens"), 0),
+            reasoning_tokens=Coalesce(Sum("reasoning_tokens"), 0),
+            cost=Sum("cost"),
+            cost_currency=Max("cost_currency"),
+        )
+    )
 
+
+def _aggregate_groups(
+    granularity: str,
+    start_date: datetime,
+    end_date: datetime,
+    user_id: Optional[int] = None,
+    ordered: bool = True,
+    empty_model: str = "",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one series row per (bucket, model) computed from LLMUsage.
+
+    Shared by aggregate_usage_to_series (upsert) and
+    _compute_series_from_usage (serialize). Rows use LLMUsageSeries field
+    names; bucket is an aware UTC datetime, total_cost a Decimal or None
+    and model is empty_model when the usage row had none; that is part of
+    the SQL group key, so a literal model of the same name shares its
+    group instead of producing a second row. ordered=False leaves rows
+    in whatever order the GROUP BY produces, skipping the sort.
+    """
     qs = LLMUsage.objects.filter(
         created_at__gte=start_date,
         created_at__lte=end_date,
-    ).only(
-        "created_at",
-        "started_at",
-        "first_chunk_at",
-        "model",
-        "prompt_tokens",
-        "completion_tokens",
-        "total_tokens",
-        "cached_tokens",
-        "reasoning_tokens",
-        "cost",
-        "cost_currency",
-        "success",
-        "is_streaming",
-    )
-    groups: Dict[tuple, Dict[str, Any]] = defaultdict(
-        lambda: {
-            "e2e_secs": [],
-            "ttft_secs": [],
-            "output_tps_list": [],
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_tokens": 0,
-            "cached_tokens": 0,
-            "reasoning_tokens": 0,
-            "cost": Decimal("0"),
-            "cost_currency": "USD",
-            "call_count": 0,
-            "success_count": 0,
-        }
     )
-
-    for row in qs.iterator(chunk_size=2000):
-        bucket = _truncate_bucket(row.created_at, granularity)
-        key = (bucket, row.model or "")
-        g = groups[key]
-        g["call_count"] += 1
-        if row.success:
-            g["success_count"] += 1
-        g["prompt_tokens"] += row.prompt_tokens or 0
-        g["completion_tokens"] += row.completion_tokens or 0
-        g["total_tokens"] += row.total_tokens or 0
-        g["cached_tokens"] += row.cached_tokens or 0
-        g["reasoning_tokens"] += row.reasoning_tokens or 0
-        if row.cost is not None:
-            g["cost"] += row.cost
-        if row.cost_currency:
-            g["cost_currency"] = row.cost_currency
-
-        e2e_sec = None
-        if row.started_at and row.created_at:
-            delta = row.created_at - row.started_at
-            e2e_sec = max(0.0, delta.total_seconds())
-            g["e2e_secs"].append(e2e_sec)
-        ttft_sec = None
-        if (
-            row.is_streaming
-            and row.first_chunk_at is not None
-            and row.started_at is not None
-        ):
-            ttft_delta = row.first_chunk_at - row.started_at
-            ttft_sec = max(0.0, ttft_delta.total_seconds())
-            g["ttft_secs"].append(ttft_sec)
-        if (
-            e2e_sec is not None
-            and e2e_sec > 0
-            and row.completion_tokens is not None
-        ):
-            g["output_tps_list"].append(
-                float(row.completion_tokens) / e2e_sec
-            )
-
-    rows_to_upsert: List[Dict[str, Any]] = []
-    for (bucket, model), g in groups.items():
-        avg_e2e = (
-            sum(g["e2e_secs"]) / len(g["e2e_secs"])
-            if g["e2e_secs"]
-            else None
-        )
-        avg_ttft = (
-            sum(g["ttft_secs"]) / len(g["ttft_secs"])
-            if g["ttft_secs"]
-            else None
-        )
-        avg_tps = (
-            sum(g["output_tps_list"]) / len(g["output_tps_list"])
-            if g["output_tps_list"]
-            else None
-        )
-        cost_val = g["cost"]
-        if cost_val == Decimal("0"):
-            cost_val = None
-        rows_to_upsert.append({
-            "granularity": granularity,
+    if user_id is not None:
+        qs = qs.filter(user_id=user_id)
+    grouped = _grouped_series_rows(qs, granularity, empty_model)
+    if ordered:
+        grouped = grouped.order_by("bucket", "model_key")
+    for g in grouped.iterator(chunk_size=SERIES_READ_CHUNK_SIZE):
+        avg_e2e = g["avg_e2e"]
+        avg_ttft = g["avg_ttft"]
+        avg_tps = g["avg_tps"]
+        bucket = g["bucket"]
+        # NOTE(Ray): Trunc(tzinfo=UTC) already yields aware UTC datetimes
+        # when USE_TZ is on; only normalize when the backend did not.
+        if bucket.tzinfo is not dt_timezone.utc:
+            bucket = _ensure_aware_datetime(bucket)
+        yield {
             "bucket": bucket,
-            "model": model or "unknown",
+            "model": g["model_key"],
             "call_count": g["call_count"],
             "success_count": g["success_count"],
             "avg_e2e_latency_sec": (
@@ -180,36 +203,95 @@ def aggregate_usage_to_series(
             "total_tokens": g["total_tokens"],
             "total_cached_tokens": g["cached_tokens"],
             "total_reasoning_tokens": g["reasoning_tokens"],
-            "total_cost": cost_val,
+            "total_cost": g["cost"] or None,
             "cost_currency": g["cost_currency"] or "USD",
-        })
-
-    with transaction.atomic():
-        for r in rows_to_upsert:
-            LLMUsageSeries.objects.update_or_create(
-                granularity=r["granularity"],
-                bucket=r["bucket"],
-                model=r["model"],
-                defaults={
-                    "call_count": r["call_count"],
-                    "success_count": r["success_count"],
-                    "avg_e2e_latency_sec": r["avg_e2e_latency_sec"],
-                    "avg_ttft_sec": r["avg_ttft_sec"],
-                    "avg_output_tps": r["avg_output_tps"],
-                    "total_prompt_tokens": r["total_prompt_tokens"],
-                    "total_completion_tokens": r["total_completion_tokens"],
-                    "total_tokens": r["total_tokens"],
-                    "total_cached_tokens": r["total_cached_tokens"],
-                    "total_reasoning_tokens": r["total_reasoning_tokens"],
-                    "total_cost": r["total_cost"],
-                    "cost_currency": r["cost_currency"],
-                },
-            )
+        }
+
+
+@lru_cache(maxsize=4096)
+def _format_bucket(
+    bucket: Optional[datetime], granularity: str
+) -> Optional[str]:
+    """
+    ISO string for a series bucket (date only for day granularity).
+
+    Rows arrive ordered by bucket with one row per model, so the same
+    bucket is formatted many times in a row; the cache makes repeats a
+    dict probe. Buckets are always UTC here, so equal instants format the
+    same.
+    """
+    if bucket is None:
+        return None
+    if granularity == SERIES_GRANULARITY_DAY:
+        return (
+            bucket.date().isoformat()
+            if hasattr(bucket, "date")
+            else bucket.isoformat()
+        )
+    return bucket.isoformat()
+
+
+def _serialize_series_row(
+    row: Dict[str, Any], granularity: str
+) -> Dict[str, Any]:
+    """Format a series row for the chart API (ISO bucket, float cost)."""
+    cost = row["total_cost"]
+    out = {
+        "bucket": _format_bucket(row["bucket"], granularity),
+        "model": row["model"] or "",
+    }
+    out.update((field, row[field]) for field in _SERIES_UPDATE_FIELDS)
+    out["total_cost"] = float(cost) if cost is not None else None
+    out["cost_currency"] = row["cost_currency"] or "USD"
+    return out
+
+
+def aggregate_usage_to_series(
+    granularity: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> int:
+    """
+    Aggregate LLMUsage into LLMUsageSeries for the given granularity and range.
+
+    Series is global (no per-user); granularity: hour, day, or month.
+    Returns number of (bucket, model) rows upserted.
+    """
+    if granularity not in _SERIES_TRUNC:
+        raise ValueError(
+            f"granularity must be one of: hour, day, month; "
+            f"got {granularity!r}"
+        )
+    start_date = _ensure_aware_datetime(start_date) if start_date else None
+    end_date = _ensure_aware_datetime(end_date) if end_date else None
+    if not start_date or not end_date:
+        raise ValueError("start_date and end_date are required")
+
+    # NOTE(Ray): Model-less rows are stored as "unknown"; grouping on that
+    # key in SQL keeps them in one group with literal "unknown" rows, since
+    # the upsert rejects two rows with the same unique key.
+    objs = [
+        LLMUsageSeries(granularity=granularity, **g)
+        for g in _aggregate_groups(
+            granularity,
+            start_date,
+            end_date,
+            ordered=False,
+            empty_model="unknown",
+        )
+    ]
+    LLMUsageSeries.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=_SERIES_UNIQUE_FIELDS,
+        update_fields=_SERIES_UPDATE_FIELDS,
+        batch_size=UPSERT_BATCH_SIZE,
+    )
     logger.info(
         f"aggregate_usage_to_series granularity={granularity} "
-        f"range=[{start_date}, {end_date}] upserted={len(rows_to_upsert)}"
+        f"range=[{start_date}, {end_date}] upserted={len(objs)}"
     )
-    return len(rows_to_upsert)
+    return len(objs)
 
 
 def get_series_for_charts(
@@ -236,44 +318,19 @@ def get_series_for_charts(
     if not start_date or not end_date:
         return []
 
-    qs = LLMUsageSeries.objects.filter(
-        granularity=series_gran,
-        bucket__gte=start_date,
-        bucket__lte=end_date,
-    ).order_by("bucket", "model")
-
-    out = []
-    for row in qs:
-        cost = row.total_cost
-        if cost is not None:
-            cost = float(cost)
-        if row.bucket is None:
-            bucket_str = None
-        elif series_gran == SERIES_GRANULARITY_DAY:
-            bucket_str = (
-                row.bucket.date().isoformat()
-                if hasattr(row.bucket, "date")
-                else row.bucket.isoformat()
-            )
-        else:
-            bucket_str = row.bucket.isoformat()
-        out.append({
-            "bucket": bucket_str,
-            "model": row.model or "",
-            "call_count": row.call_count,
-            "success_count": row.success_count,
-            "avg_e2e_latency_sec": row.avg_e2e_latency_sec,
-            "avg_ttft_sec": row.avg_ttft_sec,
-            "avg_output_tps": row.avg_output_tps,
-            "total_prompt_tokens": row.total_prompt_tokens,
-            "total_completion_tokens": row.total_completion_tokens,
-            "total_tokens": row.total_tokens,
-            "total_cached_tokens": row.total_cached_tokens,
-            "total_reasoning_tokens": row.total_reasoning_tokens,
-            "total_cost": cost,
-            "cost_currency": row.cost_currency or "USD",
-        })
-    return out
+    qs = (
+        LLMUsageSeries.objects.filter(
+            granularity=series_gran,
+            bucket__gte=start_date,
+            bucket__lte=end_date,
+        )
+        .order_by("bucket", "model")
+        .values("bucket", "model", *_SERIES_UPDATE_FIELDS)
+    )
+    return [
+        _serialize_series_row(row, series_gran)
+        for row in qs.iterator(chunk_size=SERIES_READ_CHUNK_SIZE)
+    ]
 
 
 def _compute_series_from_usage(
@@ -285,150 +342,21 @@ def _compute_series_from_usage(
     """
     Compute (bucket, model) series from LLMUsage without writing to DB.
     Same grouping logic as aggregate_usage_to_series; returns list of dicts
-    suitable for chart API (bucket as datetime, cost as Decimal).
+    in the same shape as get_series_for_charts.
     Used as fallback when LLMUsageSeries has no rows for the range.
     """
-    if granularity not in (
-        SERIES_GRANULARITY_HOUR,
-        SERIES_GRANULARITY_DAY,
-        SERIES_GRANULARITY_MONTH,
-    ):
+    if granularity not in _SERIES_TRUNC:
         return []
     start_date = _ensure_aware_datetime(start_date) if start_date else None
     end_date = _ensure_aware_datetime(end_date) if end_date else None
     if not start_date or not end_date:
         return []
-
-    qs = LLMUsage.objects.filter(
-        created_at__gte=start_date,
-        created_at__lte=end_date,
-    ).only(
-        "created_at",
-        "started_at",
-        "first_chunk_at",
-        "model",
-        "prompt_tokens",
-        "completion_tokens",
-        "total_tokens",
-        "cached_tokens",
-        "reasoning_tokens",
-        "cost",
-        "cost_currency",
-        "success",
-        "is_streaming",
-    )
-    if user_id is not None:
-        qs = qs.filter(user_id=user_id)
-    groups = defaultdict(
-        lambda: {
-            "e2e_secs": [],
-            "ttft_secs": [],
-            "output_tps_list": [],
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_tokens": 0,
-            "cached_tokens": 0,
-            "reasoning_tokens": 0,
-            "cost": Decimal("0"),
-            "cost_currency": "USD",
-            "call_count": 0,
-            "success_count": 0,
-        }
-    )
-
-    for row in qs.iterator(chunk_size=2000):
-        bucket = _truncate_bucket(row.created_at, granularity)
-        key = (bucket, row.model or "")
-        g = groups[key]
-        g["call_count"] += 1
-        if row.success:
-            g["success_count"] += 1
-        g["prompt_tokens"] += row.prompt_tokens or 0
-        g["completion_tokens"] += row.completion_tokens or 0
-        g["total_tokens"] += row.total_tokens or 0
-        g["cached_tokens"] += row.cached_tokens or 0
-        g["reasoning_tokens"] += row.reasoning_tokens or 0
-        if row.cost is not None:
-            g["cost"] += row.cost
-        if row.cost_currency:
-            g["cost_currency"] = row.cost_currency
-
-        e2e_sec = None
-        if row.started_at and row.created_at:
-            delta = row.created_at - row.started_at
-            e2e_sec = max(0.0, delta.total_seconds())
-            g["e2e_secs"].append(e2e_sec)
-        ttft_sec = None
-        if (
-            row.is_streaming
-            and row.first_chunk_at is not None
-            and row.started_at is not None
-        ):
-            ttft_delta = row.first_chunk_at - row.started_at
-            ttft_sec = max(0.0, ttft_delta.total_seconds())
-            g["ttft_secs"].append(ttft_sec)
-        if (
-            e2e_sec is not None
-            and e2e_sec > 0
-            and row.completion_tokens is not None
-        ):
-            g["output_tps_list"].append(
-                float(row.completion_tokens) / e2e_sec
-            )
-
-    out = []
-    for (bucket, model), g in sorted(groups.items()):
-        avg_e2e = (
-            sum(g["e2e_secs"]) / len(g["e2e_secs"])
-            if g["e2e_secs"]
-            else None
-        )
-        avg_ttft = (
-            sum(g["ttft_secs"]) / len(g["ttft_secs"])
-            if g["ttft_secs"]
-            else None
-        )
-        avg_tps = (
-            sum(g["output_tps_list"]) / len(g["output_tps_list"])
-            if g["output_tps_list"]
-            else None
+    return [
+        _serialize_series_row(row, granularity)
+        for row in _aggregate_groups(
+            granularity, start_date, end_date, user_id=user_id
         )
-        cost_val = g["cost"]
-        if cost_val == Decimal("0"):
-            cost_val = None
-        if bucket is None:
-            bucket_str = None
-        elif granularity == SERIES_GRANULARITY_DAY:
-            bucket_str = (
-                bucket.date().isoformat()
-                if hasattr(bucket, "date")
-                else bucket.isoformat()
-            )
-        else:
-            bucket_str = bucket.isoformat()
-        out.append({
-            "bucket": bucket_str,
-            "model": model or "",
-            "call_count": g["call_count"],
-            "success_count": g["success_count"],
-            "avg_e2e_latency_sec": (
-                round(avg_e2e, 4) if avg_e2e is not None else None
-            ),
-            "avg_ttft_sec": (
-                round(avg_ttft, 4) if avg_ttft is not None else None
-            ),
-            "avg_output_tps": (
-                round(avg_tps, 2) if avg_tps is not None else None
-            ),
-            "total_prompt_tokens": g["prompt_tokens"],
-            "total_completion_tokens": g["completion_tokens"],
-            "total_tokens": g["total_tokens"],
-            "total_cached_tokens": g["cached_tokens"],
-            "total_reasoning_tokens": g["reasoning_tokens"],
-            "total_cost": float(cost_val) if cost_val is not None else None,
-            "cost_currency": g["cost_currency"] or "USD",
-        })
-    return out
+    ]
 
 
 def get_series_for_charts_with_fallback(
@@ -463,6 +391,15 @@ def get_series_for_charts_with_fallback(
     )
     if result:
         return result
+    if not start_date or not end_date:
+        return []
+    # NOTE(Ray): Empty ranges (future dates, fresh installs) are common; an
+    # index-backed EXISTS is far cheaper than the grouped fallback scan.
+    if not LLMUsage.objects.filter(
+        created_at__gte=_ensure_aware_datetime(start_date),
+        created_at__lte=_ensure_aware_datetime(end_date),
+    ).exists():
+        return []
     return _compute_series_from_usage(
         granularity=series_gran,
         start_date=start_date,
@@ -1,10 +1,37 @@
 """LLM usage records listing for admin (read-only, paginated)."""
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
 
 from agentcore_metering.adapters.django.models import LLMUsage
 from agentcore_metering.adapters.django.services.usage_aggregation import (
     _parse_date,
     _parse_end_date,
+    usage_validators,
+)
+
+_SUCCESS_FILTER_VALUES = {"true": True, "false": False}
+
+_LIST_FIELDS = (
+    "id",
+    "user_id",
+    "model",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cached_tokens",
+    "cache_hit_ratio",
+    "cost",
+    "cost_currency",
+    "success",
+    "error",
+    "metadata",
+    "created_at",
+    "started_at",
+    "first_chunk_at",
+    "is_streaming",
 )
 
 
@@ -24,6 +51,43 @@ def _safe_positive_int(
     return parsed
 
 
+def _success_from_filter(value: Optional[str]) -> Optional[bool]:
+    """Map a "true"/"false" filter string to a bool; anything else is None."""
+    return _SUCCESS_FILTER_VALUES.get((value or "").strip().lower())
+
+
+def _filtered_usage_qs(
+    user_id: Optional[str] = None,
+    model_filter: Optional[str] = None,
+    success: Optional[bool] = None,
+    start_date: Optional[Any] = None,
+    end_date: Optional[Any] = None,
+) -> QuerySet:
+    qs = LLMUsage.objects.all()
+    if user_id:
+        qs = qs.filter(user_id=user_id)
+    if model_filter:
+        qs = qs.filter(model__icontains=model_filter)
+    if success is not None:
+        qs = qs.filter(success=success)
+    if start_date:
+        qs = qs.filter(created_at__gte=start_date)
+    if end_date:
+        qs = qs.filter(created_at__lte=end_date)
+    return qs
+
+
+def _filters_from_query(params: Any) -> Dict[str, Any]:
+    """Parse list filters (not pagination) from query params."""
+    return {
+        "user_id": (params.get("user_id") or "").strip() or None,
+        "model_filter": (params.get("model") or "").strip() or None,
+        "success": _success_from_filter(params.get("success")),
+        "start_date": _parse_date(params.get("start_date")),
+        "end_date": _parse_end_date(params.get("end_date")),
+    }
+
+
 def get_llm_usage_list(
     page: int = 1,
     page_size: int = 20,
@@ -32,82 +96,90 @@ def get_llm_usage_list(
     success_filter: Optional[str] = None,
     start_date: Optional[Any] = None,
     end_date: Optional[Any] = None,
+    success: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
     Return paginated LLM usage records with filters.
     Applied filters: user_id, model (icontains), success, start_date, end_date.
+    success_filter is the "true"/"false" string form; success is the
+    tri-state bool (None means no filter) and wins when both are given.
     """
+    if success is None:
+        success = _success_from_filter(success_filter)
     page = _safe_positive_int(page, 1, minimum=1)
     page_size = _safe_positive_int(page_size, 20, minimum=1)
     page_size = min(page_size, 100)
-    qs = (
-        LLMUsage.objects.select_related("user")
-        .order_by("-created_at")
-    )
-    if user_id:
-        qs = qs.filter(user_id=user_id)
-    if model_filter:
-        qs = qs.filter(model__icontains=model_filter)
-    if success_filter and success_filter.strip():
-        low = success_filter.strip().lower()
-        if low == "true":
-            qs = qs.filter(success=True)
-        elif low == "false":
-            qs = qs.filter(success=False)
-    if start_date:
-        qs = qs.filter(created_at__gte=start_date)
-    if end_date:
-        qs = qs.filter(created_at__lte=end_date)
+    qs = _filtered_usage_qs(
+        user_id=user_id,
+        model_filter=model_filter,
+        success=success,
+        start_date=start_date,
+        end_date=end_date,
+    ).order_by("-created_at")
 
     total = qs.count()
     start = (page - 1) * page_size
-    usages = qs[start: start + page_size]
+    usages = list(qs.values(*_LIST_FIELDS)[start: start + page_size])
+    # One narrow lookup for the page's usernames instead of joining every
+    # auth_user column onto each usage row.
+    user_ids = {u["user_id"] for u in usages if u["user_id"] is not None}
+    usernames = (
+        dict(
+            get_user_model().objects.filter(pk__in=user_ids)
+            .values_list("pk", "username")
+        )
+        if user_ids
+        else {}
+    )
 
     items: List[Dict[str, Any]] = []
     for u in usages:
-        created_at = u.created_at.isoformat() if u.created_at else None
-        started_at = u.started_at.isoformat() if u.started_at else None
-        username = u.user.username if u.user else None
-        cost = None
-        if u.cost is not None:
-            cost = float(u.cost)
+        created = u["created_at"]
+        started = u["started_at"]
+        first_chunk = u["first_chunk_at"]
+        completion_tokens = u["completion_tokens"]
+        cost = u["cost"]
+        if cost is not None:
+            cost = float(cost)
         e2e_latency_sec = None
         ttft_sec = None
-        if u.started_at and u.created_at:
-            delta = u.created_at - u.started_at
+        if started and created:
+            delta = created - started
             e2e_latency_sec = max(0.0, delta.total_seconds())
         if (
-            u.is_streaming
-            and u.first_chunk_at is not None
-            and u.started_at is not None
+            u["is_streaming"]
+            and first_chunk is not None
+            and started is not None
         ):
-            ttft_delta = u.first_chunk_at - u.started_at
+            ttft_delta = first_chunk - started
             ttft_sec = max(0.0, ttft_delta.total_seconds())
         # output_tps = completion_tokens / e2e_latency (stream and non-stream)
         output_tps = None
         if (
             e2e_latency_sec is not None
             and e2e_latency_sec > 0
-            and u.completion_tokens is not None
+            and completion_tokens is not None
         ):
-            output_tps = round(float(u.completion_tokens) / e2e_latency_sec, 2)
+            output_tps = round(float(completion_tokens) / e2e_latency_sec, 2)
         item: Dict[str, Any] = {
-            "id": str(u.id),
-            "user_id": u.user_id,
-            "username": username,
-            "model": u.model,
-            "prompt_tokens": u.prompt_tokens,
-            "completion_tokens": u.completion_tokens,
-            "total_tokens": u.total_tokens,
+            "id": str(u["id"]),
+            "user_id": u["user_id"],
+            "username": usernames.get(u["user_id"]),
+            "model": u["model"],
+            "prompt_tokens": u["prompt_tokens"],
+            "completion_tokens": completion_tokens,
+            "total_tokens": u["total_tokens"],
+            "cached_tokens": u["cached_tokens"],
+            "cache_hit_ratio": float(u["cache_hit_ratio"] or 0),
             "cost": cost,
-            "cost_currency": u.cost_currency or "USD",
-            "success": u.success,
-            "error": u.error,
-            "created_at": created_at,
-            "started_at": started_at,
+            "cost_currency": u["cost_currency"] or "USD",
+            "success": u["success"],
+            "error": u["error"],
+            "created_at": created.isoformat() if created else None,
+            "started_at": started.isoformat() if started else None,
             "e2e_latency_sec": e2e_latency_sec,
             "output_tps": output_tps,
-            "metadata": u.metadata,
+            "metadata": u["metadata"],
         }
         if ttft_sec is not None:
             item["ttft_sec"] = ttft_sec
@@ -130,17 +202,20 @@ def get_llm_usage_list_from_query(params: Any) -> Dict[str, Any]:
     page = _safe_positive_int(params.get("page"), 1, minimum=1)
     page_size = _safe_positive_int(params.get("page_size"), 20, minimum=1)
     page_size = min(page_size, 100)
-    user_id = (params.get("user_id") or "").strip() or None
-    model_filter = (params.get("model") or "").strip() or None
-    success_filter = (params.get("success") or "").strip() or None
-    start_date = _parse_date(params.get("start_date"))
-    end_date = _parse_end_date(params.get("end_date"))
     return get_llm_usage_list(
         page=page,
         page_size=page_size,
-        user_id=user_id,
-        model_filter=model_filter,
-        success_filter=success_filter,
-        start_date=start_date,
-        end_date=end_date,
+        **_filters_from_query(params),
     )
+
+
+def get_llm_usage_list_validators(
+    params: Any,
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Return (etag, last_modified) for the usage list response described by
+    params. Usage rows are append-only, so MAX(created_at) and COUNT over the
+    filtered rows change whenever the listed page could change.
+    """
+    qs = _filtered_usage_qs(**_filters_from_query(params))
+    return usage_validators("llm-usage", params, qs)
@@ -1,5 +1,6 @@
 """
-Celery tasks for agentcore_metering: cleanup and aggregation.
+Celery tasks for agentcore_metering: cleanup, aggregation and async usage
+writes.
 """
 from agentcore_metering.adapters.django.tasks.cleanup import (
     cleanup_old_llm_usage_task,
@@ -7,8 +8,12 @@ from agentcore_metering.adapters.django.tasks.cleanup import (
 from agentcore_metering.adapters.django.tasks.aggregate import (
     aggregate_llm_usage_series_task,
 )
+from agentcore_metering.adapters.django.tasks.usage import (
+    save_llm_usage_task,
+)
 
 __all__ = [
     "cleanup_old_llm_usage_task",
     "aggregate_llm_usage_series_task",
+    "save_llm_usage_task",
 ]
@@ -6,15 +6,27 @@ aggregate_llm_usage_series_task. Run with granularity=hour|day|month.
 Uses agentcore_task TaskTracker so runs are recorded in TaskExecution.
 """
 import logging
-import traceback as tb
-from datetime import date, datetime, timedelta, timezone as utc_tz
-from typing import Optional
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as utc_tz
+from functools import lru_cache, partial
+from typing import Callable, Iterator, Optional, Tuple
 
 from celery import shared_task
+from django.db import connection, transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-from agentcore_metering.adapters.django.conf import get_aggregation_timezone
+from agentcore_metering.adapters.django.conf import (
+    get_aggregation_timezone,
+    get_parallel_aggregation,
+    get_usage_buffer_max_age,
+)
+from agentcore_metering.adapters.django.models import (
+    LLMUsage,
+    LLMUsageSeriesWatermark,
+)
 from agentcore_metering.adapters.django.services.usage_chart_series import (
     SERIES_GRANULARITY_DAY,
     SERIES_GRANULARITY_HOUR,
@@ -22,32 +34,71 @@ from agentcore_metering.adapters.django.services.usage_chart_series import (
     aggregate_usage_to_series,
 )
 from agentcore_metering.adapters.django.services.usage_aggregation import (
+    _call_with_own_connection,
     _ensure_aware_datetime,
 )
+from agentcore_metering.adapters.django.tasks.usage import (
+    SAVE_USAGE_MAX_RETRIES,
+    SAVE_USAGE_RETRY_BACKOFF_MAX,
+)
+from agentcore_metering.adapters.django.utils import (
+    RETRYABLE_TASK_ERRORS,
+    _format_tb_limited,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def _agg_tz():
+END_OF_DAY = time(23, 59, 59, 999999)
+
+# Slack for rows committed after their created_at by slow transactions or
+# queue lag; _watermark_overlap() adds the package's own write horizons.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+
+def _watermark_overlap() -> timedelta:
     """
-    Return ZoneInfo for aggregation timezone (e.g. Asia/Shanghai).
+    How far behind the last run's reference time a default-range run still
+    re-reads. Covers the longest delay between a row's created_at and its
+    insert on this package's write paths: every save_llm_usage_task retry
+    at its capped backoff, plus the write buffer's max age, plus
+    WATERMARK_OVERLAP. Rows later than that (e.g. a Celery backlog longer
+    than the horizon) need an explicit start_date/end_date run.
+    """
+    retries = SAVE_USAGE_MAX_RETRIES * SAVE_USAGE_RETRY_BACKOFF_MAX
+    return WATERMARK_OVERLAP + timedelta(
+        seconds=retries + get_usage_buffer_max_age()
+    )
+
+
+@lru_cache(maxsize=4)
+def _zone(name: str):
+    """
+    ZoneInfo for name, built once per name.
     NOTE(Ray): Lazy import to avoid loading zoneinfo at module import.
     Falls back to UTC on ImportError or invalid timezone name.
     """
     try:
         from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-        return ZoneInfo(get_aggregation_timezone())
+        return ZoneInfo(name)
     except (ImportError, ZoneInfoNotFoundError):
         return utc_tz.utc
 
 
-def _default_range(granularity: str):
+def _agg_tz():
+    """Return ZoneInfo for aggregation timezone (e.g. Asia/Shanghai)."""
+    return _zone(get_aggregation_timezone())
+
+
+def _default_range(granularity: str, now: Optional[datetime] = None):
     """
     Return (start_date, end_date) for the given granularity when not provided.
     hour: last 2 hours (UTC). day/month: yesterday/last month in aggregation
-    timezone, then converted to UTC for DB query.
+    timezone, then converted to UTC for DB query. Pass now to share one
+    reference time across granularities of the same run.
     """
-    now = timezone.now()
+    if now is None:
+        now = timezone.now()
     if granularity == SERIES_GRANULARITY_HOUR:
         end_date = now
         start_date = end_date - timedelta(hours=2)
@@ -61,11 +112,7 @@ def _default_range(granularity: str):
         start_local = datetime.combine(
             yesterday, datetime.min.time(), tzinfo=tz
         )
-        end_local = datetime.combine(
-            yesterday,
-            datetime.max.time().replace(microsecond=999999),
-            tzinfo=tz,
-        )
+        end_local = datetime.combine(yesterday, END_OF_DAY, tzinfo=tz)
         start_date = start_local.astimezone(utc_tz.utc)
         end_date = end_local.astimezone(utc_tz.utc)
         return start_date, end_date
@@ -77,11 +124,7 @@ def _default_range(granularity: str):
         start_local = datetime.combine(
             first_prev_month, datetime.min.time(), tzinfo=tz
         )
-        end_local = datetime.combine(
-            last_day_prev,
-            datetime.max.time().replace(microsecond=999999),
-            tzinfo=tz,
-        )
+        end_local = datetime.combine(last_day_prev, END_OF_DAY, tzinfo=tz)
         start_date = start_local.astimezone(utc_tz.utc)
         end_date = end_local.astimezone(utc_tz.utc)
         return start_date, end_date
@@ -91,8 +134,80 @@ def _default_range(granularity: str):
     return start_date, end_date
 
 
-def _run_one_granularity(granularity: str, start_date=None, end_date=None):
-    """Run aggregation for one granularity; return upserted count."""
+@contextmanager
+def _series_lock(granularity: str):
+    """
+    Try to take a per-granularity lock for the aggregation run; yield
+    whether it was acquired.
+
+    NOTE(Ray): Overlapping runs (several workers, or a slow previous run)
+    would upsert the same (granularity, bucket, model) rows and wait on each
+    other's row locks. On PostgreSQL a session advisory lock lets the second
+    run skip instead of blocking; other backends always proceed.
+    """
+    if connection.vendor != "postgresql":
+        yield True
+        return
+    key = zlib.crc32(f"{TASK_NAME_AGGREGATE}:{granularity}".encode())
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        (acquired,) = cursor.fetchone()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+def _watermark_range(granularity: str, start_dt, end_dt):
+    """
+    Narrow a default range using the stored watermark. Returns the new
+    start, or None when the whole range was already rolled up.
+
+    NOTE(Ray): hour windows overlap between runs, so start from the last
+    run's reference time (minus _watermark_overlap(), floored to the hour so
+    no bucket is rewritten from partial rows). day/month windows are whole
+    past periods; they are re-aggregated until a run has happened at least
+    the overlap after their end, so late retried or buffered inserts are
+    included before later runs in the same period skip them.
+    """
+    until = (
+        LLMUsageSeriesWatermark.objects.filter(granularity=granularity)
+        .values_list("aggregated_until", flat=True)
+        .first()
+    )
+    if until is None:
+        return start_dt
+    lower = until - _watermark_overlap()
+    if lower >= end_dt:
+        return None
+    if granularity == SERIES_GRANULARITY_HOUR and lower > start_dt:
+        return lower.replace(minute=0, second=0, microsecond=0)
+    return start_dt
+
+
+def _has_usage(start_dt: datetime, end_dt: datetime) -> bool:
+    """Whether any LLMUsage row falls in [start_dt, end_dt]."""
+    return LLMUsage.objects.filter(
+        created_at__gte=start_dt, created_at__lte=end_dt
+    ).exists()
+
+
+def _run_one_granularity(
+    granularity: str,
+    start_date=None,
+    end_date=None,
+    now: Optional[datetime] = None,
+):
+    """
+    Run aggregation for one granularity; return upserted count, or None when
+    another run for the same granularity holds the lock.
+
+    Without explicit dates the default range is narrowed by the
+    granularity's watermark, which is advanced in the same transaction.
+    """
+    use_watermark = False
     if start_date and end_date:
         start_dt = parse_datetime(start_date)
         end_dt = parse_datetime(end_date)
@@ -100,14 +215,84 @@ def _run_one_granularity(granularity: str, start_date=None, end_date=None):
             start_dt = _ensure_aware_datetime(start_dt)
             end_dt = _ensure_aware_datetime(end_dt)
         else:
-            start_dt, end_dt = _default_range(granularity)
+            start_dt = end_dt = None
     else:
-        start_dt, end_dt = _default_range(granularity)
-    return aggregate_usage_to_series(
-        granularity=granularity,
-        start_date=start_dt,
-        end_date=end_dt,
-    )
+        start_dt = end_dt = None
+    if start_dt is None:
+        if now is None:
+            now = timezone.now()
+        start_dt, end_dt = _default_range(granularity, now)
+        use_watermark = True
+    with _series_lock(granularity) as acquired:
+        if not acquired:
+            logger.info(
+                f"aggregate granularity={granularity} skipped: "
+                "another run holds the lock"
+            )
+            return None
+        if use_watermark:
+            start_dt = _watermark_range(granularity, start_dt, end_dt)
+            if start_dt is None:
+                logger.info(
+                    f"aggregate granularity={granularity} skipped: "
+                    f"range ending {end_dt} already aggregated"
+                )
+                return 0
+        with transaction.atomic():
+            # NOTE(Ray): Idle deployments hit this every beat tick; one
+            # indexed EXISTS is cheaper than planning and running the GROUP BY.
+            # The watermark still advances so finished windows are skipped.
+            if end_dt < start_dt or not _has_usage(start_dt, end_dt):
+                n = 0
+            else:
+                n = aggregate_usage_to_series(
+                    granularity=granularity,
+                    start_date=start_dt,
+                    end_date=end_dt,
+                )
+            if use_watermark:
+                LLMUsageSeriesWatermark.objects.update_or_create(
+                    granularity=granularity,
+                    defaults={"aggregated_until": now},
+                )
+        return n
+
+
+ALL_GRANULARITIES = (
+    SERIES_GRANULARITY_HOUR,
+    SERIES_GRANULARITY_DAY,
+    SERIES_GRANULARITY_MONTH,
+)
+_VALID_GRANULARITIES = frozenset(ALL_GRANULARITIES)
+
+
+def _granularity_runs(
+    now: datetime,
+) -> Iterator[Tuple[str, Callable[[], Optional[int]]]]:
+    """
+    Yield (granularity, run) for hour, day and month; run() returns the
+    _run_one_granularity result.
+
+    NOTE(Ray): With AGENTCORE_METERING_PARALLEL_AGG all three are submitted
+    to worker threads (own DB connection each, closed afterwards) up front,
+    so run() only waits and wall time is the slowest granularity. Results
+    and errors are still consumed in hour/day/month order.
+    """
+    if not get_parallel_aggregation():
+        for gran in ALL_GRANULARITIES:
+            yield gran, partial(_run_one_granularity, gran, now=now)
+        return
+    with ThreadPoolExecutor(max_workers=len(ALL_GRANULARITIES)) as executor:
+        futures = {
+            gran: executor.submit(
+                _call_with_own_connection,
+                _run_one_granularity,
+                {"granularity": gran, "now": now},
+            )
+            for gran in ALL_GRANULARITIES
+        }
+        for gran, future in futures.items():
+            yield gran, future.result
 
 
 TASK_NAME_AGGREGATE = (
@@ -120,7 +305,7 @@ MODULE_AGENTCORE_METERING = "agentcore_metering"
 @shared_task(
     name=TASK_NAME_AGGREGATE,
     bind=True,
-    autoretry_for=(Exception,),
+    autoretry_for=RETRYABLE_TASK_ERRORS,
     retry_backoff=True,
     retry_backoff_max=600,
     retry_kwargs={"max_retries": 3},
@@ -134,8 +319,14 @@ def aggregate_llm_usage_series_task(
     """
     Aggregate LLMUsage into LLMUsageSeries. When granularity is omitted
     (e.g. from beat), run hour + day + month in one go. Otherwise run
-    the given granularity only. Registers this run in TaskExecution.
+    the given granularity only. Registers this run in TaskExecution; an
+    invalid granularity returns before that without writing a row.
     """
+    if granularity and granularity not in _VALID_GRANULARITIES:
+        logger.warning(
+            f"aggregate_llm_usage_series_task: invalid granularity={granularity}"
+        )
+        return {"upserted": 0, "error": "invalid_granularity"}
     from agentcore_task.adapters.django.services.task_tracker import (
         TaskTracker,
         register_task_execution,
@@ -159,14 +350,12 @@ def aggregate_llm_usage_series_task(
             "Starting aggregate_llm_usage_series_task (all granularities)"
         )
         total = 0
+        now = timezone.now()
+        gran = None
         try:
-            for gran in (
-                SERIES_GRANULARITY_HOUR,
-                SERIES_GRANULARITY_DAY,
-                SERIES_GRANULARITY_MONTH,
-            ):
-                n = _run_one_granularity(gran)
-                total += n
+            for gran, run in _granularity_runs(now):
+                n = run()
+                total += n or 0
                 logger.info(f"aggregate granularity={gran} upserted={n}")
             out = {"upserted": total, "granularity": "all"}
             TaskTracker.update_task_status(
@@ -184,27 +373,14 @@ def aggregate_llm_usage_series_task(
                 task_id,
                 TaskStatus.FAILURE,
                 error=str(e),
-                traceback="".join(
-                    tb.format_exception(type(e), e, e.__traceback__)
-                ),
+                traceback=_format_tb_limited(e),
             )
             raise
-    if granularity not in (
-        SERIES_GRANULARITY_HOUR,
-        SERIES_GRANULARITY_DAY,
-        SERIES_GRANULARITY_MONTH,
-    ):
-        logger.warning(
-            f"aggregate_llm_usage_series_task: invalid granularity={granularity}"
-        )
-        out = {"upserted": 0, "error": "invalid_granularity"}
-        TaskTracker.update_task_status(
-            task_id, TaskStatus.SUCCESS, result=out
-        )
-        return out
     try:
         n = _run_one_granularity(granularity, start_date, end_date)
-        out = {"upserted": n, "granularity": granularity}
+        out = {"upserted": n or 0, "granularity": granularity}
+        if n is None:
+            out["skipped"] = "locked"
         TaskTracker.update_task_status(
             task_id, TaskStatus.SUCCESS, result=out
         )
@@ -219,8 +395,6 @@ def aggregate_llm_usage_series_task(
             task_id,
             TaskStatus.FAILURE,
             error=str(e),
-            traceback="".join(
-                tb.format_exception(type(e), e, e.__traceback__)
-            ),
+            traceback=_format_tb_limited(e),
         )
         raise
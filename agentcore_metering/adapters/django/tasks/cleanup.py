@@ -3,12 +3,15 @@ Celery beat task: cleanup old LLM usage and series records.
 Uses agentcore_task TaskTracker so runs are recorded in TaskExecution.
 """
 import logging
-import traceback as tb
 
 from celery import shared_task
 
 from agentcore_metering.adapters.django.cleanup import cleanup_old_llm_usage
 from agentcore_metering.adapters.django.conf import get_cleanup_enabled
+from agentcore_metering.adapters.django.utils import (
+    RETRYABLE_TASK_ERRORS,
+    _format_tb_limited,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +25,7 @@ MODULE_AGENTCORE_METERING = "agentcore_metering"
 @shared_task(
     name=TASK_NAME,
     bind=True,
-    autoretry_for=(Exception,),
+    autoretry_for=RETRYABLE_TASK_ERRORS,
     retry_backoff=True,
     retry_backoff_max=600,
     retry_kwargs={"max_retries": 3},
@@ -34,8 +37,17 @@ def cleanup_old_llm_usage_task(
 ):
     """
     Celery task for cleanup. No-op if cleanup disabled.
-    Registers this run in TaskExecution (module=agentcore_metering).
+    Registers this run in TaskExecution (module=agentcore_metering); disabled
+    runs return before that and write no TaskExecution row.
     """
+    if not get_cleanup_enabled():
+        logger.info("Skipped cleanup_old_llm_usage_task: cleanup_disabled")
+        return {
+            "deleted_usage": 0,
+            "deleted_series": 0,
+            "skipped": True,
+            "reason": "cleanup_disabled",
+        }
     from agentcore_task.adapters.django.services.task_tracker import (
         TaskTracker,
         register_task_execution,
@@ -54,20 +66,6 @@ def cleanup_old_llm_usage_task(
         initial_status=TaskStatus.STARTED,
     )
     logger.info("Starting cleanup_old_llm_usage_task")
-    if not get_cleanup_enabled():
-        out = {
-            "deleted_usage": 0,
-            "deleted_series": 0,
-            "skipped": True,
-            "reason": "cleanup_disabled",
-        }
-        TaskTracker.update_task_status(
-            task_id, TaskStatus.SUCCESS, result=out
-        )
-        logger.info(
-            "Finished cleanup_old_llm_usage_task (skipped: cleanup_disabled)"
-        )
-        return out
     try:
         out = cleanup_old_llm_usage(
             retention_days=retention_days,
@@ -88,8 +86,6 @@ def cleanup_old_llm_usage_task(
             task_id,
             TaskStatus.FAILURE,
             error=str(e),
-            traceback="".join(
-                tb.format_exception(type(e), e, e.__traceback__)
-            ),
+            traceback=_format_tb_limited(e),
         )
         raise
@@ -0,0 +1,99 @@
+"""
+Celery task: persist one tracked LLMUsage row off the caller's thread.
+
+Enabled with AGENTCORE_METERING_ASYNC_USAGE_WRITES. The tracker builds the
+row (including id and created_at) before enqueueing, so the stored timing
+is the call's, and a redelivered message cannot insert a duplicate.
+The row is inserted before the task returns (never via the in-process write
+buffer), so acks_late only acks stored rows.
+Not recorded in TaskExecution: that would add a write per LLM call.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict
+from uuid import UUID
+
+from celery import shared_task
+from django.db import IntegrityError, OperationalError, transaction
+
+from agentcore_metering.adapters.django.conf import get_usage_write_queue
+from agentcore_metering.adapters.django.models import LLMUsage
+
+logger = logging.getLogger(__name__)
+
+TASK_NAME_SAVE_USAGE = (
+    "agentcore_metering.adapters.django.tasks.usage.save_llm_usage_task"
+)
+# Retry policy of save_llm_usage_task; the aggregation watermark overlap is
+# derived from it so rows inserted by a late retry are still rolled up.
+SAVE_USAGE_MAX_RETRIES = 3
+SAVE_USAGE_RETRY_BACKOFF_MAX = 600
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def usage_to_payload(usage: LLMUsage) -> Dict[str, Any]:
+    """JSON-serializable dict of the row's concrete field values."""
+    return {
+        field.attname: _json_safe(getattr(usage, field.attname))
+        for field in LLMUsage._meta.concrete_fields
+    }
+
+
+def usage_from_payload(payload: Dict[str, Any]) -> LLMUsage:
+    """Rebuild an unsaved LLMUsage from usage_to_payload output."""
+    return LLMUsage(
+        **{
+            field.attname: field.to_python(payload[field.attname])
+            for field in LLMUsage._meta.concrete_fields
+            if field.attname in payload
+        }
+    )
+
+
+def enqueue_usage_save(usage: LLMUsage) -> None:
+    """Send usage to save_llm_usage_task."""
+    options = {}
+    queue = get_usage_write_queue()
+    if queue:
+        options["queue"] = queue
+    save_llm_usage_task.apply_async(
+        args=[usage_to_payload(usage)], **options
+    )
+
+
+@shared_task(
+    name=TASK_NAME_SAVE_USAGE,
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    retry_backoff_max=SAVE_USAGE_RETRY_BACKOFF_MAX,
+    retry_kwargs={"max_retries": SAVE_USAGE_MAX_RETRIES},
+)
+def save_llm_usage_task(payload: Dict[str, Any]) -> None:
+    """
+    Insert one LLMUsage row. A duplicate id means it is already stored; any
+    other integrity error drops the row and is logged as an error.
+    """
+    usage = usage_from_payload(payload)
+    try:
+        with transaction.atomic():
+            usage.save(force_insert=True)
+    except IntegrityError as e:
+        # NOTE(Ray): Only a redelivery of a stored row is benign; any other
+        # violation (e.g. the user was deleted before the task ran) loses it.
+        if LLMUsage.objects.filter(pk=usage.pk).exists():
+            logger.info(
+                f"save_llm_usage_task: usage id={usage.pk} already stored"
+            )
+            return
+        logger.error(
+            f"save_llm_usage_task: dropped usage id={usage.pk}; error={e}"
+        )
@@ -1,42 +1,74 @@
 """
 LLM call tracker using LiteLLM: completion + usage and cost tracking.
 
-Uses litellm.completion(); token/cost extraction is delegated to llm_usage.
+Uses litellm.completion() (litellm.acompletion() for the async API);
+token/cost extraction is delegated to llm_usage.
 Applies a deterministic per-call retry budget. Handles AuthenticationError,
 RateLimitError, and APIError with distinct logging.
 """
 
+import asyncio
 import json
 import logging
 import re
+import sys
 import time
-from datetime import datetime
-from decimal import Decimal
-from typing import Any, Dict, Generator, Optional, Tuple, Union
-
-from django.db import transaction
-from django.utils import timezone
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, router, transaction
 from json_repair import repair_json
 
+from agentcore_metering.adapters.django.conf import (
+    get_async_usage_writes,
+    get_stream_prefetch,
+)
 from agentcore_metering.adapters.django.models import LLMUsage
 from agentcore_metering.adapters.django.services.runtime_config import (
     get_litellm_params,
 )
 from agentcore_metering.adapters.django.services.litellm_retry import (
+    acompletion_with_retry,
     completion_with_retry,
     iter_completion_with_retry,
 )
 from agentcore_metering.adapters.django.trackers.llm_usage import (
+    empty_usage_dict,
     fill_usage_with_token_fallback,
     usage_from_response,
     usage_from_stream_chunk,
 )
+from agentcore_metering.adapters.django.trackers.response_cache import (
+    get_cached_response,
+    response_cache_key,
+    set_cached_response,
+)
+from agentcore_metering.adapters.django.trackers.usage_buffer import (
+    buffer_usage,
+)
+from agentcore_metering.adapters.django.utils import (
+    _cache_hit_ratio,
+    _to_decimal,
+)
 from agentcore_metering.constants import DEFAULT_COST_CURRENCY
 
 logger = logging.getLogger(__name__)
 
 TASK_LLM_CALL = "llm_call"
+DEFAULT_BATCH_MAX_CONCURRENCY = 10
 JSON_RETRY_BASE_DELAY_SECONDS = 0.5
+# NOTE(Ray): Shared request defaults, passed by reference on every call.
+# LiteLLM only reads them; they stay plain dicts because provider code checks
+# isinstance(..., dict) and serializes them to JSON.
+_JSON_OBJECT_FORMAT = {"type": "json_object"}
+_STREAM_OPTIONS = {"include_usage": True}
+_STREAM_FLAGS = {"stream": True, "stream_options": _STREAM_OPTIONS}
+_NO_FLAGS: Dict[str, Any] = {}
 TRACEPARENT_PATTERN = re.compile(
     r"^00-[0-9a-f]{32}-[0-9a-f]{16}-0[01]$"
 )
@@ -58,57 +90,250 @@ def _raise_friendly(exc: Exception, friendly_errors: bool) -> None:
         raise friendly from exc
 
 
-def _default_usage_dict(model: str) -> Dict[str, Any]:
-    """Zero usage dict when no chunk/response usage is available."""
-    return {
-        "model": model,
-        "prompt_tokens": 0,
-        "completion_tokens": 0,
-        "total_tokens": 0,
-        "cached_tokens": 0,
-        "reasoning_tokens": 0,
-        "cost": None,
-        "cost_currency": DEFAULT_COST_CURRENCY,
+def _optional(**kwargs: Any) -> Dict[str, Any]:
+    """kwargs without the None values."""
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def _intern(value: Any) -> Any:
+    """
+    sys.intern() for plain str values (model, node name, currency), which
+    repeat on every usage row and state["llm_calls"] entry; others as-is.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+def _datetime_from_ns(ns: Optional[int]) -> Optional[datetime]:
+    """
+    Datetime for a time.time_ns() stamp, aware (UTC) or naive like
+    timezone.now() depending on USE_TZ.
+
+    NOTE(Ray): The call path only stamps integers; the conversion runs once
+    per recorded call instead of on the request and first-chunk hot paths.
+    """
+    if ns is None:
+        return None
+    seconds, rem = divmod(ns, 1_000_000_000)
+    tz = dt_timezone.utc if settings.USE_TZ else None
+    return datetime.fromtimestamp(seconds, tz=tz).replace(
+        microsecond=rem // 1000
+    )
+
+
+# State keys copied verbatim into LLMUsage.metadata when truthy.
+_STATE_METADATA_KEYS = ("source_type", "source_path")
+# First truthy one becomes metadata["source_task_id"].
+_SOURCE_TASK_ID_KEYS = ("source_task_id", "celery_task_id", "task_id")
+
+
+def _usage_metadata(
+    state: Dict[str, Any], node_name: str, response_model: Any
+) -> Dict[str, Any]:
+    """
+    LLMUsage.metadata for one call: node/source fields present in state
+    (one lookup each), response_model, then state["metadata"] on top.
+    """
+    metadata = {
+        key: value
+        for key in _STATE_METADATA_KEYS
+        if (value := state.get(key))
     }
+    if node_name and node_name != "unknown":
+        metadata["node_name"] = node_name
+    for key in _SOURCE_TASK_ID_KEYS:
+        source_task_id = state.get(key)
+        if source_task_id:
+            metadata["source_task_id"] = str(source_task_id)
+            break
+    if response_model:
+        response_model = str(response_model).strip()
+        if response_model:
+            metadata["response_model"] = response_model
+    extra = state.get("metadata")
+    if extra and isinstance(extra, dict):
+        metadata.update(extra)
+    return metadata
+
+
+@dataclass
+class UsageRecord:
+    """
+    Metered fields of one LLM call, built once and fed to both
+    state["llm_calls"] and the LLMUsage row. cost is normalized to Decimal
+    (or None when unparsable) on construction; the state entry gets it as a
+    float so agent state stays JSON-serializable.
+    """
+
+    model: str = "unknown"
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+    reasoning_tokens: int = 0
+    cost: Optional[Decimal] = None
+    cost_currency: str = DEFAULT_COST_CURRENCY
+    success: bool = True
+    error: Optional[str] = None
+    started_at: Any = None
+    is_streaming: bool = False
+    first_chunk_at: Optional[datetime] = None
+    response_model: Any = None
+    is_cached: bool = False
+
+    def __post_init__(self) -> None:
+        if self.cost is not None:
+            try:
+                self.cost = _to_decimal(self.cost)
+            except (TypeError, ValueError, InvalidOperation):
+                self.cost = None
+        if not self.cost_currency:
+            self.cost_currency = DEFAULT_COST_CURRENCY
+        self.model = _intern(self.model)
+        self.cost_currency = _intern(self.cost_currency)
+
+    @classmethod
+    def from_usage(
+        cls, usage: Dict[str, Any], model: str, **kwargs: Any
+    ) -> "UsageRecord":
+        """Record for a completed call from a normalized usage dict."""
+        return cls(
+            model=model,
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+            total_tokens=usage["total_tokens"],
+            cached_tokens=usage["cached_tokens"],
+            reasoning_tokens=usage["reasoning_tokens"],
+            cost=usage.get("cost"),
+            cost_currency=usage.get("cost_currency", DEFAULT_COST_CURRENCY),
+            **kwargs,
+        )
 
+    def as_call_dict(self, node_name: str) -> Dict[str, Any]:
+        """Entry appended to state["llm_calls"]."""
+        return {
+            "node": node_name,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "reasoning_tokens": self.reasoning_tokens,
+            "cost": float(self.cost) if self.cost is not None else None,
+            "cost_currency": self.cost_currency,
+            "success": self.success,
+            "error": self.error,
+            "is_cached": self.is_cached,
+        }
 
-def _record_failed_llm_call(
+
+def _record_llm_call(
     *,
     effective_state: Dict[str, Any],
     state: Optional[Dict],
-    request_started_at: Any,
-    node_name: str,
-    is_streaming: bool,
-    error_msg: str,
+    rec: UsageRecord,
 ) -> None:
-    """Record a failed LLM call into state and DB. Does not raise."""
+    """
+    Record one LLM call: append it to state["llm_calls"] and persist it,
+    both from the same UsageRecord. Does not raise on DB errors.
+    """
     if state is not None:
         state.setdefault("llm_calls", []).append(
-            {
-                "node": node_name,
-                "model": "unknown",
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-                "total_tokens": 0,
-                "success": False,
-                "error": error_msg,
-            }
+            rec.as_call_dict(
+                _intern(effective_state.get("node_name", "unknown"))
+            )
         )
     LLMTracker._save_usage_to_db(
         state=effective_state,
-        model="unknown",
-        prompt_tokens=0,
-        completion_tokens=0,
-        total_tokens=0,
-        cached_tokens=0,
-        reasoning_tokens=0,
-        cost=None,
-        cost_currency=DEFAULT_COST_CURRENCY,
-        success=False,
-        error=error_msg,
-        started_at=request_started_at,
+        model=rec.model,
+        prompt_tokens=rec.prompt_tokens,
+        completion_tokens=rec.completion_tokens,
+        total_tokens=rec.total_tokens,
+        cached_tokens=rec.cached_tokens,
+        reasoning_tokens=rec.reasoning_tokens,
+        cost=rec.cost,
+        cost_currency=rec.cost_currency,
+        success=rec.success,
+        error=rec.error,
+        started_at=rec.started_at,
+        is_streaming=rec.is_streaming,
+        first_chunk_at=rec.first_chunk_at,
+        response_model=rec.response_model,
+        is_cached=rec.is_cached,
+    )
+
+
+def _record_failed_llm_call(
+    *,
+    effective_state: Dict[str, Any],
+    state: Optional[Dict],
+    request_started_ns: Optional[int],
+    is_streaming: bool,
+    error_msg: str,
+) -> None:
+    """Record a failed LLM call into state and DB. Does not raise."""
+    _record_llm_call(
+        effective_state=effective_state,
+        state=state,
+        rec=UsageRecord(
+            success=False,
+            error=error_msg,
+            started_at=_datetime_from_ns(request_started_ns),
+            is_streaming=is_streaming,
+        ),
+    )
+
+
+def _log_and_record_failure(
+    exc: Exception,
+    *,
+    effective_state: Dict[str, Any],
+    state: Optional[Dict],
+    request_started_ns: Optional[int],
+    is_streaming: bool,
+    started_monotonic: float,
+    friendly_errors: bool,
+) -> None:
+    """
+    Shared failure path for both call branches: log by provider error class
+    (authentication / rate limit / API error / other), record the failed
+    call, then raise a friendly error when opted in. The caller re-raises.
+    """
+    from litellm import APIError, AuthenticationError, RateLimitError
+
+    node = effective_state.get("node_name", "unknown")
+    prefix = "stream, " if is_streaming else ""
+    duration_s = time.monotonic() - started_monotonic
+    error_type = ""
+    if isinstance(exc, AuthenticationError):
+        log, label = logger.error, f" ({prefix}authentication)"
+    elif isinstance(exc, RateLimitError):
+        log, label = logger.warning, f" ({prefix}rate limit)"
+    elif isinstance(exc, APIError):
+        log, label = logger.error, f" ({prefix}API error)"
+    else:
+        log = logger.error
+        label = " (stream)" if is_streaming else ""
+        error_type = f"error_type={type(exc).__name__} "
+    # NOTE(Ray): One record carries both the message and the traceback;
+    # a separate logger.exception(exc) formatted the traceback twice.
+    log(
+        "Failed %s%s node_name=%s %serror=%s duration_s=%.3f",
+        TASK_LLM_CALL,
+        label,
+        node,
+        error_type,
+        exc,
+        duration_s,
+        exc_info=exc,
+    )
+    _record_failed_llm_call(
+        effective_state=effective_state,
+        state=state,
+        request_started_ns=request_started_ns,
         is_streaming=is_streaming,
+        error_msg=str(exc),
     )
+    _raise_friendly(exc, friendly_errors)
 
 
 def _repair_json_obj(content: str) -> str:
@@ -118,7 +343,8 @@ def _repair_json_obj(content: str) -> str:
     Returns repaired JSON string when validation succeeds.
     Raises ValueError when content cannot be repaired to valid JSON object.
     """
-    if not content or not str(content).strip():
+    normalized = str(content).strip() if content else ""
+    if not normalized:
         # Distinct wording from the provider-level empty-response error in
         # _call_and_track_non_stream_once: reaching here means the provider
         # call itself succeeded with non-empty content at least once, so
@@ -126,7 +352,6 @@ def _repair_json_obj(content: str) -> str:
         # fired. (In practice the provider-level check short-circuits first.)
         raise ValueError("LLM returned empty response (empty JSON payload)")
 
-    normalized = str(content).strip()
     if normalized.startswith("```json"):
         normalized = normalized[7:]
     if normalized.startswith("```"):
@@ -208,6 +433,52 @@ def _assistant_message_payload(
     return payload
 
 
+# Backends where any failed statement aborts the enclosing transaction.
+_ABORTING_VENDORS = frozenset({"postgresql"})
+
+
+@lru_cache(maxsize=None)
+def _usage_insert_sql(alias: str) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    INSERT statement and field list for one LLMUsage row on connection
+    alias, built once per alias.
+    """
+    qn = connections[alias].ops.quote_name
+    fields = tuple(LLMUsage._meta.concrete_fields)
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        qn(LLMUsage._meta.db_table),
+        ", ".join(qn(f.column) for f in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    return sql, fields
+
+
+def _insert_usage(usage: LLMUsage) -> None:
+    """
+    Insert usage with a precompiled statement instead of Model.save().
+
+    NOTE(Ray): The tracker writes each row once and never reads it back, so
+    save()'s signals and per-call SQL compilation are skipped. Values still
+    go through pre_save/get_db_prep_save so defaults and JSON/decimal/
+    datetime adaptation match the ORM. The pk is a client-side uuid4, so no
+    RETURNING is needed. A savepoint is taken only inside a caller's
+    transaction on backends where a failed statement aborts it (PostgreSQL),
+    so a failed insert swallowed by _save_usage_to_db leaves it usable;
+    elsewhere the failed statement is rolled back on its own, and under
+    autocommit the single INSERT is already atomic.
+    """
+    alias = router.db_for_write(LLMUsage, instance=usage)
+    conn = connections[alias]
+    sql, fields = _usage_insert_sql(alias)
+    params = [f.get_db_prep_save(f.pre_save(usage, True), conn) for f in fields]
+    if conn.in_atomic_block and conn.vendor in _ABORTING_VENDORS:
+        with transaction.atomic(using=alias), conn.cursor() as cursor:
+            cursor.execute(sql, params)
+    else:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
 class LLMTracker:
     """
     LLM call tracker via LiteLLM with usage and cost (reference pricing).
@@ -232,6 +503,7 @@ class LLMTracker:
         return_message: bool = False,
         strict_user_scope: bool = False,
         friendly_errors: bool = False,
+        cache_key: Union[bool, str, None] = None,
     ) -> Union[
         Tuple[str, Dict[str, Any]],
         Generator[str, None, Dict[str, Any]],
@@ -250,72 +522,30 @@ class LLMTracker:
 
         usage_dict contains: model, prompt_tokens, completion_tokens,
         total_tokens, cached_tokens, reasoning_tokens, cost, cost_currency.
+
+        cache_key (non-stream only, opt-in): True keys the response cache on
+        the request fields, a str is the caller's own key. A hit returns the
+        cached content without calling the provider, records a zero-cost
+        LLMUsage row with is_cached=True, and its usage_dict has zero tokens
+        and from_cache=True.
         """
         if not messages:
             raise ValueError("Messages cannot be empty")
 
-        user_id = state.get("user_id") if state else None
-        params = get_litellm_params(
-            user_id=user_id, model_uuid=model_uuid, strict_user_scope=strict_user_scope
-        )
-        model = params.get("model", "unknown")
-
-        if max_tokens is not None:
-            params["max_tokens"] = max_tokens
-        if temperature is not None:
-            params["temperature"] = temperature
-        if top_p is not None:
-            params["top_p"] = top_p
-        if tools is not None:
-            params["tools"] = tools
-        if tool_choice is not None:
-            params["tool_choice"] = tool_choice
-
-        if json_mode:
-            if response_format is None:
-                response_format = {"type": "json_object"}
-            params["response_format"] = response_format
-        elif response_format is not None:
-            params["response_format"] = response_format
-
-        params["messages"] = messages
-        state_node = None
-        if isinstance(state, dict):
-            state_node = state.get("node_name")
-        effective_state = {
-            **(state or {}),
-            "node_name": (state_node if state_node else node_name),
-        }
-        litellm_metadata = effective_state.get("litellm_metadata")
-        if isinstance(litellm_metadata, dict) and litellm_metadata:
-            existing_metadata = params.get("metadata")
-            if not isinstance(existing_metadata, dict):
-                existing_metadata = {}
-            params["metadata"] = {
-                **existing_metadata,
-                **litellm_metadata,
-            }
-        traceparent = effective_state.get("otel_traceparent")
-        if isinstance(traceparent, str) and TRACEPARENT_PATTERN.fullmatch(
-            traceparent
-        ):
-            proxy_request = params.get("proxy_server_request")
-            if not isinstance(proxy_request, dict):
-                proxy_request = {}
-            proxy_headers = proxy_request.get("headers")
-            if not isinstance(proxy_headers, dict):
-                proxy_headers = {}
-            params["proxy_server_request"] = {
-                **proxy_request,
-                "headers": {
-                    **proxy_headers,
-                    "traceparent": traceparent,
-                },
-            }
-        logger.info(
-            f"Starting {TASK_LLM_CALL} node_name={node_name} "
-            f"model={model} message_count={len(messages)} "
-            f"timeout={params.get('timeout')}"
+        params, model, effective_state = LLMTracker._prepare_call(
+            messages,
+            json_mode=json_mode,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            response_format=response_format,
+            node_name=node_name,
+            state=state,
+            model_uuid=model_uuid,
+            tools=tools,
+            tool_choice=tool_choice,
+            strict_user_scope=strict_user_scope,
+            stream=stream,
         )
         do_json_repair = json_mode if json_repair is None else json_repair
         max_json_attempts = max(1, int(json_attempts))
@@ -323,20 +553,67 @@ class LLMTracker:
         if stream:
             if do_json_repair and json_mode:
                 logger.warning(
-                    "JSON repair is skipped for streaming "
-                    f"calls; node_name={node_name}"
+                    "JSON repair is skipped for streaming calls; node_name=%s",
+                    node_name,
                 )
-            request_started_at = timezone.now()
+            request_started_ns = time.time_ns()
             return LLMTracker._call_and_track_stream(
                 params=params,
                 effective_state=effective_state,
-                request_started_at=request_started_at,
+                request_started_ns=request_started_ns,
                 node_name=node_name,
                 state=state,
                 model=model,
                 friendly_errors=friendly_errors,
             )
-        if not do_json_repair or not json_mode:
+        repair = do_json_repair and json_mode
+        response_key = None
+        if cache_key:
+            response_key = response_cache_key(
+                cache_key,
+                params,
+                json_repair=repair,
+                return_message=return_message,
+            )
+            cached = get_cached_response(response_key)
+            if cached is not None:
+                return LLMTracker._serve_cached_response(
+                    cached,
+                    effective_state=effective_state,
+                    node_name=node_name,
+                    state=state,
+                    model=model,
+                )
+        content, usage = LLMTracker._call_and_track_non_stream(
+            params=params,
+            effective_state=effective_state,
+            node_name=node_name,
+            state=state,
+            model=model,
+            return_message=return_message,
+            friendly_errors=friendly_errors,
+            json_attempts=max_json_attempts if repair else None,
+        )
+        if response_key is not None:
+            set_cached_response(response_key, content)
+        return content, usage
+
+    @staticmethod
+    def _call_and_track_non_stream(
+        params: Dict[str, Any],
+        effective_state: Dict[str, Any],
+        node_name: str,
+        state: Optional[Dict],
+        model: str,
+        return_message: bool,
+        friendly_errors: bool,
+        json_attempts: Optional[int],
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Non-stream call; with json_attempts set, repair and validate the
+        JSON object and retry the call up to json_attempts times.
+        """
+        if json_attempts is None:
             return LLMTracker._call_and_track_non_stream_once(
                 params=params,
                 effective_state=effective_state,
@@ -347,7 +624,7 @@ class LLMTracker:
                 friendly_errors=friendly_errors,
             )
 
-        total_attempts = max_json_attempts
+        total_attempts = json_attempts
         last_error: Optional[ValueError] = None
         for attempt_idx in range(total_attempts):
             content, usage = LLMTracker._call_and_track_non_stream_once(
@@ -370,10 +647,13 @@ class LLMTracker:
                     2**attempt_idx
                 )
                 logger.warning(
-                    f"JSON parse validation failed "
-                    f"(attempt {attempt_idx + 1}/{total_attempts}) "
-                    f"node_name={node_name}: {e}. "
-                    f"Retrying in {delay_seconds:.1f}s"
+                    "JSON parse validation failed (attempt %s/%s) "
+                    "node_name=%s: %s. Retrying in %.1fs",
+                    attempt_idx + 1,
+                    total_attempts,
+                    node_name,
+                    e,
+                    delay_seconds,
                 )
                 time.sleep(delay_seconds)
 
@@ -383,192 +663,425 @@ class LLMTracker:
         )
 
     @staticmethod
-    def _call_and_track_non_stream_once(
-        params: Dict[str, Any],
+    def _serve_cached_response(
+        cached: Dict[str, Any],
+        *,
         effective_state: Dict[str, Any],
         node_name: str,
         state: Optional[Dict],
         model: str,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Return a response-cache hit and record it as a zero-cost call, so
+        call counts still include it while tokens and cost do not.
+        """
+        rec = UsageRecord(
+            model=model,
+            cost=Decimal(0),
+            started_at=_datetime_from_ns(time.time_ns()),
+            is_cached=True,
+        )
+        _record_llm_call(effective_state=effective_state, state=state, rec=rec)
+        logger.info(
+            "Finished %s (cached) node_name=%s model=%s",
+            TASK_LLM_CALL,
+            node_name,
+            model,
+        )
+        usage = empty_usage_dict(model)
+        usage["cost"] = 0.0
+        usage["from_cache"] = True
+        return cached["content"], usage
+
+    @staticmethod
+    async def acall_and_track(
+        messages: list,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        response_format: Optional[Dict] = None,
+        node_name: str = "unknown",
+        state: Optional[Dict] = None,
+        model_uuid: Optional[str] = None,
+        json_repair: Optional[bool] = None,
+        json_attempts: int = 3,
+        tools: Optional[list] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
         return_message: bool = False,
+        strict_user_scope: bool = False,
         friendly_errors: bool = False,
-    ) -> Tuple[str, Dict[str, Any]]:
-        """Single non-stream LLM call + metering persistence."""
-        import litellm
-        from litellm import APIError, AuthenticationError, RateLimitError
-        request_started_at = timezone.now()
-        try:
-            response = completion_with_retry(litellm.completion, params)
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Async call_and_track (non-stream only) via litellm.acompletion.
 
-            if response is None:
-                logger.error(f"LiteLLM returned None; node_name={node_name}")
-                raise ValueError(
-                    f"[{node_name}] LLM service returned None response"
-                )
+        Same arguments and return value as call_and_track with stream=False.
+        Config lookup and usage persistence are ORM work and run through
+        sync_to_async; only the provider request itself is awaited on the
+        event loop, so concurrent calls overlap their network latency.
+        """
+        if not messages:
+            raise ValueError("Messages cannot be empty")
 
-            choice = (response.choices or [None])[0]
-            if not choice or not getattr(choice, "message", None):
-                raise ValueError(
-                    f"LLM returned empty response "
-                    f"(no message in choice; node_name={node_name} "
-                    f"model={model})"
-                )
-            msg = choice.message
-            content = getattr(msg, "content", None) or ""
-            tool_calls = _extract_tool_calls(msg)
-            if not (content and str(content).strip()) and not tool_calls:
-                # Carry the diagnostic in the exception message, not just a
-                # log line: callers routinely catch this and re-log only
-                # str(e) (losing the traceback), and the warning below can be
-                # invisible entirely if this logger isn't wired to a handler.
-                # Putting finish_reason inline is what makes the cause
-                # ("length" = output budget exhausted, typically by reasoning
-                # tokens, vs "content_filter" vs provider quirk) visible in
-                # error trackers instead of needing a repro.
-                finish_reason = getattr(choice, "finish_reason", None)
-                reasoning = getattr(msg, "reasoning_content", None)
-                diagnostics = (
-                    f"finish_reason={finish_reason!r} "
-                    f"has_reasoning_content={bool(reasoning)} "
-                    f"reasoning_len={len(reasoning) if reasoning else 0} "
-                    f"model={model}"
+        params, model, effective_state = await sync_to_async(
+            LLMTracker._prepare_call
+        )(
+            messages,
+            json_mode=json_mode,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            response_format=response_format,
+            node_name=node_name,
+            state=state,
+            model_uuid=model_uuid,
+            tools=tools,
+            tool_choice=tool_choice,
+            strict_user_scope=strict_user_scope,
+        )
+        do_json_repair = json_mode if json_repair is None else json_repair
+        if not do_json_repair or not json_mode:
+            return await LLMTracker._acall_and_track_non_stream_once(
+                params=params,
+                effective_state=effective_state,
+                node_name=node_name,
+                state=state,
+                model=model,
+                return_message=return_message,
+                friendly_errors=friendly_errors,
+            )
+
+        total_attempts = max(1, int(json_attempts))
+        last_error: Optional[ValueError] = None
+        for attempt_idx in range(total_attempts):
+            content, usage = await LLMTracker._acall_and_track_non_stream_once(
+                params=params,
+                effective_state=effective_state,
+                node_name=node_name,
+                state=state,
+                model=model,
+                return_message=False,
+                friendly_errors=friendly_errors,
+            )
+            try:
+                return _repair_json_obj(content), usage
+            except ValueError as e:
+                last_error = e
+                if attempt_idx >= total_attempts - 1:
+                    break
+                delay_seconds = JSON_RETRY_BASE_DELAY_SECONDS * (
+                    2**attempt_idx
                 )
                 logger.warning(
-                    f"[{node_name}] LLM returned empty content — {diagnostics}"
-                )
-                raise ValueError(
-                    f"LLM returned empty response ({diagnostics})"
+                    "JSON parse validation failed (attempt %s/%s) "
+                    "node_name=%s: %s. Retrying in %.1fs",
+                    attempt_idx + 1,
+                    total_attempts,
+                    node_name,
+                    e,
+                    delay_seconds,
                 )
+                await asyncio.sleep(delay_seconds)
 
-            usage = usage_from_response(response, model)
-            usage = fill_usage_with_token_fallback(
-                usage,
-                model,
-                messages=params.get("messages"),
-                content=str(content).strip() if content else None,
-            )
-            cost = (
-                Decimal(str(usage["cost"]))
-                if usage.get("cost") is not None
-                else None
-            )
-            cost_currency = usage.get("cost_currency", DEFAULT_COST_CURRENCY)
-            response_model_raw = getattr(response, "model", None)
-
-            if state is not None:
-                state.setdefault("llm_calls", []).append(
-                    {
-                        "node": effective_state.get("node_name", "unknown"),
-                        "model": usage["model"],
-                        "prompt_tokens": usage["prompt_tokens"],
-                        "completion_tokens": usage["completion_tokens"],
-                        "total_tokens": usage["total_tokens"],
-                        "cached_tokens": usage["cached_tokens"],
-                        "reasoning_tokens": usage["reasoning_tokens"],
-                        "cost": usage.get("cost"),
-                        "cost_currency": usage.get("cost_currency"),
-                        "success": True,
-                        "error": None,
-                    }
-                )
+        raise ValueError(
+            f"[{node_name}] Invalid JSON response after {total_attempts} "
+            f"attempts: {last_error}"
+        )
 
-            LLMTracker._save_usage_to_db(
-                state=effective_state,
-                model=model,
-                prompt_tokens=usage["prompt_tokens"],
-                completion_tokens=usage["completion_tokens"],
-                total_tokens=usage["total_tokens"],
-                cached_tokens=usage["cached_tokens"],
-                reasoning_tokens=usage["reasoning_tokens"],
-                cost=cost,
-                cost_currency=cost_currency,
-                success=True,
-                error=None,
-                started_at=request_started_at,
-                is_streaming=False,
-                response_model=response_model_raw,
-            )
+    @staticmethod
+    async def abatch_call_and_track(
+        requests: List[Dict[str, Any]],
+        *,
+        max_concurrency: int = DEFAULT_BATCH_MAX_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run acall_and_track for each kwargs dict in requests, at most
+        max_concurrency at a time. Results keep the order of requests; with
+        return_exceptions=True a failed call yields its exception in place
+        instead of aborting the gather.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-            logger.info(
-                f"Finished {TASK_LLM_CALL} node_name={node_name} "
-                f"model={usage['model']} total_tokens={usage['total_tokens']} "
-                f"cost={cost} {cost_currency}"
-            )
-            if return_message:
-                return _assistant_message_payload(
-                    msg,
-                    getattr(choice, "finish_reason", None),
-                ), usage
-            return str(content), usage
-
-        except AuthenticationError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} (authentication) "
-                f"node_name={node} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
+        async def _limited(kwargs: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await LLMTracker.acall_and_track(**kwargs)
+
+        return await asyncio.gather(
+            *(_limited(kwargs) for kwargs in requests),
+            return_exceptions=return_exceptions,
+        )
+
+    @staticmethod
+    async def _acall_and_track_non_stream_once(
+        params: Dict[str, Any],
+        effective_state: Dict[str, Any],
+        node_name: str,
+        state: Optional[Dict],
+        model: str,
+        return_message: bool = False,
+        friendly_errors: bool = False,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Async _call_and_track_non_stream_once."""
+        import litellm
+
+        request_started_ns = time.time_ns()
+        t0 = time.monotonic()
+        try:
+            response = await acompletion_with_retry(litellm.acompletion, params)
+            return await sync_to_async(LLMTracker._finish_non_stream)(
+                response,
+                params=params,
                 effective_state=effective_state,
+                node_name=node_name,
                 state=state,
-                request_started_at=request_started_at,
-                node_name=node,
-                is_streaming=False,
-                error_msg=str(e),
-            )
-            _raise_friendly(e, friendly_errors)
-            raise
-        except RateLimitError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.warning(
-                f"Failed {TASK_LLM_CALL} (rate limit) "
-                f"node_name={node} error={e}"
+                model=model,
+                return_message=return_message,
+                request_started_ns=request_started_ns,
+                started_monotonic=t0,
             )
-            logger.exception(e)
-            _record_failed_llm_call(
+        except Exception as e:
+            await sync_to_async(_log_and_record_failure)(
+                e,
                 effective_state=effective_state,
                 state=state,
-                request_started_at=request_started_at,
-                node_name=node,
+                request_started_ns=request_started_ns,
                 is_streaming=False,
-                error_msg=str(e),
+                started_monotonic=t0,
+                friendly_errors=friendly_errors,
             )
-            _raise_friendly(e, friendly_errors)
             raise
-        except APIError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} (API error) "
-                f"node_name={node} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
+
+    @staticmethod
+    def _prepare_call(
+        messages: list,
+        *,
+        json_mode: bool,
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        top_p: Optional[float],
+        response_format: Optional[Dict],
+        node_name: str,
+        state: Optional[Dict],
+        model_uuid: Optional[str],
+        tools: Optional[list],
+        tool_choice: Optional[Union[str, Dict[str, Any]]],
+        strict_user_scope: bool,
+        stream: bool = False,
+    ) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+        """
+        Resolve LiteLLM params for one call and the state it is metered
+        under. Returns (params, model, effective_state).
+
+        NOTE(Ray): params is a new dict built in one merge over the resolved
+        config, stream flags included, so the config dict is never modified
+        and the stream path needs no second copy.
+        """
+        user_id = state.get("user_id") if state else None
+        base_params = get_litellm_params(
+            user_id=user_id, model_uuid=model_uuid, strict_user_scope=strict_user_scope
+        )
+        model = _intern(base_params.get("model", "unknown"))
+        if json_mode and response_format is None:
+            response_format = _JSON_OBJECT_FORMAT
+        params = {
+            **base_params,
+            **_optional(
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                tools=tools,
+                tool_choice=tool_choice,
+                response_format=response_format,
+            ),
+            "messages": messages,
+            **(_STREAM_FLAGS if stream else _NO_FLAGS),
+        }
+        # NOTE(Ray): effective_state is only read downstream, so reuse the
+        # caller's dict when it already names the node instead of copying.
+        if isinstance(state, dict) and state.get("node_name"):
+            effective_state = state
+        else:
+            effective_state = {**(state or {}), "node_name": node_name}
+        litellm_metadata = effective_state.get("litellm_metadata")
+        if isinstance(litellm_metadata, dict) and litellm_metadata:
+            existing_metadata = params.get("metadata")
+            if not isinstance(existing_metadata, dict):
+                existing_metadata = {}
+            params["metadata"] = {
+                **existing_metadata,
+                **litellm_metadata,
+            }
+        traceparent = effective_state.get("otel_traceparent")
+        if isinstance(traceparent, str) and TRACEPARENT_PATTERN.fullmatch(
+            traceparent
+        ):
+            proxy_request = params.get("proxy_server_request")
+            if not isinstance(proxy_request, dict):
+                proxy_request = {}
+            proxy_headers = proxy_request.get("headers")
+            if not isinstance(proxy_headers, dict):
+                proxy_headers = {}
+            params["proxy_server_request"] = {
+                **proxy_request,
+                "headers": {
+                    **proxy_headers,
+                    "traceparent": traceparent,
+                },
+            }
+        # NOTE(Ray): Per-call logs on the success path use lazy %-args so
+        # nothing is formatted when INFO is disabled.
+        logger.info(
+            "Starting %s node_name=%s model=%s message_count=%s timeout=%s",
+            TASK_LLM_CALL,
+            node_name,
+            model,
+            len(messages),
+            params.get("timeout"),
+        )
+        return params, model, effective_state
+
+    @staticmethod
+    def _call_and_track_non_stream_once(
+        params: Dict[str, Any],
+        effective_state: Dict[str, Any],
+        node_name: str,
+        state: Optional[Dict],
+        model: str,
+        return_message: bool = False,
+        friendly_errors: bool = False,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Single non-stream LLM call + metering persistence."""
+        import litellm
+
+        request_started_ns = time.time_ns()
+        # NOTE(Ray): started_at stays wall-clock for the DB; log durations
+        # use the monotonic clock.
+        t0 = time.monotonic()
+        try:
+            response = completion_with_retry(litellm.completion, params)
+            return LLMTracker._finish_non_stream(
+                response,
+                params=params,
                 effective_state=effective_state,
+                node_name=node_name,
                 state=state,
-                request_started_at=request_started_at,
-                node_name=node,
-                is_streaming=False,
-                error_msg=str(e),
+                model=model,
+                return_message=return_message,
+                request_started_ns=request_started_ns,
+                started_monotonic=t0,
             )
-            _raise_friendly(e, friendly_errors)
-            raise
         except Exception as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} node_name={node} "
-                f"error_type={type(e).__name__} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
+            _log_and_record_failure(
+                e,
                 effective_state=effective_state,
                 state=state,
-                request_started_at=request_started_at,
-                node_name=node,
+                request_started_ns=request_started_ns,
                 is_streaming=False,
-                error_msg=str(e),
+                started_monotonic=t0,
+                friendly_errors=friendly_errors,
             )
-            _raise_friendly(e, friendly_errors)
             raise
 
+    @staticmethod
+    def _finish_non_stream(
+        response: Any,
+        *,
+        params: Dict[str, Any],
+        effective_state: Dict[str, Any],
+        node_name: str,
+        state: Optional[Dict],
+        model: str,
+        return_message: bool,
+        request_started_ns: int,
+        started_monotonic: float,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Validate a non-stream completion response, record its usage and
+        return (content or assistant message, usage). Raises ValueError on
+        an empty response.
+        """
+        if response is None:
+            logger.error(f"LiteLLM returned None; node_name={node_name}")
+            raise ValueError(
+                f"[{node_name}] LLM service returned None response"
+            )
+
+        choice = (response.choices or [None])[0]
+        if not choice or not getattr(choice, "message", None):
+            raise ValueError(
+                f"LLM returned empty response "
+                f"(no message in choice; node_name={node_name} "
+                f"model={model})"
+            )
+        msg = choice.message
+        content = getattr(msg, "content", None) or ""
+        if not isinstance(content, str):
+            content = str(content)
+        tool_calls = _extract_tool_calls(msg)
+        # NOTE(Ray): isspace() stops at the first visible character, so a
+        # long body is not copied by strip() just to test for emptiness.
+        if (not content or content.isspace()) and not tool_calls:
+            # Carry the diagnostic in the exception message, not just a
+            # log line: callers routinely catch this and re-log only
+            # str(e) (losing the traceback), and the warning below can be
+            # invisible entirely if this logger isn't wired to a handler.
+            # Putting finish_reason inline is what makes the cause
+            # ("length" = output budget exhausted, typically by reasoning
+            # tokens, vs "content_filter" vs provider quirk) visible in
+            # error trackers instead of needing a repro.
+            finish_reason = getattr(choice, "finish_reason", None)
+            reasoning = getattr(msg, "reasoning_content", None)
+            diagnostics = (
+                f"finish_reason={finish_reason!r} "
+                f"has_reasoning_content={bool(reasoning)} "
+                f"reasoning_len={len(reasoning) if reasoning else 0} "
+                f"model={model}"
+            )
+            logger.warning(
+                f"[{node_name}] LLM returned empty content — {diagnostics}"
+            )
+            raise ValueError(
+                f"LLM returned empty response ({diagnostics})"
+            )
+
+        usage = usage_from_response(response, model)
+        usage = fill_usage_with_token_fallback(
+            usage,
+            model,
+            messages=params.get("messages"),
+            content=content,
+        )
+        rec = UsageRecord.from_usage(
+            usage,
+            model,
+            started_at=_datetime_from_ns(request_started_ns),
+            response_model=getattr(response, "model", None),
+        )
+        _record_llm_call(
+            effective_state=effective_state, state=state, rec=rec
+        )
+
+        logger.info(
+            "Finished %s node_name=%s model=%s total_tokens=%s cost=%s %s "
+            "duration_s=%.3f",
+            TASK_LLM_CALL,
+            node_name,
+            usage["model"],
+            usage["total_tokens"],
+            rec.cost,
+            rec.cost_currency,
+            time.monotonic() - started_monotonic,
+        )
+        if return_message:
+            return _assistant_message_payload(
+                msg,
+                getattr(choice, "finish_reason", None),
+            ), usage
+        return content, usage
+
     @staticmethod
     def _save_usage_to_db(
         state: Optional[Dict] = None,
@@ -587,6 +1100,7 @@ class LLMTracker:
         is_streaming: bool = False,
         first_chunk_at: Optional[datetime] = None,
         response_model: Optional[str] = None,
+        is_cached: bool = False,
     ) -> None:
         """
         Persist one LLM usage record. model is the configured/request model;
@@ -596,50 +1110,56 @@ class LLMTracker:
             state = state or {}
             user_id = state.get("user_id")
             node_name = state.get("node_name", node_name)
-            metadata = {}
-            if node_name and node_name != "unknown":
-                metadata["node_name"] = node_name
-            source_type = state.get("source_type")
-            if source_type:
-                metadata["source_type"] = source_type
-            source_task_id = (
-                state.get("source_task_id")
-                or state.get("celery_task_id")
-                or state.get("task_id")
+            metadata = _usage_metadata(state, node_name, response_model)
+
+            cache_hit_ratio = _cache_hit_ratio(cached_tokens, prompt_tokens)
+            if cache_hit_ratio:
+                logger.info(
+                    "Prompt cache hit node_name=%s model=%s "
+                    "cached_tokens=%s prompt_tokens=%s ratio=%s",
+                    node_name,
+                    model,
+                    cached_tokens,
+                    prompt_tokens,
+                    cache_hit_ratio,
+                )
+            usage = LLMUsage(
+                user_id=user_id,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=total_tokens,
+                cached_tokens=cached_tokens,
+                cache_hit_ratio=cache_hit_ratio,
+                reasoning_tokens=reasoning_tokens,
+                cost=cost,
+                cost_currency=cost_currency or DEFAULT_COST_CURRENCY,
+                success=success,
+                error=error,
+                metadata=metadata,
+                started_at=started_at,
+                is_streaming=is_streaming,
+                first_chunk_at=first_chunk_at,
+                is_cached=is_cached,
             )
-            if source_task_id:
-                metadata["source_task_id"] = str(source_task_id)
-            source_path = state.get("source_path")
-            if source_path:
-                metadata["source_path"] = source_path
-            if response_model and str(response_model).strip():
-                metadata["response_model"] = str(response_model).strip()
-            extra = state.get("metadata")
-            if isinstance(extra, dict):
-                metadata.update(extra)
-
-            with transaction.atomic():
-                LLMUsage.objects.create(
-                    user_id=user_id,
-                    model=model,
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                    total_tokens=total_tokens,
-                    cached_tokens=cached_tokens,
-                    reasoning_tokens=reasoning_tokens,
-                    cost=cost,
-                    cost_currency=cost_currency or DEFAULT_COST_CURRENCY,
-                    success=success,
-                    error=error,
-                    metadata=metadata,
-                    started_at=started_at,
-                    is_streaming=is_streaming,
-                    first_chunk_at=first_chunk_at,
+            if get_async_usage_writes():
+                # NOTE(Ray): Lazy import; tasks.usage imports this package's
+                # usage_buffer and Celery, which the sync path never needs.
+                from agentcore_metering.adapters.django.tasks.usage import (
+                    enqueue_usage_save,
                 )
+
+                enqueue_usage_save(usage)
+            elif not buffer_usage(usage):
+                _insert_usage(usage)
         except Exception as e:
             logger.warning(
-                f"Failed to save LLM usage; node_name={node_name}, "
-                f"model={model}, user_id={user_id}, error={e}",
+                "Failed to save LLM usage; node_name=%s, model=%s, "
+                "user_id=%s, error=%s",
+                node_name,
+                model,
+                user_id,
+                e,
                 exc_info=True,
             )
 
@@ -647,7 +1167,7 @@ class LLMTracker:
     def _call_and_track_stream(
         params: Dict[str, Any],
         effective_state: Dict[str, Any],
-        request_started_at: Any,
+        request_started_ns: Optional[int],
         node_name: str,
         state: Optional[Dict],
         model: str,
@@ -660,25 +1180,30 @@ class LLMTracker:
         Returns usage as generator return value (StopIteration.value).
         """
         import litellm
-        from litellm import APIError, AuthenticationError, RateLimitError
-        first_chunk_at: Optional[datetime] = None
+
+        t0 = time.monotonic()
+        first_chunk_ns: Optional[int] = None
         last_chunk = None
+        usage_chunk = None
         streamed_content_len = 0
-        streamed_content = ""
+        # NOTE(Ray): Chunks are collected and joined once at the end; `+=` on
+        # a str the closures also reference copies the whole prefix per chunk.
+        streamed_parts: list[str] = []
         logged_unknown_shape = False
         accumulated_tool_calls: dict = {}
         finish_reason = None
 
         def _reset_stream_attempt() -> None:
-            nonlocal last_chunk, logged_unknown_shape
+            nonlocal last_chunk, usage_chunk, logged_unknown_shape
             nonlocal accumulated_tool_calls, finish_reason
             last_chunk = None
+            usage_chunk = None
             logged_unknown_shape = False
             accumulated_tool_calls = {}
             finish_reason = None
 
         def _has_emitted() -> bool:
-            return first_chunk_at is not None
+            return first_chunk_ns is not None
 
         def _extract_text(value: Any) -> str:
             """
@@ -760,7 +1285,7 @@ class LLMTracker:
             _usage: Dict[str, Any],
             _last_chunk: Any,
             _streamed_content: str,
-            _first_chunk_at: Optional[datetime],
+            _first_chunk_ns: Optional[int],
             success: bool = True,
             error: Optional[str] = None,
         ) -> None:
@@ -770,89 +1295,71 @@ class LLMTracker:
                 messages=params.get("messages"),
                 streamed_content=_streamed_content or None,
             )
-            cost = usage_in.get("cost")
-            cost_currency = usage_in.get(
-                "cost_currency", DEFAULT_COST_CURRENCY
-            )
-            if cost is not None:
-                try:
-                    cost = Decimal(str(cost))
-                except (TypeError, ValueError):
-                    cost = None
-            if state is not None and success:
-                state.setdefault("llm_calls", []).append(
-                    {
-                        "node": effective_state.get("node_name", "unknown"),
-                        "model": usage_in["model"],
-                        "prompt_tokens": usage_in["prompt_tokens"],
-                        "completion_tokens": usage_in["completion_tokens"],
-                        "total_tokens": usage_in["total_tokens"],
-                        "cached_tokens": usage_in["cached_tokens"],
-                        "reasoning_tokens": usage_in["reasoning_tokens"],
-                        "cost": usage_in.get("cost"),
-                        "cost_currency": usage_in.get("cost_currency"),
-                        "success": True,
-                        "error": None,
-                    }
-                )
-            response_model_raw = (
-                getattr(_last_chunk, "model", None) if _last_chunk else None
-            )
-            LLMTracker._save_usage_to_db(
-                state=effective_state,
-                model=model,
-                prompt_tokens=usage_in["prompt_tokens"],
-                completion_tokens=usage_in["completion_tokens"],
-                total_tokens=usage_in["total_tokens"],
-                cached_tokens=usage_in["cached_tokens"],
-                reasoning_tokens=usage_in["reasoning_tokens"],
-                cost=cost,
-                cost_currency=cost_currency,
-                success=success,
-                error=error,
-                started_at=request_started_at,
-                is_streaming=True,
-                first_chunk_at=_first_chunk_at,
-                response_model=response_model_raw,
+            _record_llm_call(
+                effective_state=effective_state,
+                state=state,
+                rec=UsageRecord.from_usage(
+                    usage_in,
+                    model,
+                    success=success,
+                    error=error,
+                    started_at=_datetime_from_ns(request_started_ns),
+                    is_streaming=True,
+                    first_chunk_at=_datetime_from_ns(_first_chunk_ns),
+                    response_model=(
+                        getattr(_last_chunk, "model", None)
+                        if _last_chunk
+                        else None
+                    ),
+                ),
             )
 
+        def _stream_usage() -> Dict[str, Any]:
+            """
+            Usage dict built once, at the end of the stream.
+
+            NOTE(Ray): With include_usage, usage rides on a single chunk that
+            is not always the last one; prefer it over the final chunk so a
+            trailing usage-less chunk does not force the tokenizer fallback.
+            """
+            chunk = usage_chunk or last_chunk
+            if chunk is None:
+                return empty_usage_dict(model)
+            return usage_from_stream_chunk(chunk, model)
+
         def _handle_stream_stop() -> None:
             """
-            Handle GeneratorExit when client stops consuming the stream.
+            Save partial usage when the stream ends early without a provider
+            error (client stopped consuming: GeneratorExit).
             """
-            usage_partial = (
-                usage_from_stream_chunk(last_chunk, model)
-                if last_chunk
-                else _default_usage_dict(model)
-            )
             _build_usage_and_save(
-                usage_partial,
+                _stream_usage(),
                 last_chunk,
-                streamed_content,
-                first_chunk_at,
+                "".join(streamed_parts),
+                first_chunk_ns,
                 success=True,
                 error=None,
             )
             logger.info(
-                f"Stream stopped by client (stream) "
-                f"node_name={node_name} model={model} "
-                f"streamed_len={streamed_content_len}"
+                "Stream stopped by client (stream) node_name=%s model=%s "
+                "streamed_len=%s",
+                node_name,
+                model,
+                streamed_content_len,
             )
-            raise
 
+        recorded = False
         try:
-            stream_params = {
-                **params,
-                "stream": True,
-                "stream_options": {"include_usage": True},
-            }
             for chunk in iter_completion_with_retry(
                 litellm.completion,
-                stream_params,
+                params,
                 has_emitted=_has_emitted,
                 on_retry=_reset_stream_attempt,
+                prefetch=get_stream_prefetch(),
             ):
                 last_chunk = chunk
+                if getattr(chunk, "usage", None) is not None:
+                    usage_chunk = chunk
                 choices = getattr(chunk, "choices", None) or []
                 choice = choices[0] if choices else None
                 if not choice:
@@ -870,10 +1377,11 @@ class LLMTracker:
                 if delta is None:
                     if not logged_unknown_shape:
                         logger.warning(
-                            f"LLM stream chunk missing choice.delta; "
-                            f"expected OpenAI-compatible streaming format. "
-                            f"model={model} "
-                            f"choice_type={type(choice).__name__}"
+                            "LLM stream chunk missing choice.delta; "
+                            "expected OpenAI-compatible streaming format. "
+                            "model=%s choice_type=%s",
+                            model,
+                            type(choice).__name__,
                         )
                         logged_unknown_shape = True
                     continue
@@ -885,13 +1393,10 @@ class LLMTracker:
                     text = _extract_text(reasoning_raw)
                     if text:
                         streamed_content_len += len(text)
-                        streamed_content += text
-                        if first_chunk_at is None:
-                            first_chunk_at = timezone.now()
-                        try:
-                            yield ("reasoning", text)
-                        except GeneratorExit:
-                            _handle_stream_stop()
+                        streamed_parts.append(text)
+                        if first_chunk_ns is None:
+                            first_chunk_ns = time.time_ns()
+                        yield ("reasoning", text)
                 raw_tool_calls = _read_chunk_field(delta, "tool_calls")
                 if raw_tool_calls:
                     for tc in raw_tool_calls:
@@ -929,48 +1434,49 @@ class LLMTracker:
                     text = _extract_text(content)
                     if text:
                         streamed_content_len += len(text)
-                        streamed_content += text
-                        if first_chunk_at is None:
-                            first_chunk_at = timezone.now()
-                        try:
-                            yield ("content", text)
-                        except GeneratorExit:
-                            _handle_stream_stop()
+                        streamed_parts.append(text)
+                        if first_chunk_ns is None:
+                            first_chunk_ns = time.time_ns()
+                        yield ("content", text)
                     elif isinstance(content, str):
                         # Genuinely empty string chunks ("") are valid no-ops
                         # and must not be treated as a shape mismatch.
                         continue
                     elif not logged_unknown_shape:
                         logger.warning(
-                            f"LLM stream delta.content had unsupported type; "
-                            f"expected str per LiteLLM docs. model={model} "
-                            f"delta_type={type(delta).__name__} "
-                            f"content_type={type(content).__name__}"
+                            "LLM stream delta.content had unsupported type; "
+                            "expected str per LiteLLM docs. model=%s "
+                            "delta_type=%s content_type=%s",
+                            model,
+                            type(delta).__name__,
+                            type(content).__name__,
                         )
                         logged_unknown_shape = True
-            usage = (
-                usage_from_stream_chunk(last_chunk, model)
-                if last_chunk
-                else _default_usage_dict(model)
-            )
+            streamed_content = "".join(streamed_parts)
+            usage = _stream_usage()
             usage = fill_usage_with_token_fallback(
                 usage,
                 model,
                 messages=params.get("messages"),
                 streamed_content=streamed_content or None,
             )
+            recorded = True
             _build_usage_and_save(
                 usage,
                 last_chunk,
                 streamed_content,
-                first_chunk_at,
+                first_chunk_ns,
                 success=True,
                 error=None,
             )
             logger.info(
-                f"Finished {TASK_LLM_CALL} (stream) node_name={node_name} "
-                f"model={usage['model']} "
-                f"total_tokens={usage.get('total_tokens')}"
+                "Finished %s (stream) node_name=%s model=%s total_tokens=%s "
+                "duration_s=%.3f",
+                TASK_LLM_CALL,
+                node_name,
+                usage["model"],
+                usage.get("total_tokens"),
+                time.monotonic() - t0,
             )
             result = dict(usage)
             if accumulated_tool_calls:
@@ -980,73 +1486,21 @@ class LLMTracker:
             if finish_reason is not None:
                 result["_finish_reason"] = finish_reason
             return result
-        except GeneratorExit:
-            raise
-        except AuthenticationError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} (stream, authentication) "
-                f"node_name={node} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
-                effective_state=effective_state,
-                state=state,
-                request_started_at=request_started_at,
-                node_name=node,
-                is_streaming=True,
-                error_msg=str(e),
-            )
-            _raise_friendly(e, friendly_errors)
-            raise
-        except RateLimitError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.warning(
-                f"Failed {TASK_LLM_CALL} (stream, rate limit) "
-                f"node_name={node} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
-                effective_state=effective_state,
-                state=state,
-                request_started_at=request_started_at,
-                node_name=node,
-                is_streaming=True,
-                error_msg=str(e),
-            )
-            _raise_friendly(e, friendly_errors)
-            raise
-        except APIError as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} (stream, API error) "
-                f"node_name={node} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
-                effective_state=effective_state,
-                state=state,
-                request_started_at=request_started_at,
-                node_name=node,
-                is_streaming=True,
-                error_msg=str(e),
-            )
-            _raise_friendly(e, friendly_errors)
-            raise
         except Exception as e:
-            node = effective_state.get("node_name", "unknown")
-            logger.error(
-                f"Failed {TASK_LLM_CALL} (stream) node_name={node} "
-                f"error_type={type(e).__name__} error={e}"
-            )
-            logger.exception(e)
-            _record_failed_llm_call(
+            recorded = True
+            _log_and_record_failure(
+                e,
                 effective_state=effective_state,
                 state=state,
-                request_started_at=request_started_at,
-                node_name=node,
+                request_started_ns=request_started_ns,
                 is_streaming=True,
-                error_msg=str(e),
+                started_monotonic=t0,
+                friendly_errors=friendly_errors,
             )
-            _raise_friendly(e, friendly_errors)
             raise
+        finally:
+            # NOTE(Ray): Normal completion and provider errors record the
+            # call themselves; anything else (GeneratorExit when the client
+            # stops reading) still saves the partial usage once.
+            if not recorded:
+                _handle_stream_stop()
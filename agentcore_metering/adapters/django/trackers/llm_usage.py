@@ -5,81 +5,189 @@ Provides model-agnostic token counts (via LiteLLM token_counter) and
 normalized usage dicts from completion/stream chunk objects. Used by
 trackers.llm to keep the tracker thin and testable.
 """
+import hashlib
+import json
 import logging
+import threading
+from collections import OrderedDict
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
+from agentcore_metering.adapters.django.conf import (
+    get_fast_token_approx_chars,
+)
 from agentcore_metering.adapters.django.utils import (
-    _read_field,
-    _read_nested_int,
-    _safe_int,
+    _extract_usage,
+    _to_decimal,
 )
 from agentcore_metering.constants import DEFAULT_COST_CURRENCY
 
 logger = logging.getLogger(__name__)
 
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# NOTE(Ray): Copying this template is cheaper than building the 8-key
+# literal; only the model differs between empty usage dicts.
+_EMPTY_USAGE: Dict[str, Any] = {
+    "model": "unknown",
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "total_tokens": 0,
+    "cached_tokens": 0,
+    "reasoning_tokens": 0,
+    "cost": None,
+    "cost_currency": DEFAULT_COST_CURRENCY,
+}
+
+_token_count_lock = threading.Lock()
+_token_counts: "OrderedDict[Tuple[Hashable, ...], int]" = OrderedDict()
+
+
+def _digest(data: str) -> bytes:
+    return hashlib.blake2b(
+        data.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+
+
+def _messages_digest(messages: list) -> Optional[bytes]:
+    """
+    Digest of the canonical JSON form of messages, or None when they are
+    not JSON-serializable (those are counted uncached).
+    """
+    try:
+        return _digest(
+            json.dumps(messages, sort_keys=True, separators=(",", ":"))
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _cached_count(key: Tuple[Hashable, ...]) -> Optional[int]:
+    with _token_count_lock:
+        count = _token_counts.get(key)
+        if count is not None:
+            _token_counts.move_to_end(key)
+        return count
+
+
+def _store_count(key: Tuple[Hashable, ...], count: int) -> None:
+    with _token_count_lock:
+        _token_counts[key] = count
+        _token_counts.move_to_end(key)
+        if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _token_counts.popitem(last=False)
+
+
+def token_count_cache_clear() -> None:
+    """Drop all memoized token counts."""
+    with _token_count_lock:
+        _token_counts.clear()
+
 
 def token_count_text(model: str, text: str) -> int:
     """
     Model-agnostic token count for a string using LiteLLM token_counter.
     Returns 0 on empty text or on error.
+
+    NOTE(Ray): Counts are memoized per (model, blake2b digest of text) in a
+    bounded LRU, so repeated prompts and outputs are tokenized once without
+    the cache holding on to the strings. Failures are not cached.
+
+    With AGENTCORE_METERING_FAST_TOKEN_APPROX_CHARS set, texts up to that
+    many characters are estimated as len(text) // 4 tokens (at least 1)
+    without calling the tokenizer.
     """
     if not (text and text.strip()):
         return 0
+    if len(text) <= get_fast_token_approx_chars():
+        return max(1, len(text) // 4)
+    key = ("text", model, _digest(text))
+    count = _cached_count(key)
+    if count is not None:
+        return count
     try:
         from litellm import token_counter
-        return int(token_counter(model=model, text=text))
+        count = int(token_counter(model=model, text=text))
     except Exception as e:
-        logger.debug(f"token_counter(model={model!r}, text=...) failed: {e}")
+        logger.debug("token_counter(model=%r, text=...) failed: %s", model, e)
         return 0
+    _store_count(key, count)
+    return count
 
 
 def token_count_messages(model: str, messages: list) -> int:
     """
     Model-agnostic token count for messages using LiteLLM token_counter.
-    Returns 0 on empty messages or on error.
+    Returns 0 on empty messages or on error. Memoized like
+    token_count_text, keyed on the canonical JSON of messages.
     """
     if not messages:
         return 0
+    digest = _messages_digest(messages)
+    key = ("messages", model, digest)
+    if digest is not None:
+        count = _cached_count(key)
+        if count is not None:
+            return count
     try:
         from litellm import token_counter
-        return int(token_counter(model=model, messages=messages))
+        count = int(token_counter(model=model, messages=messages))
     except Exception as e:
         logger.debug(
-            f"token_counter(model={model!r}, messages=...) failed: {e}"
+            "token_counter(model=%r, messages=...) failed: %s", model, e
         )
         return 0
+    if digest is not None:
+        _store_count(key, count)
+    return count
 
 
-def get_cost_from_response(response: Any) -> Optional[Decimal]:
+def get_cost_from_response(
+    response: Any, *, price_fallback: bool = True
+) -> Optional[Decimal]:
     """
     Extract cost (USD) from a LiteLLM completion or stream chunk.
-    Tries completion_cost() then response._hidden_params.response_cost.
+    Reads response._hidden_params.response_cost first, then falls back to
+    completion_cost().
+
+    NOTE(Ray): LiteLLM already prices each completion into response_cost;
+    completion_cost() re-derives the same figure from the model cost map, so
+    it only runs when that field is missing or unparsable, and not at all
+    with price_fallback=False.
     """
-    try:
-        from litellm import completion_cost
-        cost = completion_cost(completion_response=response)
-        if cost is not None:
-            return Decimal(str(cost))
-    except (TypeError, ValueError) as e:
-        logger.debug(f"completion_cost or Decimal failed: {e}")
-    except Exception as e:
-        logger.debug(f"completion_cost failed: {e}")
     hidden = getattr(response, "_hidden_params", None) or {}
     cost = hidden.get("response_cost")
     if cost is not None:
         try:
-            return Decimal(str(cost))
+            return _to_decimal(cost)
         except (TypeError, ValueError, InvalidOperation):
-            model = getattr(response, "model", "unknown")
             logger.warning(
-                f"Invalid response_cost in hidden params "
-                f"model={model} response_cost={cost}"
+                "Invalid response_cost in hidden params "
+                "model=%s response_cost=%s",
+                getattr(response, "model", "unknown"),
+                cost,
             )
-            return None
+    if not price_fallback:
+        return None
+    try:
+        from litellm import completion_cost
+        cost = completion_cost(completion_response=response)
+        if cost is not None:
+            return _to_decimal(cost)
+    except (TypeError, ValueError) as e:
+        logger.debug("completion_cost or Decimal failed: %s", e)
+    except Exception as e:
+        logger.debug("completion_cost failed: %s", e)
     return None
 
 
+def empty_usage_dict(model: str) -> Dict[str, Any]:
+    """Zero usage dict (no cost) for model."""
+    usage = _EMPTY_USAGE.copy()
+    usage["model"] = model
+    return usage
+
+
 def usage_dict_from_usage_obj(
     usage_obj: Any, fallback_model: str
 ) -> Dict[str, Any]:
@@ -87,56 +195,15 @@ def usage_dict_from_usage_obj(
     Build usage dict (tokens only, no cost) from a LiteLLM usage object.
     Used by both sync response.usage and stream chunk.usage.
     """
-    prompt_tokens = 0
-    completion_tokens = 0
-    total_tokens = 0
-    cached_tokens = 0
-    reasoning_tokens = 0
-    if usage_obj:
-        prompt_tokens = _safe_int(_read_field(usage_obj, "prompt_tokens", 0))
-        completion_tokens = _safe_int(
-            _read_field(usage_obj, "completion_tokens", 0)
-        )
-        total_tokens = (
-            _safe_int(_read_field(usage_obj, "total_tokens", 0))
-            or (prompt_tokens + completion_tokens)
-        )
-        cached_tokens = _safe_int(_read_field(usage_obj, "cached_tokens", 0))
-        if cached_tokens == 0:
-            # DeepSeek reports cache hits at the top level under its own name.
-            cached_tokens = _safe_int(
-                _read_field(usage_obj, "prompt_cache_hit_tokens", 0)
-            )
-        reasoning_tokens = _safe_int(
-            _read_field(usage_obj, "reasoning_tokens", 0)
-        )
-        if cached_tokens == 0:
-            prompt_details = (
-                _read_field(usage_obj, "prompt_tokens_details", None)
-                or _read_field(usage_obj, "input_token_details", None)
-            )
-            cached_tokens = _read_nested_int(
-                prompt_details,
-                # MiniMax/Anthropic use cache_read_input_tokens; OpenAI uses
-                # cached_tokens; others vary.
-                ("cached_tokens", "cache_read_tokens", "cache_read",
-                 "cache_read_input_tokens"),
-                0,
-            )
-        if reasoning_tokens == 0:
-            completion_details = (
-                _read_field(
-                    usage_obj,
-                    "completion_tokens_details",
-                    None,
-                )
-                or _read_field(usage_obj, "output_token_details", None)
-            )
-            reasoning_tokens = _read_nested_int(
-                completion_details,
-                ("reasoning_tokens", "reasoning"),
-                0,
-            )
+    if not usage_obj:
+        return empty_usage_dict(fallback_model)
+    (
+        prompt_tokens,
+        completion_tokens,
+        total_tokens,
+        cached_tokens,
+        reasoning_tokens,
+    ) = _extract_usage(usage_obj)
     return {
         "model": fallback_model,
         "prompt_tokens": prompt_tokens,
@@ -165,14 +232,19 @@ def usage_from_stream_chunk(chunk: Any, fallback_model: str) -> Dict[str, Any]:
     """
     Build full usage dict from a streaming chunk.
     LiteLLM often sends usage in the last chunk; cost from chunk if present.
+
+    NOTE(Ray): completion_cost() prices from the chunk's usage, so a chunk
+    without usage (partial stream) only reads the precomputed response_cost.
     """
     usage_obj = getattr(chunk, "usage", None)
     usage = usage_dict_from_usage_obj(usage_obj, fallback_model)
     cost = None
     try:
-        cost = get_cost_from_response(chunk)
+        cost = get_cost_from_response(
+            chunk, price_fallback=usage_obj is not None
+        )
     except Exception as e:
-        logger.debug(f"get_cost_from_response(chunk) failed: {e}")
+        logger.debug("get_cost_from_response(chunk) failed: %s", e)
     usage["cost"] = float(cost) if cost is not None else None
     return usage
 
@@ -190,25 +262,35 @@ def fill_usage_with_token_fallback(
     API did not return usage. Updates total_tokens to keep consistency.
 
     Call with either (messages + content) for sync, or (messages +
-    streamed_content) for stream.
+    streamed_content) for stream. content is str()-ed and stripped here, only
+    when it is actually counted. Returns usage itself (no copy) when nothing
+    had to be filled in, so callers must not mutate the result unless they
+    passed a dict of their own.
     """
-    result = dict(usage)
-    prompt = result.get("prompt_tokens") or 0
-    completion = result.get("completion_tokens") or 0
-    total = result.get("total_tokens") or 0
+    prompt = usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    total = usage.get("total_tokens") or 0
+    # NOTE(Ray): Common case: the provider returned usage, so skip the copy
+    # and never touch the tokenizer.
+    if prompt and (completion or total):
+        return usage
 
+    updates: Dict[str, int] = {}
     if prompt == 0 and messages:
         prompt = token_count_messages(model, messages)
-        result["prompt_tokens"] = prompt
-        result["total_tokens"] = prompt + completion
-
-    completion_content = (
-        streamed_content if streamed_content is not None else content
-    )
-    if completion_content and (completion == 0 and total == 0):
-        completion = max(1, token_count_text(model, completion_content))
-        total = prompt + completion
-        result["completion_tokens"] = completion
-        result["total_tokens"] = total
-
-    return result
+        updates["prompt_tokens"] = prompt
+        updates["total_tokens"] = prompt + completion
+
+    if completion == 0 and total == 0:
+        if streamed_content is not None:
+            completion_content = streamed_content
+        else:
+            completion_content = str(content).strip() if content else None
+        if completion_content:
+            completion = max(1, token_count_text(model, completion_content))
+            updates["completion_tokens"] = completion
+            updates["total_tokens"] = prompt + completion
+
+    if not updates:
+        return usage
+    return {**usage, **updates}
@@ -0,0 +1,76 @@
+"""
+Opt-in completion cache for LLMTracker.call_and_track(cache_key=...).
+
+Stores the final (post JSON-repair) content of a non-stream call in a Django
+cache, keyed by a digest of the request fields that shape the answer. Cache
+backend errors are logged and treated as misses; they never fail a call.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Union
+
+from django.core.cache import caches
+
+from agentcore_metering.adapters.django.conf import (
+    get_response_cache_alias,
+    get_response_cache_ttl,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "agentcore_metering:llm_response:"
+# Request fields that change the completion. Credentials, timeouts and
+# tracing metadata are left out so they do not split the cache.
+_KEY_PARAMS = (
+    "model",
+    "api_base",
+    "messages",
+    "temperature",
+    "top_p",
+    "max_tokens",
+    "response_format",
+    "tools",
+    "tool_choice",
+)
+
+
+def response_cache_key(
+    cache_key: Union[bool, str], params: Dict[str, Any], **flags: Any
+) -> str:
+    """
+    Cache key for one call. A str cache_key is the caller's own request
+    identity (scoped by model); True derives it from params. Either way the
+    flags that shape the returned value (return_message, json_repair) are
+    part of the key, so a message dict is never served where a str is
+    expected.
+    """
+    if isinstance(cache_key, str):
+        payload = {"model": params.get("model"), "cache_key": cache_key}
+    else:
+        payload = {k: params.get(k) for k in _KEY_PARAMS}
+    payload.update(flags)
+    base = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), default=str
+    )
+    digest = hashlib.blake2b(base.encode(), digest_size=16).hexdigest()
+    return CACHE_KEY_PREFIX + digest
+
+
+def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    """Cached {"content": ...} for key, or None on a miss or cache error."""
+    try:
+        return caches[get_response_cache_alias()].get(key)
+    except Exception as e:
+        logger.warning(f"LLM response cache get failed; key={key} error={e}")
+        return None
+
+
+def set_cached_response(key: str, content: Any) -> None:
+    """Store content under key for the configured TTL. Does not raise."""
+    try:
+        caches[get_response_cache_alias()].set(
+            key, {"content": content}, get_response_cache_ttl()
+        )
+    except Exception as e:
+        logger.warning(f"LLM response cache set failed; key={key} error={e}")
@@ -0,0 +1,324 @@
+"""
+Optional in-process write buffer for LLMUsage rows.
+
+When AGENTCORE_METERING_USAGE_BUFFER_SIZE > 1, tracked calls queue their row
+here and the buffer is written with multi-row INSERTs once it is full or its
+oldest row is older than AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE seconds.
+A daemon thread also flushes rows that went stale because no further call
+arrived, and full batches whose triggering caller is inside a transaction.
+On PostgreSQL, batches of COPY_MIN_ROWS or more are streamed with COPY
+instead. The buffer is drained at interpreter exit and on Celery worker
+shutdown.
+"""
+import atexit
+import io
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, Optional
+
+from django.db import connections, models, router, transaction
+
+from agentcore_metering.adapters.django.conf import (
+    get_usage_buffer_max_age,
+    get_usage_buffer_size,
+)
+from agentcore_metering.adapters.django.models import LLMUsage
+
+logger = logging.getLogger(__name__)
+
+BULK_INSERT_BATCH_SIZE = 500
+# Below this many rows the parameterized bulk INSERT is as fast as COPY.
+COPY_MIN_ROWS = 1000
+# Floor for the background flusher's wake-up interval.
+MIN_FLUSH_INTERVAL_SECONDS = 0.05
+
+_lock = threading.Lock()
+_pending: List[LLMUsage] = []
+_oldest_at: Optional[float] = None
+_flusher: Optional[threading.Thread] = None
+# Set to make the flusher write the buffer now instead of at its next tick.
+_wake = threading.Event()
+
+
+def _drain() -> List[LLMUsage]:
+    """Take all pending rows; caller must hold _lock."""
+    global _pending, _oldest_at
+    batch, _pending, _oldest_at = _pending, [], None
+    return batch
+
+
+def _copy_field(field: models.Field, value: Any) -> str:
+    """
+    One CSV field for COPY. NULL is the bare empty field; every text value
+    is quoted, so an empty string stays distinct from NULL.
+    """
+    if value is None:
+        return ""
+    if isinstance(field, models.JSONField):
+        value = json.dumps(value, cls=field.encoder)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif not isinstance(value, str):
+        return str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _usage_csv(batch: List[LLMUsage], fields) -> io.StringIO:
+    """Render batch as COPY ... (FORMAT csv) input."""
+    buf = io.StringIO()
+    for usage in batch:
+        buf.write(
+            ",".join(
+                _copy_field(f, f.pre_save(usage, True)) for f in fields
+            )
+        )
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def _copy_usage(batch: List[LLMUsage], alias: str) -> None:
+    """
+    Load batch with COPY FROM STDIN (PostgreSQL only).
+
+    NOTE(Ray): psycopg2 exposes copy_expert, psycopg 3 cursor.copy(); the
+    CSV payload is the same for both.
+    """
+    conn = connections[alias]
+    qn = conn.ops.quote_name
+    fields = LLMUsage._meta.concrete_fields
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        qn(LLMUsage._meta.db_table),
+        ", ".join(qn(f.column) for f in fields),
+    )
+    buf = _usage_csv(batch, fields)
+    with conn.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            raw.copy_expert(sql, buf)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buf.getvalue())
+
+
+def _insert_rows(batch: List[LLMUsage], alias: str) -> None:
+    """
+    Write batch as multi-row INSERT ... VALUES (...), (...) statements.
+
+    NOTE(Ray): Same result as bulk_create but skips its per-call query
+    compilation and field/pk checks; rows are only written, never read
+    back. Values go through pre_save/get_db_prep_save like the ORM, and
+    pages are capped by the backend's bulk_batch_size (SQLite's variable
+    limit). Several pages share one transaction (see _write).
+    """
+    conn = connections[alias]
+    qn = conn.ops.quote_name
+    fields = LLMUsage._meta.concrete_fields
+    page = min(
+        BULK_INSERT_BATCH_SIZE,
+        max(conn.ops.bulk_batch_size(fields, batch), 1),
+    )
+    head = "INSERT INTO {} ({}) VALUES ".format(
+        qn(LLMUsage._meta.db_table),
+        ", ".join(qn(f.column) for f in fields),
+    )
+    row_sql = "({})".format(", ".join(["%s"] * len(fields)))
+    full_sql = head + ", ".join([row_sql] * page)
+    with conn.cursor() as cursor:
+        for start in range(0, len(batch), page):
+            rows = batch[start:start + page]
+            params = [
+                f.get_db_prep_save(f.pre_save(usage, True), conn)
+                for usage in rows
+                for f in fields
+            ]
+            sql = (
+                full_sql
+                if len(rows) == page
+                else head + ", ".join([row_sql] * len(rows))
+            )
+            cursor.execute(sql, params)
+
+
+def _write(batch: List[LLMUsage]) -> None:
+    """
+    Write batch in its own transaction.
+
+    NOTE(Ray): Inside a caller's atomic block this is a real savepoint, so
+    a failed batch rolls back alone and leaves the caller's transaction
+    usable (PostgreSQL aborts it otherwise). buffer_usage keeps full
+    batches out of callers' transactions altogether; this covers explicit
+    flush_usage_buffer() calls.
+    """
+    if not batch:
+        return
+    alias = router.db_for_write(LLMUsage)
+    with transaction.atomic(using=alias):
+        if (
+            len(batch) >= COPY_MIN_ROWS
+            and connections[alias].vendor == "postgresql"
+        ):
+            _copy_usage(batch, alias)
+        else:
+            _insert_rows(batch, alias)
+
+
+def _write_batch(batch: List[LLMUsage]) -> int:
+    """
+    Write batch; return how many rows were stored.
+
+    NOTE(Ray): The batch has been drained from the buffer, so a failure
+    must not lose it wholesale: when the batch write fails (one bad row,
+    duplicate pk, DB blip) each row is retried on its own, and only the
+    rows that still fail are dropped and counted in the log.
+    """
+    if not batch:
+        return 0
+    try:
+        _write(batch)
+        return len(batch)
+    except Exception as e:
+        logger.warning(
+            "Failed to write %s buffered LLM usage rows, retrying one by "
+            "one: %s",
+            len(batch),
+            e,
+            exc_info=True,
+        )
+    written = 0
+    last_error: Optional[Exception] = None
+    for usage in batch:
+        try:
+            _write([usage])
+            written += 1
+        except Exception as e:
+            last_error = e
+    dropped = len(batch) - written
+    if dropped:
+        logger.error(
+            "Dropped %s of %s buffered LLM usage rows; last error: %s",
+            dropped,
+            len(batch),
+            last_error,
+        )
+    return written
+
+
+def buffer_usage(usage: LLMUsage) -> bool:
+    """
+    Queue usage for a later bulk write; return False when buffering is
+    disabled so the caller saves the row itself.
+
+    created_at is set when the instance is built, so flushed rows keep the
+    call completion time rather than the flush time.
+
+    NOTE(Ray): The batch holds other calls' rows, so it is never written
+    inside the triggering caller's transaction (where it would commit or
+    roll back with unrelated work); the flusher thread writes it on its
+    own connection instead.
+    """
+    global _oldest_at
+    size = get_usage_buffer_size()
+    if size <= 1:
+        return False
+    now = time.monotonic()
+    in_atomic = connections[router.db_for_write(LLMUsage)].in_atomic_block
+    with _lock:
+        _ensure_flusher()
+        _pending.append(usage)
+        if _oldest_at is None:
+            _oldest_at = now
+        if (
+            len(_pending) < size
+            and now - _oldest_at < get_usage_buffer_max_age()
+        ):
+            return True
+        if in_atomic:
+            _wake.set()
+            return True
+        batch = _drain()
+    _write_batch(batch)
+    return True
+
+
+def _flush_stale(force: bool = False) -> int:
+    """
+    Write the buffer if its oldest row exceeded the max age, or whenever it
+    is non-empty with force.
+    """
+    with _lock:
+        if _oldest_at is None or (
+            not force
+            and time.monotonic() - _oldest_at < get_usage_buffer_max_age()
+        ):
+            return 0
+        batch = _drain()
+    return _write_batch(batch)
+
+
+def _flush_loop() -> None:
+    """
+    Background flusher body.
+
+    NOTE(Ray): Runs on its own DB connection; close it after each tick so an
+    idle process does not pin a connection (or hold a broken one).
+    """
+    while True:
+        woken = _wake.wait(
+            max(get_usage_buffer_max_age(), MIN_FLUSH_INTERVAL_SECONDS)
+        )
+        _wake.clear()
+        try:
+            _flush_stale(force=woken)
+        finally:
+            connections.close_all()
+
+
+def _ensure_flusher() -> None:
+    """
+    Start the flusher thread on first use; caller must hold _lock. A forked
+    child (e.g. Celery prefork) sees the parent's thread as dead and starts
+    its own.
+    """
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    _flusher = threading.Thread(
+        target=_flush_loop,
+        name="agentcore-metering-usage-flush",
+        daemon=True,
+    )
+    _flusher.start()
+
+
+def flush_usage_buffer() -> int:
+    """Write all buffered rows now; return how many were written."""
+    with _lock:
+        batch = _drain()
+    return _write_batch(batch)
+
+
+def _flush_on_shutdown(*args, **kwargs) -> None:
+    try:
+        flush_usage_buffer()
+    except Exception as e:
+        logger.warning(
+            f"Failed to flush buffered LLM usage on shutdown: {e}",
+            exc_info=True,
+        )
+
+
+atexit.register(_flush_on_shutdown)
+
+try:
+    from celery.signals import worker_process_shutdown
+except ImportError:
+    worker_process_shutdown = None
+
+if worker_process_shutdown is not None:
+    worker_process_shutdown.connect(_flush_on_shutdown, weak=False)
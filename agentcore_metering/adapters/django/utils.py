@@ -2,10 +2,51 @@
 Shared helpers for reading usage/response fields from LiteLLM-style objects.
 
 Used by runtime_config and trackers.llm to normalize dict vs object access
-and safe int conversion for token counts and nested details.
+and safe int conversion for token counts and nested details, and by the
+Celery tasks to record failure tracebacks.
 """
+import io
+import sys
+import traceback
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
 from typing import Any, Tuple
 
+from django.db import InterfaceError, OperationalError
+
+# Frames kept in tracebacks stored on TaskExecution; the innermost frames
+# are the useful ones and retry storms would otherwise store huge strings.
+TRACEBACK_LIMIT = 20
+
+# Errors worth a Celery autoretry: lost/refused DB or network connections and
+# timeouts. Deterministic failures (ValueError, IntegrityError, ...) would
+# fail the same way on every retry, so they are not listed.
+RETRYABLE_TASK_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Precision of LLMUsage.cache_hit_ratio (DecimalField, 4 places).
+CACHE_HIT_RATIO_ZERO = Decimal("0.0000")
+
+
+DEFAULT_PROVIDER = "openai"
+
+
+@lru_cache(maxsize=64)
+def _provider_key(value: str) -> str:
+    return sys.intern(value.strip().lower())
+
+
+def _norm_provider(value: Any, default: str = DEFAULT_PROVIDER) -> str:
+    """
+    Provider key as stored and looked up: stripped, lower-cased, default
+    when empty. Results for the few distinct raw values seen are cached.
+    """
+    return _provider_key(value or default)
+
 
 def _safe_int(value: Any, default: int = 0) -> int:
     """
@@ -35,10 +76,133 @@ def _read_nested_int(
 ) -> int:
     """
     Try each key in order; return first non-None value coerced to int.
+    The dict-or-object check runs once, not per key.
     """
-    for key in keys:
-        value = _read_field(obj, key, None)
-        if value is None:
-            continue
-        return _safe_int(value, default)
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        values = (obj.get(key) for key in keys)
+    else:
+        values = (getattr(obj, key, None) for key in keys)
+    for value in values:
+        if value is not None:
+            return _safe_int(value, default)
     return default
+
+
+_CACHED_DETAIL_KEYS = (
+    # MiniMax/Anthropic use cache_read_input_tokens; OpenAI uses
+    # cached_tokens; others vary.
+    "cached_tokens",
+    "cache_read_tokens",
+    "cache_read",
+    "cache_read_input_tokens",
+)
+_REASONING_DETAIL_KEYS = ("reasoning_tokens", "reasoning")
+
+
+# Top-level token counts read by _extract_usage, in _read_fields order.
+# DeepSeek reports cache hits at the top level as prompt_cache_hit_tokens.
+_USAGE_TOKEN_KEYS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cached_tokens",
+    "reasoning_tokens",
+    "prompt_cache_hit_tokens",
+)
+
+
+def _read_fields(
+    obj: Any, keys: Tuple[str, ...], default: int = 0
+) -> Tuple[int, ...]:
+    """
+    Read several int fields from a dict or attribute object in one call,
+    in key order. Missing/invalid values become default.
+    """
+    if obj is None:
+        return (default,) * len(keys)
+    if isinstance(obj, dict):
+        values = [obj.get(key) for key in keys]
+    else:
+        values = [getattr(obj, key, None) for key in keys]
+    return tuple(
+        v if type(v) is int else _safe_int(v, default) for v in values
+    )
+
+
+def _extract_usage(usage_obj: Any) -> Tuple[int, int, int, int, int]:
+    """
+    Read (prompt, completion, total, cached, reasoning) token counts from a
+    LiteLLM usage object or dict in one pass.
+    """
+    if not usage_obj:
+        return 0, 0, 0, 0, 0
+    (
+        prompt_tokens,
+        completion_tokens,
+        total_tokens,
+        cached_tokens,
+        reasoning_tokens,
+        cache_hit_tokens,
+    ) = _read_fields(usage_obj, _USAGE_TOKEN_KEYS)
+    total_tokens = total_tokens or (prompt_tokens + completion_tokens)
+    cached_tokens = cached_tokens or cache_hit_tokens
+    if not cached_tokens:
+        details = _read_field(usage_obj, "prompt_tokens_details") or (
+            _read_field(usage_obj, "input_token_details")
+        )
+        cached_tokens = _read_nested_int(details, _CACHED_DETAIL_KEYS, 0)
+    if not reasoning_tokens:
+        details = _read_field(usage_obj, "completion_tokens_details") or (
+            _read_field(usage_obj, "output_token_details")
+        )
+        reasoning_tokens = _read_nested_int(
+            details, _REASONING_DETAIL_KEYS, 0
+        )
+    return (
+        prompt_tokens,
+        completion_tokens,
+        total_tokens,
+        cached_tokens,
+        reasoning_tokens,
+    )
+
+
+def _to_decimal(value: Any) -> Decimal:
+    """
+    Convert a cost value to Decimal. Decimal and int skip the str round
+    trip; float goes through repr (shortest round-tripping form, same digits
+    as str). Anything else falls back to Decimal(str(value)) and raises as
+    that would.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(str(value))
+
+
+def _cache_hit_ratio(cached_tokens: int, prompt_tokens: int) -> Decimal:
+    """
+    Share of prompt tokens served from the provider's prompt cache, in
+    [0, 1] with 4 decimal places; 0 when either count is missing.
+    """
+    if not cached_tokens or not prompt_tokens or prompt_tokens <= 0:
+        return CACHE_HIT_RATIO_ZERO
+    ratio = min(Decimal(cached_tokens) / Decimal(prompt_tokens), Decimal(1))
+    return ratio.quantize(CACHE_HIT_RATIO_ZERO, rounding=ROUND_HALF_UP)
+
+
+def _format_tb_limited(exc: BaseException, limit: int = TRACEBACK_LIMIT) -> str:
+    """
+    Format exc with its traceback, keeping at most limit innermost frames.
+    Only called on failure paths.
+    """
+    buf = io.StringIO()
+    traceback.print_exception(
+        type(exc), exc, exc.__traceback__, limit=-limit, file=buf
+    )
+    return buf.getvalue()
@@ -4,7 +4,10 @@ Admin API views for LLM config CRUD, test-call, and validation.
 All endpoints require IsAdminUser. Used by management UI for global and
 per-user LLM provider configuration.
 """
+import uuid
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
@@ -25,8 +28,36 @@ from agentcore_metering.adapters.django.services.config_source import (
 from agentcore_metering.adapters.django.services.model_catalog import (
     get_model_type_for_model_id,
 )
+from agentcore_metering.adapters.django.utils import _norm_provider
 
 User = get_user_model()
+_SCOPE_GLOBAL = LLMConfig.Scope.GLOBAL
+_SCOPE_USER = LLMConfig.Scope.USER
+_MODEL_TYPE_LLM = LLMConfig.MODEL_TYPE_LLM
+_MODEL_TYPES = frozenset(LLMConfig.MODEL_TYPES)
+# NOTE(Ray): LLMConfigSerializer needs every config column (config included,
+# for masking) but only username from the joined user, so list views skip
+# the rest of the auth user row (password hash, profile columns).
+_LIST_COLUMNS = tuple(
+    f.name for f in LLMConfig._meta.concrete_fields
+) + ("user__username",)
+
+
+def _get_user_by_pk(user_id):
+    """
+    User for user_id, or None when it does not exist or is not a valid pk.
+
+    NOTE(Ray): The pk field's to_python validates the id (int or uuid,
+    whatever the user model uses), so a miss is one filter().first()
+    instead of a DoesNotExist round trip.
+    """
+    try:
+        pk = User._meta.pk.to_python(user_id)
+    except ValidationError:
+        return None
+    if pk is None:
+        return None
+    return User.objects.filter(pk=pk).first()
 
 
 def _preserve_masked_secret_fields(
@@ -91,17 +122,18 @@ class AdminLLMConfigAllListView(APIView):
             request.query_params.get("scope") or "all"
         ).strip().lower()
         user_id_param = request.query_params.get("user_id")
-        qs = (
-            LLMConfig.objects.filter(model_type=LLMConfig.MODEL_TYPE_LLM)
-            .select_related("user")
-            .order_by("scope", "created_at", "id")
+        qs = LLMConfig.objects.filter(model_type=_MODEL_TYPE_LLM).order_by(
+            "scope", "created_at", "id"
         )
         if scope_param == "global":
-            qs = qs.filter(scope=LLMConfig.Scope.GLOBAL)
-        elif scope_param == "user":
-            qs = qs.filter(scope=LLMConfig.Scope.USER)
-            if user_id_param is not None and str(user_id_param).strip():
-                qs = qs.filter(user_id=user_id_param)
+            # NOTE(Ray): Global configs have no user; skip the join.
+            qs = qs.filter(scope=_SCOPE_GLOBAL)
+        else:
+            qs = qs.select_related("user").only(*_LIST_COLUMNS)
+            if scope_param == "user":
+                qs = qs.filter(scope=_SCOPE_USER)
+                if user_id_param is not None and str(user_id_param).strip():
+                    qs = qs.filter(user_id=user_id_param)
         ctx = {"default_config_uuid": get_default_llm_config_uuid()}
         return Response(
             LLMConfigSerializer(qs, many=True, context=ctx).data
@@ -129,8 +161,8 @@ class AdminLLMConfigGlobalView(APIView):
     def get(self, request):
         qs = (
             LLMConfig.objects.filter(
-                scope=LLMConfig.Scope.GLOBAL,
-                model_type=LLMConfig.MODEL_TYPE_LLM,
+                scope=_SCOPE_GLOBAL,
+                model_type=_MODEL_TYPE_LLM,
             )
             .order_by("created_at", "id")
         )
@@ -156,44 +188,41 @@ class AdminLLMConfigGlobalView(APIView):
         data = ser.validated_data
         scope_raw = (request.data.get("scope") or "global").strip().lower()
         user_id_raw = request.data.get("user_id")
-        provider = (data.get("provider") or "openai").strip().lower()
+        provider = _norm_provider(data.get("provider"))
         config = data.get("config") or {}
         model_id = (config.get("model") or "").strip()
         model_type_raw = (
             (request.data.get("model_type") or "").strip()
             or get_model_type_for_model_id(provider, model_id or None)
-            or LLMConfig.MODEL_TYPE_LLM
+            or _MODEL_TYPE_LLM
         )
-        if model_type_raw not in LLMConfig.MODEL_TYPES:
-            model_type_raw = LLMConfig.MODEL_TYPE_LLM
+        if model_type_raw not in _MODEL_TYPES:
+            model_type_raw = _MODEL_TYPE_LLM
+        create_kwargs = {
+            "model_type": model_type_raw,
+            "provider": provider,
+            "config": config,
+            "is_active": data.get("is_active", True),
+        }
         if scope_raw == "user" and user_id_raw is not None:
-            user = None
-            try:
-                user = User.objects.get(pk=user_id_raw)
-            except (User.DoesNotExist, ValueError, TypeError):
+            user = _get_user_by_pk(user_id_raw)
+            if user is None:
                 return Response(
                     {"detail": "User not found."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             obj = LLMConfig.objects.create(
-                scope=LLMConfig.Scope.USER,
-                user=user,
-                model_type=model_type_raw,
-                provider=(data.get("provider") or "openai").strip().lower(),
-                config=data.get("config") or {},
-                is_active=data.get("is_active", True),
+                scope=_SCOPE_USER, user=user, **create_kwargs
             )
         else:
+            is_default = data.get("is_default", False)
             obj = LLMConfig.objects.create(
-                scope=LLMConfig.Scope.GLOBAL,
+                scope=_SCOPE_GLOBAL,
                 user=None,
-                model_type=model_type_raw,
-                provider=(data.get("provider") or "openai").strip().lower(),
-                config=data.get("config") or {},
-                is_active=data.get("is_active", True),
-                is_default=data.get("is_default", False),
+                is_default=is_default,
+                **create_kwargs,
             )
-            if data.get("is_default"):
+            if is_default:
                 set_default_llm_config(obj)
         ctx = {"default_config_uuid": get_default_llm_config_uuid()}
         return Response(
@@ -248,36 +277,46 @@ class AdminLLMConfigDetailView(APIView):
         if not ser.is_valid():
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
         data = ser.validated_data
+        # NOTE(Ray): Only assigned columns are written, so e.g. toggling
+        # is_active does not rewrite the config JSON.
+        changed = set()
         if "provider" in data:
-            obj.provider = (data["provider"] or "openai").strip().lower()
+            obj.provider = _norm_provider(data["provider"])
+            changed.add("provider")
         if "config" in data:
             obj.config = _preserve_masked_secret_fields(
                 obj.config or {}, data["config"] or {}
             )
+            changed.add("config")
         if "is_active" in data:
             obj.is_active = data["is_active"]
-        if "is_default" in data and obj.scope == LLMConfig.Scope.GLOBAL:
+            changed.add("is_active")
+        if "is_default" in data and obj.scope == _SCOPE_GLOBAL:
             obj.is_default = data["is_default"]
             if obj.is_default:
+                # Saves is_default itself.
                 set_default_llm_config(obj)
+            else:
+                changed.add("is_default")
         model_type_raw = request.data.get("model_type")
         mt_ok = (
             model_type_raw is not None
-            and str(model_type_raw).strip() in LLMConfig.MODEL_TYPES
+            and str(model_type_raw).strip() in _MODEL_TYPES
         )
         if mt_ok:
             obj.model_type = str(model_type_raw).strip()
+            changed.add("model_type")
         else:
-            provider = (
-                data.get("provider") or obj.provider or "openai"
-            ).strip().lower()
+            provider = _norm_provider(data.get("provider") or obj.provider)
             config = data.get("config") if "config" in data else obj.config
             model_id = ((config or {}).get("model") or "").strip()
             if model_id:
                 derived = get_model_type_for_model_id(provider, model_id)
                 if derived:
                     obj.model_type = derived
-        obj.save()
+                    changed.add("model_type")
+        if changed:
+            obj.save(update_fields=sorted(changed | {"updated_at"}))
         ctx = {"default_config_uuid": get_default_llm_config_uuid()}
         return Response(LLMConfigSerializer(obj, context=ctx).data)
 
@@ -298,16 +337,18 @@ class AdminLLMConfigDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def _get_obj(self, config_ref):
-        qs = LLMConfig.objects.select_related("user")
-        try:
-            return qs.get(uuid=config_ref)
-        except (LLMConfig.DoesNotExist, ValueError, TypeError):
-            if str(config_ref).isdigit():
-                try:
-                    return qs.get(pk=int(config_ref))
-                except (LLMConfig.DoesNotExist, ValueError, TypeError):
-                    return None
+        """
+        Resolve config_ref with one query. The URLconf's <uuid:> and <int:>
+        converters already typed it: UUID is the public id, int the legacy
+        pk.
+        """
+        if isinstance(config_ref, uuid.UUID):
+            lookup = {"uuid": config_ref}
+        elif isinstance(config_ref, int):
+            lookup = {"pk": config_ref}
+        else:
             return None
+        return LLMConfig.objects.select_related("user").filter(**lookup).first()
 
 
 class AdminLLMConfigUserListView(APIView):
@@ -337,8 +378,9 @@ class AdminLLMConfigUserListView(APIView):
     def get(self, request):
         user_id = request.query_params.get("user_id")
         qs = (
-            LLMConfig.objects.filter(scope=LLMConfig.Scope.USER)
+            LLMConfig.objects.filter(scope=_SCOPE_USER)
             .select_related("user")
+            .only(*_LIST_COLUMNS)
         )
         if user_id is not None and str(user_id).strip():
             qs = qs.filter(user_id=user_id)
@@ -372,9 +414,9 @@ class AdminLLMConfigUserDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
         qs = LLMConfig.objects.filter(
-            scope=LLMConfig.Scope.USER,
+            scope=_SCOPE_USER,
             user_id=user.pk,
-            model_type=LLMConfig.MODEL_TYPE_LLM,
+            model_type=_MODEL_TYPE_LLM,
         ).select_related("user")
         if qs.count() > 1:
             return Response(
@@ -420,9 +462,9 @@ class AdminLLMConfigUserDetailView(APIView):
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
         data = ser.validated_data
         qs = LLMConfig.objects.filter(
-            scope=LLMConfig.Scope.USER,
+            scope=_SCOPE_USER,
             user=user,
-            model_type=LLMConfig.MODEL_TYPE_LLM,
+            model_type=_MODEL_TYPE_LLM,
         )
         if qs.count() > 1:
             return Response(
@@ -437,17 +479,17 @@ class AdminLLMConfigUserDetailView(APIView):
         obj = qs.first()
         if obj is None:
             obj = LLMConfig.objects.create(
-                scope=LLMConfig.Scope.USER,
+                scope=_SCOPE_USER,
                 user=user,
-                model_type=LLMConfig.MODEL_TYPE_LLM,
-                provider=(data.get("provider") or "openai").strip().lower(),
+                model_type=_MODEL_TYPE_LLM,
+                provider=_norm_provider(data.get("provider")),
                 config=_preserve_masked_secret_fields(
                     {}, data.get("config") or {}
                 ),
                 is_active=data.get("is_active", True),
             )
         else:
-            obj.provider = (data.get("provider") or "openai").strip().lower()
+            obj.provider = _norm_provider(data.get("provider"))
             obj.config = _preserve_masked_secret_fields(
                 obj.config or {}, data.get("config") or {}
             )
@@ -471,7 +513,7 @@ class AdminLLMConfigUserDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
         deleted, _ = LLMConfig.objects.filter(
-            scope=LLMConfig.Scope.USER, user=user
+            scope=_SCOPE_USER, user=user
         ).delete()
         if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -481,7 +523,4 @@ class AdminLLMConfigUserDetailView(APIView):
         )
 
     def _get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except (User.DoesNotExist, ValueError, TypeError):
-            return None
+        return _get_user_by_pk(user_id)
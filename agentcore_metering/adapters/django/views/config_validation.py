@@ -20,6 +20,7 @@ from agentcore_metering.adapters.django.services.runtime_config import (
     run_test_call_stream,
     validate_llm_config,
 )
+from agentcore_metering.adapters.django.utils import _norm_provider
 
 
 class AdminLLMConfigTestView(APIView):
@@ -53,7 +54,7 @@ class AdminLLMConfigTestView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         data = ser.validated_data
-        provider = (data.get("provider") or "openai").strip().lower()
+        provider = _norm_provider(data.get("provider"))
         config = data.get("config") or {}
         ok, message = validate_llm_config(provider, config, user=request.user)
         if ok:
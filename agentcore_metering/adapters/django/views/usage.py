@@ -2,8 +2,12 @@
 Admin API views for LLM usage list and token statistics.
 
 Read-only; requires IsAdminUser. Used by management UI for usage log and
-cost/summary stats.
+cost/summary stats. Responses carry ETag/Last-Modified validators; a
+matching If-None-Match returns 304 without running the aggregate queries.
 """
+from typing import Any, Callable, Optional, Tuple
+
+from django.utils.http import http_date, parse_etags
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
@@ -18,11 +22,30 @@ from agentcore_metering.adapters.django.serializers import (
 )
 from agentcore_metering.adapters.django.services.usage_list import (
     get_llm_usage_list_from_query,
+    get_llm_usage_list_validators,
 )
 from agentcore_metering.adapters.django.services.usage_aggregation import (
     get_token_stats_from_query,
+    get_token_stats_validators,
 )
 
+def _conditional_response(
+    request,
+    validators: Optional[Tuple[str, Any]],
+    build: Callable[[], Any],
+) -> Response:
+    """Serve 304 on a matching If-None-Match, else the freshly built payload."""
+    if validators is None:
+        return Response(build())
+    etag, last_modified = validators
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified.timestamp())
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(build(), headers=headers)
+
 
 class AdminTokenStatsView(APIView):
     """
@@ -85,14 +108,18 @@ class AdminTokenStatsView(APIView):
         },
     )
     def get(self, request):
+        params = request.query_params
         try:
-            data = get_token_stats_from_query(request.query_params)
+            return _conditional_response(
+                request,
+                get_token_stats_validators(params),
+                lambda: get_token_stats_from_query(params),
+            )
         except ValueError as e:
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        return Response(data)
 
 
 class AdminLLMUsageListView(APIView):
@@ -162,5 +189,9 @@ class AdminLLMUsageListView(APIView):
         responses={200: LLMUsageListResponseSerializer},
     )
     def get(self, request):
-        data = get_llm_usage_list_from_query(request.query_params)
-        return Response(data)
+        params = request.query_params
+        return _conditional_response(
+            request,
+            get_llm_usage_list_validators(params),
+            lambda: get_llm_usage_list_from_query(params),
+        )
@@ -5,6 +5,8 @@ Base path: /api/v1/admin/ (as in tests/urls.py).
 """
 import pytest
 
+from agentcore_metering.adapters.django.models import LLMUsage
+
 
 @pytest.mark.api
 @pytest.mark.django_db
@@ -31,6 +33,30 @@ class TestAdminTokenStatsAPI:
         assert body["summary"]["total_tokens"] == 0
         assert body["by_model"] == []
 
+    def test_matching_if_none_match_returns_304(self, admin_client):
+        url = "/api/v1/admin/token-stats/"
+        first = admin_client.get(url)
+        etag = first["ETag"]
+        assert etag
+
+        second = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert second.status_code == 304
+
+        LLMUsage.objects.create(model="m1", total_tokens=5)
+        third = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert third.status_code == 200
+        assert third["ETag"] != etag
+        assert third.json()["summary"]["total_tokens"] == 5
+        assert "Last-Modified" in third
+
+    def test_use_series_response_has_no_etag(self, admin_client):
+        response = admin_client.get(
+            "/api/v1/admin/token-stats/",
+            {"use_series": "1"},
+        )
+        assert response.status_code == 200
+        assert "ETag" not in response
+
     def test_admin_returns_400_for_invalid_granularity(self, admin_client):
         response = admin_client.get(
             "/api/v1/admin/token-stats/",
@@ -41,6 +67,29 @@ class TestAdminTokenStatsAPI:
         assert "detail" in body
         assert "Unsupported granularity" in body["detail"]
 
+    def test_invalid_granularity_with_if_none_match_returns_400(
+        self, admin_client
+    ):
+        response = admin_client.get(
+            "/api/v1/admin/token-stats/",
+            {"granularity": "invalid"},
+            HTTP_IF_NONE_MATCH="*",
+        )
+        assert response.status_code == 400
+
+    def test_changed_data_with_same_max_and_count_is_rebuilt(
+        self, admin_client
+    ):
+        url = "/api/v1/admin/token-stats/"
+        usage = LLMUsage.objects.create(model="m1", total_tokens=5)
+        first = admin_client.get(url)
+        LLMUsage.objects.filter(pk=usage.pk).update(total_tokens=7)
+
+        second = admin_client.get(url)
+        assert second.status_code == 200
+        assert second["ETag"] == first["ETag"]
+        assert second.json()["summary"]["total_tokens"] == 7
+
 
 @pytest.mark.api
 @pytest.mark.django_db
@@ -87,3 +136,15 @@ class TestAdminLLMUsageListAPI:
         body = response.json()
         assert body["page"] == 1
         assert body["page_size"] == 20
+
+    def test_matching_if_none_match_returns_304(self, admin_client):
+        url = "/api/v1/admin/llm-usage/"
+        etag = admin_client.get(url)["ETag"]
+
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        other_page = admin_client.get(
+            url, {"page": "2"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert other_page.status_code == 200
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from agentcore_metering.adapters.django.services.litellm_retry import (
+    acompletion_with_retry,
     calculate_retry_delay,
     completion_with_retry,
     iter_completion_with_retry,
@@ -160,3 +161,87 @@ def test_stream_does_not_replay_after_first_emitted_chunk():
         next(stream)
 
     assert completion.call_count == 1
+
+
+@pytest.mark.unit
+def test_stream_prefetch_keeps_order_and_retry_semantics():
+    def failing_stream():
+        raise TransientProviderError(502)
+        yield
+
+    completion = MagicMock(
+        side_effect=[failing_stream(), iter(["first", "second", "third"])]
+    )
+
+    with patch("agentcore_metering.adapters.django.services.litellm_retry.time.sleep"):
+        chunks = list(
+            iter_completion_with_retry(
+                completion,
+                {"model": "test", "timeout": 30, "num_retries": 2},
+                has_emitted=lambda: False,
+                prefetch=2,
+            )
+        )
+
+    assert chunks == ["first", "second", "third"]
+    assert completion.call_count == 2
+
+
+@pytest.mark.unit
+def test_stream_prefetch_stops_producer_when_consumer_closes():
+    import threading
+
+    closed = threading.Event()
+
+    def endless_stream():
+        try:
+            n = 0
+            while True:
+                n += 1
+                yield n
+        finally:
+            closed.set()
+
+    stream = iter_completion_with_retry(
+        MagicMock(return_value=endless_stream()),
+        {"model": "test", "timeout": 30, "num_retries": 0},
+        has_emitted=lambda: True,
+        prefetch=4,
+    )
+
+    assert next(stream) == 1
+    stream.close()
+
+    assert closed.wait(timeout=2)
+
+@pytest.mark.unit
+def test_async_completion_retries_transient_error():
+    import asyncio
+
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise TransientProviderError(503)
+        return "success"
+
+    async def no_sleep(_delay):
+        return None
+
+    with patch(
+        "agentcore_metering.adapters.django.services.litellm_retry"
+        ".asyncio.sleep",
+        side_effect=no_sleep,
+    ) as sleep:
+        result = asyncio.run(
+            acompletion_with_retry(
+                acompletion,
+                {"model": "test", "timeout": 30, "num_retries": 2},
+            )
+        )
+
+    assert result == "success"
+    assert len(calls) == 2
+    assert sleep.call_count == 1
+    assert calls[0]["num_retries"] == 0
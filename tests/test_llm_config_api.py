@@ -93,6 +93,89 @@ class TestAdminLLMConfigGlobal:
         )
 
 
+    def test_get_detail_by_uuid_or_legacy_pk(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        obj = LLMConfig.objects.create(
+            scope=LLMConfig.Scope.GLOBAL,
+            provider="openai",
+            config={"api_key": "sk-a", "model": "gpt-4"},
+        )
+        for ref in (obj.uuid, obj.pk):
+            with CaptureQueriesContext(connection) as ctx:
+                response = admin_client.get(f"/api/v1/admin/llm-config/{ref}/")
+            assert response.status_code == 200
+            assert response.json()["uuid"] == str(obj.uuid)
+            lookups = [
+                q for q in ctx.captured_queries
+                if f'FROM "{LLMConfig._meta.db_table}"' in q["sql"]
+                and "JOIN" in q["sql"]
+            ]
+            assert len(lookups) == 1
+
+        missing = admin_client.get(f"/api/v1/admin/llm-config/{obj.pk + 1}/")
+        assert missing.status_code == 404
+
+    def test_all_list_joins_users_only_when_needed(
+        self, admin_client, normal_user
+    ):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        LLMConfig.objects.create(
+            scope=LLMConfig.Scope.GLOBAL, provider="openai", config={}
+        )
+        LLMConfig.objects.create(
+            scope=LLMConfig.Scope.USER,
+            user=normal_user,
+            provider="openai",
+            config={},
+        )
+        table = LLMConfig._meta.db_table
+        expected = {"all": 2, "global": 1, "user": 1}
+        for scope, count in expected.items():
+            with CaptureQueriesContext(connection) as ctx:
+                response = admin_client.get(
+                    f"/api/v1/admin/llm-config/all/?scope={scope}"
+                )
+            assert len(response.json()) == count
+            list_sql = [
+                q["sql"] for q in ctx.captured_queries
+                if f'FROM "{table}"' in q["sql"] and "ORDER BY" in q["sql"]
+                and '"scope"' in q["sql"].split("ORDER BY")[1]
+            ]
+            assert len(list_sql) == 1
+            assert ("JOIN" in list_sql[0]) is (scope != "global")
+
+    def test_put_writes_only_changed_columns(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        obj = LLMConfig.objects.create(
+            scope=LLMConfig.Scope.GLOBAL,
+            provider="openai",
+            config={"api_key": "sk-a"},
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = admin_client.put(
+                f"/api/v1/admin/llm-config/{obj.uuid}/",
+                {"is_active": False},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        updates = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE")
+        ]
+        assert len(updates) == 1
+        assert '"is_active"' in updates[0]
+        assert '"config"' not in updates[0]
+        obj.refresh_from_db()
+        assert obj.is_active is False
+        assert obj.config == {"api_key": "sk-a"}
+
     def test_put_global_preserves_masked_api_key_when_setting_default(
         self, admin_client
     ):
@@ -235,6 +318,23 @@ class TestAdminLLMConfigUser:
         response = admin_client.get("/api/v1/admin/llm-config/users/999999/")
         assert response.status_code == 404
 
+    def test_post_user_scope_rejects_unknown_or_invalid_user_id(
+        self, admin_client
+    ):
+        for user_id in (999999, "abc"):
+            response = admin_client.post(
+                "/api/v1/admin/llm-config/",
+                {
+                    "provider": "openai",
+                    "config": {"api_key": "sk-x"},
+                    "scope": "user",
+                    "user_id": user_id,
+                },
+                format="json",
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"] == "User not found."
+
     def test_list_user_configs_empty(self, admin_client):
         response = admin_client.get("/api/v1/admin/llm-config/users/")
         assert response.status_code == 200
@@ -253,3 +353,27 @@ class TestAdminLLMConfigUser:
         data = response.json()
         assert len(data) == 1
         assert data[0]["user_id"] == normal_user.pk
+
+    def test_list_user_configs_loads_username_only_in_one_query(
+        self, admin_client, normal_user
+    ):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        admin_client.put(
+            f"/api/v1/admin/llm-config/users/{normal_user.pk}/",
+            {"provider": "openai", "config": {"api_key": "sk-x"}},
+            format="json",
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = admin_client.get("/api/v1/admin/llm-config/users/")
+
+        assert response.json()[0]["username"] == normal_user.username
+        assert "api_key" in response.json()[0]["config"]
+        list_sql = [
+            q["sql"] for q in ctx.captured_queries
+            if "JOIN" in q["sql"]
+            and LLMConfig._meta.db_table in q["sql"]
+        ]
+        assert len(list_sql) == 1
+        assert "password" not in list_sql[0]
@@ -1,6 +1,7 @@
 """
 Tests for trackers.llm.LLMTracker (LiteLLM): call_and_track exception paths.
 """
+import itertools
 from datetime import datetime
 from types import SimpleNamespace
 import pytest
@@ -461,7 +462,7 @@ class TestCallAndTrackJsonRepairRetry:
         "agentcore_metering.adapters.django.trackers.llm.time.sleep"
     )
     @patch(
-        "agentcore_metering.adapters.django.trackers.llm.timezone.now"
+        "agentcore_metering.adapters.django.trackers.llm.time.time_ns"
     )
     @patch(
         "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
@@ -482,10 +483,9 @@ class TestCallAndTrackJsonRepairRetry:
         mock_sleep,
     ):
         mock_params.return_value = {"model": "gpt-4", "api_key": "sk-x"}
-        mock_now.side_effect = [
-            datetime(2026, 3, 17, 10, 0, 0),
-            datetime(2026, 3, 17, 10, 0, 1),
-        ]
+        mock_now.side_effect = itertools.count(
+            1_773_741_600_000_000_000, 1_000_000_000
+        ).__next__
 
         usage = SimpleNamespace(
             prompt_tokens=10,
@@ -633,6 +633,113 @@ class TestCallAndTrackStreaming:
         assert save_kwargs["is_streaming"] is True
         assert save_kwargs.get("first_chunk_at") is not None
 
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.completion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_stream_uses_usage_chunk_before_trailing_chunk(
+        self, mock_params, mock_completion, mock_save_usage
+    ):
+        mock_params.return_value = {"model": "gpt-4", "api_key": "sk-x"}
+        content_chunk = SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content="Hi"))],
+            usage=None,
+            model="gpt-4",
+        )
+        usage_chunk = SimpleNamespace(
+            choices=[],
+            usage=SimpleNamespace(
+                prompt_tokens=11, completion_tokens=4, total_tokens=15
+            ),
+            model="gpt-4",
+        )
+        trailing_chunk = SimpleNamespace(choices=[], usage=None, model="gpt-4")
+        mock_completion.return_value = iter(
+            [content_chunk, usage_chunk, trailing_chunk]
+        )
+
+        gen = LLMTracker.call_and_track(
+            messages=[{"role": "user", "content": "hi"}],
+            stream=True,
+        )
+        assert list(gen) == [("content", "Hi")]
+
+        save_kwargs = mock_save_usage.call_args.kwargs
+        assert save_kwargs["prompt_tokens"] == 11
+        assert save_kwargs["completion_tokens"] == 4
+        assert save_kwargs["total_tokens"] == 15
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.completion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_stream_params_built_without_mutating_config(
+        self, mock_params, mock_completion, mock_save_usage
+    ):
+        base = {"model": "gpt-4", "api_key": "sk-x"}
+        mock_params.return_value = base
+        mock_completion.return_value = iter([])
+
+        list(
+            LLMTracker.call_and_track(
+                messages=[{"role": "user", "content": "hi"}],
+                max_tokens=5,
+                stream=True,
+            )
+        )
+
+        assert base == {"model": "gpt-4", "api_key": "sk-x"}
+        sent = mock_completion.call_args.kwargs
+        assert sent["stream"] is True
+        assert sent["stream_options"] == {"include_usage": True}
+        assert sent["max_tokens"] == 5
+        assert "temperature" not in sent
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.completion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_stream_closed_by_client_saves_partial_usage_once(
+        self, mock_params, mock_completion, mock_save_usage
+    ):
+        mock_params.return_value = {"model": "gpt-4", "api_key": "sk-x"}
+        chunks = [
+            SimpleNamespace(
+                choices=[
+                    SimpleNamespace(delta=SimpleNamespace(content=text))
+                ],
+                usage=None,
+                model="gpt-4",
+            )
+            for text in ("a", "b", "c")
+        ]
+        mock_completion.return_value = iter(chunks)
+        state = {}
+
+        gen = LLMTracker.call_and_track(
+            messages=[{"role": "user", "content": "hi"}],
+            stream=True,
+            state=state,
+        )
+        assert next(gen) == ("content", "a")
+        gen.close()
+
+        assert mock_save_usage.call_count == 1
+        assert mock_save_usage.call_args.kwargs["success"] is True
+        assert len(state["llm_calls"]) == 1
+
     @patch(
         "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
         "._save_usage_to_db"
@@ -1039,6 +1146,211 @@ class TestCallAndTrackProviderRetries:
         assert mock_save_usage.call_args.kwargs["success"] is False
 
 
+
+def _completion_response(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=3, completion_tokens=2, total_tokens=5
+        ),
+        model="gpt-4",
+        _hidden_params={},
+    )
+
+
+@pytest.mark.unit
+class TestAsyncCallAndTrack:
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.acompletion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_acall_records_usage_and_state(
+        self, mock_params, mock_acompletion, mock_save_usage
+    ):
+        import asyncio
+
+        mock_params.return_value = {"model": "gpt-4", "api_key": "sk-x"}
+        mock_acompletion.return_value = _completion_response("hello")
+        state = {"user_id": 7}
+
+        content, usage = asyncio.run(
+            LLMTracker.acall_and_track(
+                messages=[{"role": "user", "content": "hi"}],
+                node_name="n1",
+                state=state,
+            )
+        )
+
+        assert content == "hello"
+        assert usage["total_tokens"] == 5
+        assert mock_acompletion.await_count == 1
+        assert state["llm_calls"][0]["node"] == "n1"
+        save_kwargs = mock_save_usage.call_args.kwargs
+        assert save_kwargs["total_tokens"] == 5
+        assert save_kwargs["is_streaming"] is False
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_batch_limits_concurrency_and_keeps_order(
+        self, mock_params, mock_save_usage
+    ):
+        import asyncio
+
+        # get_litellm_params hands every call its own dict.
+        mock_params.side_effect = lambda **kwargs: {
+            "model": "gpt-4",
+            "api_key": "sk-x",
+        }
+        in_flight = 0
+        peak = 0
+
+        async def fake_acompletion(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _completion_response(kwargs["messages"][0]["content"])
+
+        requests = [
+            {"messages": [{"role": "user", "content": f"q{i}"}]}
+            for i in range(5)
+        ]
+        with patch("litellm.acompletion", side_effect=fake_acompletion):
+            results = asyncio.run(
+                LLMTracker.abatch_call_and_track(
+                    requests, max_concurrency=2
+                )
+            )
+
+        assert [content for content, _usage in results] == [
+            f"q{i}" for i in range(5)
+        ]
+        assert peak == 2
+        assert mock_save_usage.call_count == 5
+
+    def test_batch_rejects_non_positive_concurrency(self):
+        import asyncio
+
+        with pytest.raises(ValueError, match="max_concurrency"):
+            asyncio.run(
+                LLMTracker.abatch_call_and_track([], max_concurrency=0)
+            )
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        yield
+        cache.clear()
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.completion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_hit_skips_provider_and_records_zero_cost_row(
+        self, mock_params, mock_completion, mock_save_usage
+    ):
+        mock_params.side_effect = lambda **kwargs: {
+            "model": "gpt-4",
+            "api_key": "sk-x",
+        }
+        mock_completion.return_value = _completion_response("answer")
+        messages = [{"role": "user", "content": "hi"}]
+
+        first = LLMTracker.call_and_track(
+            messages=messages, temperature=0, cache_key=True
+        )
+        state = {}
+        content, usage = LLMTracker.call_and_track(
+            messages=messages, temperature=0, cache_key=True, state=state
+        )
+
+        assert first[0] == content == "answer"
+        assert mock_completion.call_count == 1
+        assert usage["from_cache"] is True
+        assert usage["total_tokens"] == 0
+        assert state["llm_calls"][0]["is_cached"] is True
+        save_kwargs = mock_save_usage.call_args.kwargs
+        assert save_kwargs["is_cached"] is True
+        assert save_kwargs["cost"] == 0
+        assert save_kwargs["total_tokens"] == 0
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    @patch("litellm.completion")
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.get_litellm_params"
+    )
+    def test_different_params_and_no_cache_key_miss(
+        self, mock_params, mock_completion, mock_save_usage
+    ):
+        mock_params.side_effect = lambda **kwargs: {
+            "model": "gpt-4",
+            "api_key": "sk-x",
+        }
+        mock_completion.return_value = _completion_response("answer")
+        messages = [{"role": "user", "content": "hi"}]
+
+        LLMTracker.call_and_track(
+            messages=messages, temperature=0, cache_key=True
+        )
+        LLMTracker.call_and_track(
+            messages=messages, temperature=1, cache_key=True
+        )
+        LLMTracker.call_and_track(messages=messages, temperature=0)
+
+        assert mock_completion.call_count == 3
+
+    def test_key_ignores_credentials(self):
+        from agentcore_metering.adapters.django.trackers.response_cache import (
+            response_cache_key,
+        )
+
+        base = {"model": "m", "messages": [{"role": "user", "content": "q"}]}
+        assert response_cache_key(
+            True, {**base, "api_key": "a"}
+        ) == response_cache_key(True, {**base, "api_key": "b"})
+        assert response_cache_key("k", base) != response_cache_key(
+            "k", {**base, "model": "other"}
+        )
+
+    def test_str_key_scoped_by_return_flags(self):
+        from agentcore_metering.adapters.django.trackers.response_cache import (
+            response_cache_key,
+        )
+
+        base = {"model": "m"}
+        as_message = response_cache_key("k", base, return_message=True)
+        assert as_message != response_cache_key(
+            "k", base, return_message=False
+        )
+        assert response_cache_key(
+            "k", base, json_repair=True
+        ) != response_cache_key("k", base, json_repair=False)
+        assert as_message == response_cache_key(
+            "k", {**base, "messages": ["ignored"]}, return_message=True
+        )
+
 def test_raise_friendly_noop_when_disabled():
     # Default (friendly_errors=False): no-op, original exception left to caller.
     from agentcore_metering.adapters.django.trackers.llm import _raise_friendly
@@ -1056,3 +1368,456 @@ def test_raise_friendly_raises_when_enabled():
 
     with _pytest.raises(LLMProviderError):
         _raise_friendly(Exception("Insufficient Balance"), True)
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestSaveUsageBuffer:
+    """
+    With AGENTCORE_METERING_USAGE_BUFFER_SIZE > 1, _save_usage_to_db queues
+    rows and writes them in one bulk insert when the buffer fills.
+    """
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rows_written_when_buffer_fills(self, settings):
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 2
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 60
+        LLMTracker._save_usage_to_db(model="m1", total_tokens=1)
+        assert LLMUsage.objects.count() == 0
+
+        LLMTracker._save_usage_to_db(model="m2", total_tokens=2)
+        rows = list(LLMUsage.objects.order_by("created_at"))
+        assert [r.model for r in rows] == ["m1", "m2"]
+        assert rows[0].created_at < rows[1].created_at
+        assert usage_buffer.flush_usage_buffer() == 0
+
+    def test_full_buffer_not_written_in_caller_transaction(
+        self, settings, monkeypatch
+    ):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        monkeypatch.setattr(usage_buffer, "_ensure_flusher", lambda: None)
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 2
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 60
+        usage_buffer._wake.clear()
+        with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+            LLMTracker._save_usage_to_db(model="m1")
+            LLMTracker._save_usage_to_db(model="m2")
+
+        assert not any(
+            q["sql"].startswith("INSERT") for q in ctx.captured_queries
+        )
+        assert usage_buffer._wake.is_set()
+        usage_buffer._wake.clear()
+        assert usage_buffer._flush_stale(force=True) == 2
+        assert LLMUsage.objects.filter(model__in=["m1", "m2"]).count() == 2
+
+    def test_failed_flush_leaves_caller_transaction_usable(self):
+        from django.db import transaction
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        existing = LLMUsage.objects.create(model="m0")
+        with transaction.atomic():
+            with pytest.raises(Exception):
+                usage_buffer._write([LLMUsage(id=existing.id, model="dup")])
+            assert LLMUsage.objects.filter(model="m0").count() == 1
+
+    def test_failed_batch_keeps_good_rows_and_logs_dropped(
+        self, settings, monkeypatch, caplog
+    ):
+        import logging
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        monkeypatch.setattr(usage_buffer, "_ensure_flusher", lambda: None)
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 10
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 60
+        existing = LLMUsage.objects.create(model="m0")
+        usage_buffer.buffer_usage(LLMUsage(model="m1"))
+        usage_buffer.buffer_usage(LLMUsage(id=existing.id, model="dup"))
+        usage_buffer.buffer_usage(LLMUsage(model="m2"))
+
+        with caplog.at_level(logging.WARNING):
+            assert usage_buffer.flush_usage_buffer() == 2
+
+        assert set(LLMUsage.objects.values_list("model", flat=True)) == {
+            "m0", "m1", "m2",
+        }
+        assert "Dropped 1 of 3 buffered LLM usage rows" in caplog.text
+
+    def test_cache_hit_ratio_stored_on_write(self):
+        from decimal import Decimal
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+
+        LLMTracker._save_usage_to_db(
+            model="m1", prompt_tokens=3, cached_tokens=2
+        )
+        LLMTracker._save_usage_to_db(model="m2", prompt_tokens=0)
+
+        ratios = dict(LLMUsage.objects.values_list("model", "cache_hit_ratio"))
+        assert ratios["m1"] == Decimal("0.6667")
+        assert ratios["m2"] == 0
+
+    def test_direct_insert_in_transaction_skips_savepoint_on_sqlite(self):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+            LLMTracker._save_usage_to_db(model="m1", total_tokens=1)
+
+        assert LLMUsage.objects.filter(model="m1").count() == 1
+        assert not any("SAVEPOINT" in q["sql"] for q in ctx.captured_queries)
+
+    def test_flush_writes_partial_buffer(self, settings):
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 10
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 60
+        LLMTracker._save_usage_to_db(model="m1")
+        assert usage_buffer.flush_usage_buffer() == 1
+        assert LLMUsage.objects.filter(model="m1").count() == 1
+
+    def test_stale_rows_flushed_without_new_calls(self, settings, monkeypatch):
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        started = []
+        monkeypatch.setattr(
+            usage_buffer, "_ensure_flusher", lambda: started.append(True)
+        )
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 10
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 60
+        LLMTracker._save_usage_to_db(model="m1")
+        assert started
+        assert usage_buffer._flush_stale() == 0
+
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 0
+        assert usage_buffer._flush_stale() == 1
+        assert LLMUsage.objects.filter(model="m1").count() == 1
+
+    def test_batch_written_as_paged_multi_row_inserts(self, monkeypatch):
+        from decimal import Decimal
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        monkeypatch.setattr(usage_buffer, "BULK_INSERT_BATCH_SIZE", 2)
+        batch = [
+            LLMUsage(model=f"m{i}", cost=Decimal("0.5"), metadata={"i": i})
+            for i in range(5)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            usage_buffer._write(batch)
+
+        inserts = [
+            q for q in ctx.captured_queries if q["sql"].startswith("INSERT")
+        ]
+        assert len(inserts) == 3
+        rows = LLMUsage.objects.order_by("model")
+        assert [r.metadata["i"] for r in rows] == [0, 1, 2, 3, 4]
+        assert rows[4].cost == Decimal("0.5")
+
+    def test_unbuffered_by_default(self):
+        from agentcore_metering.adapters.django.models import LLMUsage
+
+        LLMTracker._save_usage_to_db(model="m1")
+        assert LLMUsage.objects.filter(model="m1").count() == 1
+
+    def test_copy_csv_quotes_strings_and_leaves_nulls_bare(self):
+        import csv
+        import io
+        from decimal import Decimal
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.trackers import usage_buffer
+
+        fields = LLMUsage._meta.concrete_fields
+        usage = LLMUsage(
+            model="m1",
+            cost=Decimal("0.5"),
+            cost_currency="",
+            metadata={"a": "x,y"},
+        )
+
+        text = usage_buffer._usage_csv([usage], fields).getvalue()
+
+        row = dict(
+            zip(
+                [f.attname for f in fields],
+                next(csv.reader(io.StringIO(text))),
+            )
+        )
+        assert row["model"] == "m1"
+        assert row["metadata"] == '{"a": "x,y"}'
+        assert row["id"] == str(usage.id)
+        assert row["is_streaming"] == "false"
+        line = text.rstrip("\n")
+        # Empty string is quoted; NULL columns (user_id, error) are bare.
+        assert ',"",' in line
+        assert ",," in line
+
+    def test_direct_insert_round_trips_field_types(self):
+        from decimal import Decimal
+
+        from django.db import transaction
+        from django.utils import timezone
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+
+        started = timezone.now()
+        with transaction.atomic():
+            LLMTracker._save_usage_to_db(
+                state={"node_name": "n1", "metadata": {"k": [1, 2]}},
+                model="m1",
+                total_tokens=5,
+                cost=Decimal("0.001250"),
+                started_at=started,
+                is_streaming=True,
+            )
+        row = LLMUsage.objects.get(model="m1")
+        assert row.metadata == {"node_name": "n1", "k": [1, 2]}
+        assert row.cost == Decimal("0.001250")
+        assert row.started_at == started
+        assert row.is_streaming is True
+        assert row.created_at is not None
+
+
+@pytest.mark.unit
+class TestUsageMetadata:
+    def test_collects_source_fields_and_extra_metadata(self):
+        from agentcore_metering.adapters.django.trackers.llm import (
+            _usage_metadata,
+        )
+
+        state = {
+            "source_type": "agent",
+            "celery_task_id": 42,
+            "source_path": "/a/b",
+            "metadata": {"source_type": "override", "k": 1},
+        }
+
+        meta = _usage_metadata(state, "node1", " gpt-4o ")
+
+        assert meta == {
+            "node_name": "node1",
+            "source_type": "override",
+            "source_task_id": "42",
+            "source_path": "/a/b",
+            "response_model": "gpt-4o",
+            "k": 1,
+        }
+
+    def test_empty_when_nothing_known(self):
+        from agentcore_metering.adapters.django.trackers.llm import (
+            _usage_metadata,
+        )
+
+        assert _usage_metadata({}, "unknown", "  ") == {}
+
+
+class TestUsageRecord:
+    def test_cost_normalized_once_and_invalid_cost_dropped(self):
+        from decimal import Decimal
+
+        from agentcore_metering.adapters.django.trackers.llm import (
+            UsageRecord,
+        )
+
+        assert UsageRecord(cost=0.25).cost == Decimal("0.25")
+        assert UsageRecord(cost="n/a").cost is None
+        assert UsageRecord(cost_currency="").cost_currency == "USD"
+
+    def test_model_and_currency_interned(self):
+        from agentcore_metering.adapters.django.trackers.llm import (
+            UsageRecord,
+        )
+
+        model = "".join(["gpt-4o", "-mini"])
+        rec = UsageRecord(model=model, cost_currency="".join(["U", "SD"]))
+        assert rec.model is UsageRecord(model="gpt-4o-mini").model
+        assert rec.cost_currency is UsageRecord().cost_currency
+
+    def test_call_dict_cost_survives_json_dumps(self):
+        import json
+
+        from agentcore_metering.adapters.django.trackers.llm import (
+            UsageRecord,
+        )
+
+        rec = UsageRecord(model="gpt-4o", cost="0.0125")
+        state = {"llm_calls": [rec.as_call_dict("n1")]}
+
+        loaded = json.loads(json.dumps(state))
+        assert loaded["llm_calls"][0]["cost"] == 0.0125
+        assert UsageRecord().as_call_dict("n1")["cost"] is None
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    def test_failed_call_feeds_state_and_db_from_one_record(self, mock_save):
+        from agentcore_metering.adapters.django.trackers.llm import (
+            _record_failed_llm_call,
+        )
+
+        state = {}
+        _record_failed_llm_call(
+            effective_state={"node_name": "n1"},
+            state=state,
+            request_started_ns=None,
+            is_streaming=False,
+            error_msg="boom",
+        )
+
+        entry = state["llm_calls"][0]
+        assert entry["node"] == "n1"
+        assert entry["success"] is False
+        assert entry["error"] == "boom"
+        assert entry["cached_tokens"] == 0
+        save_kwargs = mock_save.call_args.kwargs
+        assert save_kwargs["success"] is False
+        assert save_kwargs["error"] == "boom"
+        assert save_kwargs["model"] == entry["model"] == "unknown"
+
+    @patch(
+        "agentcore_metering.adapters.django.trackers.llm.LLMTracker"
+        "._save_usage_to_db"
+    )
+    def test_failure_logged_once_with_traceback(self, mock_save, caplog):
+        import logging
+
+        from agentcore_metering.adapters.django.trackers.llm import (
+            _log_and_record_failure,
+        )
+
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError as exc:
+            with caplog.at_level(logging.ERROR):
+                _log_and_record_failure(
+                    exc,
+                    effective_state={"node_name": "n1"},
+                    state=None,
+                    request_started_ns=None,
+                    is_streaming=False,
+                    started_monotonic=0.0,
+                    friendly_errors=False,
+                )
+
+        assert len(caplog.records) == 1
+        record = caplog.records[0]
+        assert "node_name=n1" in record.getMessage()
+        assert "error_type=RuntimeError" in record.getMessage()
+        assert record.exc_info[0] is RuntimeError
+
+    def test_datetime_from_ns_matches_use_tz(self, settings):
+        from datetime import timezone as dt_timezone
+
+        from agentcore_metering.adapters.django.trackers.llm import (
+            _datetime_from_ns,
+        )
+
+        settings.USE_TZ = True
+        assert _datetime_from_ns(1_773_741_600_123_456_789) == datetime(
+            2026, 3, 17, 10, 0, 0, 123456, tzinfo=dt_timezone.utc
+        )
+        assert _datetime_from_ns(None) is None
+        settings.USE_TZ = False
+        assert _datetime_from_ns(1_773_741_600_000_000_000).tzinfo is None
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestAsyncUsageWrites:
+    """
+    With AGENTCORE_METERING_ASYNC_USAGE_WRITES, _save_usage_to_db enqueues
+    save_llm_usage_task; the task rebuilds and inserts the same row.
+    """
+
+    def test_enqueues_payload_and_task_inserts_row(self, settings):
+        from decimal import Decimal
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.tasks.usage import (
+            save_llm_usage_task,
+        )
+
+        settings.AGENTCORE_METERING_ASYNC_USAGE_WRITES = True
+        settings.AGENTCORE_METERING_USAGE_WRITE_QUEUE = "metering"
+        with patch.object(save_llm_usage_task, "apply_async") as send:
+            LLMTracker._save_usage_to_db(
+                state={"node_name": "n1"},
+                model="m1",
+                total_tokens=5,
+                cost=Decimal("0.123456"),
+            )
+        assert LLMUsage.objects.count() == 0
+        send.assert_called_once()
+        assert send.call_args.kwargs["queue"] == "metering"
+        payload = send.call_args.kwargs["args"][0]
+
+        save_llm_usage_task(payload)
+        save_llm_usage_task(payload)
+
+        row = LLMUsage.objects.get()
+        assert str(row.pk) == payload["id"]
+        assert row.total_tokens == 5
+        assert row.cost == Decimal("0.123456")
+        assert row.metadata == {"node_name": "n1"}
+        assert row.created_at.isoformat() == payload["created_at"]
+
+    def test_task_inserts_before_ack_even_with_buffer(self, settings):
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.tasks.usage import (
+            save_llm_usage_task,
+            usage_to_payload,
+        )
+
+        settings.AGENTCORE_METERING_USAGE_BUFFER_SIZE = 10
+        payload = usage_to_payload(LLMUsage(model="m1"))
+
+        save_llm_usage_task(payload)
+
+        assert LLMUsage.objects.filter(pk=payload["id"]).exists()
+
+    def test_task_logs_non_duplicate_integrity_error(self, caplog):
+        import logging
+
+        from django.db import IntegrityError
+
+        from agentcore_metering.adapters.django.models import LLMUsage
+        from agentcore_metering.adapters.django.tasks.usage import (
+            save_llm_usage_task,
+            usage_to_payload,
+        )
+
+        payload = usage_to_payload(LLMUsage(model="m1"))
+        with patch.object(
+            LLMUsage,
+            "save",
+            side_effect=IntegrityError("FOREIGN KEY constraint failed"),
+        ), caplog.at_level(logging.INFO):
+            save_llm_usage_task(payload)
+
+        [record] = [
+            r for r in caplog.records if "save_llm_usage_task" in r.message
+        ]
+        assert record.levelno == logging.ERROR
+        assert "FOREIGN KEY constraint failed" in record.message
+        assert "already stored" not in record.message
@@ -3,6 +3,9 @@ Tests for llm_usage: get_llm_usage_list and get_llm_usage_list_from_query.
 
 Paginated listing with filters (user_id, model, success, dates).
 """
+from decimal import Decimal
+from types import SimpleNamespace
+
 import pytest
 from django.utils import timezone as django_tz
 
@@ -11,6 +14,12 @@ from agentcore_metering.adapters.django.services.usage_list import (
     get_llm_usage_list_from_query,
 )
 from agentcore_metering.adapters.django.models import LLMUsage
+from agentcore_metering.adapters.django.trackers import llm_usage
+from agentcore_metering.adapters.django.trackers.llm_usage import (
+    fill_usage_with_token_fallback,
+    get_cost_from_response,
+    usage_dict_from_usage_obj,
+)
 
 
 @pytest.mark.unit
@@ -103,6 +112,16 @@ class TestGetLlmUsageList:
         assert out["total"] == 1
         assert out["results"][0]["success"] is False
 
+    def test_filter_by_success_bool(self):
+        LLMUsage.objects.create(model="m1", total_tokens=1, success=True)
+        LLMUsage.objects.create(model="m2", total_tokens=1, success=False)
+        out = get_llm_usage_list(success=False)
+        assert out["total"] == 1
+        assert out["results"][0]["success"] is False
+        out = get_llm_usage_list(success_filter="false", success=True)
+        assert out["total"] == 1
+        assert out["results"][0]["success"] is True
+
     def test_filter_by_start_and_end_date(self):
         base = django_tz.now()
         LLMUsage.objects.create(
@@ -155,6 +174,15 @@ class TestGetLlmUsageListFromQuery:
         assert out["total"] == 1
         assert out["results"][0]["model"] == "gpt-4"
 
+    def test_parses_success_case_insensitively_and_ignores_unknown(self):
+        LLMUsage.objects.create(model="m1", total_tokens=1, success=True)
+        LLMUsage.objects.create(model="m2", total_tokens=1, success=False)
+        out = get_llm_usage_list_from_query({"success": " FALSE "})
+        assert out["total"] == 1
+        assert out["results"][0]["success"] is False
+        out = get_llm_usage_list_from_query({"success": "maybe"})
+        assert out["total"] == 2
+
     def test_parses_start_date_and_end_date(self):
         LLMUsage.objects.create(model="m1", total_tokens=1)
         out = get_llm_usage_list_from_query({
@@ -275,3 +303,245 @@ class TestLLMUsageStreamingFields:
         item = out["results"][0]
         assert item["e2e_latency_sec"] is None
         assert item["output_tps"] is None
+
+
+@pytest.mark.unit
+class TestUsageDictFromUsageObj:
+    """Token extraction reads dicts and attribute objects the same way."""
+
+    def test_dict_and_object_give_same_counts(self):
+        raw = {
+            "prompt_tokens": 10,
+            "completion_tokens": "5",
+            "total_tokens": 0,
+            "prompt_tokens_details": {"cache_read_input_tokens": 3},
+            "completion_tokens_details": {"reasoning": 2},
+        }
+        from_dict = usage_dict_from_usage_obj(raw, "m")
+        from_obj = usage_dict_from_usage_obj(SimpleNamespace(**raw), "m")
+        assert from_dict == from_obj
+        assert from_dict["total_tokens"] == 15
+        assert from_dict["cached_tokens"] == 3
+        assert from_dict["reasoning_tokens"] == 2
+
+    def test_prompt_cache_hit_tokens_and_empty_usage(self):
+        usage = usage_dict_from_usage_obj(
+            {"prompt_tokens": 4, "prompt_cache_hit_tokens": 4}, "m"
+        )
+        assert usage["cached_tokens"] == 4
+        assert usage_dict_from_usage_obj(None, "m")["total_tokens"] == 0
+
+    def test_empty_usage_dicts_are_independent_copies(self):
+        first = usage_dict_from_usage_obj(None, "m1")
+        first["cost"] = 1.0
+        second = llm_usage.empty_usage_dict("m2")
+
+        assert second["model"] == "m2"
+        assert second["cost"] is None
+        assert second["cost_currency"] == "USD"
+
+    def test_nested_detail_keys_read_from_dict_or_object(self):
+        from agentcore_metering.adapters.django.utils import _read_nested_int
+
+        keys = ("cached_tokens", "cache_read_input_tokens")
+        assert _read_nested_int({"cache_read_input_tokens": "5"}, keys) == 5
+        assert _read_nested_int(
+            SimpleNamespace(cached_tokens=None, cache_read_input_tokens=2),
+            keys,
+        ) == 2
+        assert _read_nested_int(None, keys, 7) == 7
+
+
+@pytest.mark.unit
+class TestGetCostFromResponse:
+    def test_hidden_response_cost_numeric_types(self, monkeypatch):
+        import litellm
+
+        def _fail(**kwargs):
+            raise ValueError("no pricing")
+
+        monkeypatch.setattr(litellm, "completion_cost", _fail)
+        for raw, expected in (
+            (0.1, Decimal("0.1")),
+            (3, Decimal("3")),
+            (Decimal("0.000125"), Decimal("0.000125")),
+            ("0.5", Decimal("0.5")),
+        ):
+            response = SimpleNamespace(_hidden_params={"response_cost": raw})
+            assert get_cost_from_response(response) == expected
+
+    def test_hidden_response_cost_skips_completion_cost(self, monkeypatch):
+        import litellm
+
+        def _fail(**kwargs):
+            raise AssertionError("completion_cost called")
+
+        monkeypatch.setattr(litellm, "completion_cost", _fail)
+        response = SimpleNamespace(_hidden_params={"response_cost": 0.25})
+
+        assert get_cost_from_response(response) == Decimal("0.25")
+
+    def test_invalid_hidden_cost_falls_back_to_completion_cost(
+        self, monkeypatch
+    ):
+        import litellm
+
+        monkeypatch.setattr(litellm, "completion_cost", lambda **kwargs: 0.5)
+        response = SimpleNamespace(
+            _hidden_params={"response_cost": "n/a"}, model="m"
+        )
+
+        assert get_cost_from_response(response) == Decimal("0.5")
+
+    def test_stream_chunk_without_usage_skips_completion_cost(
+        self, monkeypatch
+    ):
+        import litellm
+
+        from agentcore_metering.adapters.django.trackers.llm_usage import (
+            usage_from_stream_chunk,
+        )
+
+        def _fail(**kwargs):
+            raise AssertionError("completion_cost called")
+
+        monkeypatch.setattr(litellm, "completion_cost", _fail)
+        chunk = SimpleNamespace(usage=None, _hidden_params={})
+
+        assert usage_from_stream_chunk(chunk, "m")["cost"] is None
+
+
+@pytest.mark.unit
+class TestFillUsageWithTokenFallback:
+    def test_reported_usage_skips_tokenizer_and_copy(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("tokenizer called")
+
+        monkeypatch.setattr(llm_usage, "token_count_messages", fail)
+        monkeypatch.setattr(llm_usage, "token_count_text", fail)
+        usage = {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+
+        out = fill_usage_with_token_fallback(
+            usage, "m", messages=[{"role": "user", "content": "hi"}],
+            content="hello",
+        )
+
+        assert out is usage
+
+    def test_nothing_to_fill_returns_input(self):
+        usage = {"prompt_tokens": 0, "completion_tokens": 2}
+
+        out = fill_usage_with_token_fallback(usage, "m", content="ok")
+
+        assert out is usage
+
+    def test_missing_counts_use_stripped_content(self, monkeypatch):
+        seen = []
+        monkeypatch.setattr(
+            llm_usage, "token_count_messages", lambda model, messages: 4
+        )
+        monkeypatch.setattr(
+            llm_usage,
+            "token_count_text",
+            lambda model, text: seen.append(text) or 2,
+        )
+
+        out = fill_usage_with_token_fallback(
+            {"prompt_tokens": 0}, "m", messages=[{}], content="  ok \n"
+        )
+
+        assert seen == ["ok"]
+        assert out["prompt_tokens"] == 4
+        assert out["completion_tokens"] == 2
+        assert out["total_tokens"] == 6
+
+
+@pytest.mark.unit
+class TestTokenCountCache:
+    def test_repeated_inputs_tokenized_once(self, monkeypatch):
+        import litellm
+
+        calls = []
+
+        def counter(model, text=None, messages=None):
+            calls.append((model, text, messages))
+            return 7
+
+        monkeypatch.setattr(litellm, "token_counter", counter)
+        llm_usage.token_count_cache_clear()
+        messages = [{"role": "system", "content": "be brief"}]
+
+        assert llm_usage.token_count_text("m", "hello") == 7
+        assert llm_usage.token_count_text("m", "hello") == 7
+        assert llm_usage.token_count_messages("m", messages) == 7
+        assert llm_usage.token_count_messages("m", list(messages)) == 7
+        assert len(calls) == 2
+
+        llm_usage.token_count_text("other", "hello")
+        assert len(calls) == 3
+        llm_usage.token_count_cache_clear()
+
+    def test_unserializable_messages_and_failures_not_cached(
+        self, monkeypatch
+    ):
+        import litellm
+
+        calls = []
+
+        def counter(model, text=None, messages=None):
+            calls.append(model)
+            if text == "bad":
+                raise RuntimeError("tokenizer down")
+            return 3
+
+        monkeypatch.setattr(litellm, "token_counter", counter)
+        llm_usage.token_count_cache_clear()
+        messages = [{"role": "user", "content": object()}]
+
+        assert llm_usage.token_count_messages("m", messages) == 3
+        assert llm_usage.token_count_messages("m", messages) == 3
+        assert llm_usage.token_count_text("m", "bad") == 0
+        assert llm_usage.token_count_text("m", "bad") == 0
+        assert len(calls) == 4
+        llm_usage.token_count_cache_clear()
+
+    def test_short_text_estimated_when_enabled(self, monkeypatch, settings):
+        import litellm
+
+        calls = []
+        monkeypatch.setattr(
+            litellm,
+            "token_counter",
+            lambda model, text=None: calls.append(text) or 9,
+        )
+        llm_usage.token_count_cache_clear()
+
+        settings.AGENTCORE_METERING_FAST_TOKEN_APPROX_CHARS = 16
+        assert llm_usage.token_count_text("m", "ok") == 1
+        assert llm_usage.token_count_text("m", "twelve chars") == 3
+        assert llm_usage.token_count_text("m", "x" * 17) == 9
+        assert calls == ["x" * 17]
+
+        settings.AGENTCORE_METERING_FAST_TOKEN_APPROX_CHARS = 0
+        assert llm_usage.token_count_text("m", "ok") == 9
+        llm_usage.token_count_cache_clear()
+
+
+@pytest.mark.unit
+def test_cache_hit_ratio_bounds():
+    from agentcore_metering.adapters.django.utils import _cache_hit_ratio
+
+    assert _cache_hit_ratio(0, 100) == 0
+    assert _cache_hit_ratio(5, 0) == 0
+    assert _cache_hit_ratio(25, 100) == Decimal("0.25")
+    assert _cache_hit_ratio(150, 100) == 1
+
+
+@pytest.mark.unit
+def test_norm_provider_strips_lowercases_and_defaults():
+    from agentcore_metering.adapters.django.utils import _norm_provider
+
+    assert _norm_provider("  Azure_OpenAI ") == "azure_openai"
+    assert _norm_provider("") == "openai"
+    assert _norm_provider(None) == "openai"
+    assert _norm_provider(None, default="gemini") == "gemini"
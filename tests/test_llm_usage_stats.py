@@ -1,7 +1,7 @@
 """
 Tests for usage_aggregation: _parse_date, get_summary_stats, by_model, series.
 """
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -15,8 +15,26 @@ from agentcore_metering.adapters.django.services.usage_aggregation import (
     get_summary_stats,
     get_time_series_stats,
     get_token_stats_from_query,
+    get_usage_stats_combined,
+)
+from agentcore_metering.adapters.django.services.usage_chart_series import (
+    aggregate_usage_to_series,
+    get_series_for_charts_with_fallback,
+)
+from agentcore_metering.adapters.django.models import (
+    LLMUsage,
+    LLMUsageSeries,
+    LLMUsageSeriesWatermark,
+)
+from agentcore_metering.adapters.django.tasks import aggregate as agg_task
+from agentcore_metering.adapters.django.tasks.aggregate import (
+    _granularity_runs,
+    _run_one_granularity,
+    aggregate_llm_usage_series_task,
+)
+from agentcore_metering.adapters.django.tasks.cleanup import (
+    cleanup_old_llm_usage_task,
 )
-from agentcore_metering.adapters.django.models import LLMUsage, LLMUsageSeries
 
 
 @pytest.mark.unit
@@ -37,6 +55,13 @@ class TestParseDate:
     def test_returns_none_for_invalid_string(self):
         assert _parse_date("not-a-date") is None
 
+    def test_returns_none_for_non_string(self):
+        assert _parse_date(["2025-02-01"]) is None
+
+    def test_repeated_value_returns_cached_result(self):
+        first = _parse_date("2025-02-01T12:00:00Z")
+        assert _parse_date("2025-02-01T12:00:00Z") is first
+
 
 @pytest.mark.unit
 class TestParseEndDate:
@@ -103,6 +128,15 @@ class TestGetSummaryStats:
         assert out["total_calls"] == 1
         assert out["total_tokens"] == 30
 
+    def test_counts_successful_and_failed_calls(self):
+        LLMUsage.objects.create(model="gpt-4", success=True)
+        LLMUsage.objects.create(model="gpt-4", success=True)
+        LLMUsage.objects.create(model="gpt-4", success=False)
+        out = get_summary_stats()
+        assert out["total_calls"] == 3
+        assert out["successful_calls"] == 2
+        assert out["failed_calls"] == 1
+
 
 @pytest.mark.unit
 @pytest.mark.django_db
@@ -120,6 +154,16 @@ class TestGetStatsByModel:
         assert by_model["gpt-4"]["total_calls"] == 2
         assert by_model["gpt-4"]["total_tokens"] == 18
 
+    def test_total_cost_is_float_and_zero_when_missing(self):
+        LLMUsage.objects.create(model="gpt-4", cost="0.250000")
+        LLMUsage.objects.create(model="gpt-4", cost="0.125000")
+        LLMUsage.objects.create(model="claude", cost=None)
+        by_model = {r["model"]: r for r in get_stats_by_model()}
+        assert isinstance(by_model["gpt-4"]["total_cost"], float)
+        assert by_model["gpt-4"]["total_cost"] == pytest.approx(0.375)
+        assert by_model["claude"]["total_cost"] == 0
+        assert by_model["claude"]["total_cost_currency"] == "USD"
+
 
 @pytest.mark.unit
 @pytest.mark.django_db
@@ -237,6 +281,19 @@ class TestGetTokenStatsFromQuery:
         assert sum(i["total_tokens"] for i in series) == 12
         assert sum(1 for i in series if i["total_tokens"] > 0) == 1
 
+    def test_expected_buckets_match_series_items(self):
+        out = get_token_stats_from_query({
+            "granularity": "Month",
+            "start_date": "2026-02-01",
+            "end_date": "2026-02-28",
+        })
+
+        assert out["series"]["granularity"] == "month"
+        assert len(out["expected_buckets"]) == 28
+        assert out["expected_buckets"] == [
+            i["bucket"] for i in out["series"]["items"]
+        ]
+
     def test_user_series_bypasses_global_preaggregated_rows(
         self,
         django_user_model,
@@ -344,3 +401,336 @@ class TestGetTokenStatsFromQuery:
 
         assert out["summary"]["total_calls"] == 0
         assert out["series_by_model"] == []
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestGetUsageStatsCombined:
+    @pytest.mark.parametrize("granularity", ["day", "month", "year"])
+    def test_matches_separate_queries(self, granularity):
+        rows = [("m1", 10, True, 7), ("m1", 5, False, 9), ("m2", 30, True, 9)]
+        for model, tokens, success, hour in rows:
+            usage = LLMUsage.objects.create(
+                model=model,
+                total_tokens=tokens,
+                success=success,
+                cost="0.1",
+            )
+            LLMUsage.objects.filter(id=usage.id).update(
+                created_at=django_tz.make_aware(
+                    datetime(2026, 2, 21, hour, 15, 0)
+                )
+            )
+        start = _parse_date("2026-02-21")
+        end = _parse_end_date("2026-02-21")
+
+        out = get_usage_stats_combined(
+            start_date=start, end_date=end, granularity=granularity
+        )
+
+        assert out["summary"] == get_summary_stats(start, end)
+        assert out["by_model"] == get_stats_by_model(start, end)
+        assert out["series"] == get_time_series_stats(
+            granularity, start_date=start, end_date=end
+        )
+
+    def test_series_is_none_without_granularity(self):
+        out = get_usage_stats_combined()
+        assert out["summary"]["total_calls"] == 0
+        assert out["by_model"] == []
+        assert out["series"] is None
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestAggregateUsageToSeries:
+    def test_groups_by_hour_and_model(self):
+        hour = django_tz.make_aware(datetime(2026, 2, 21, 7, 0, 0))
+        rows = [
+            ("m1", True, 10, "0.5", 7, 4),
+            ("m1", False, 20, None, 7, 8),
+            ("m2", True, 5, "0.25", 8, 2),
+        ]
+        for model, success, tokens, cost, hr, e2e in rows:
+            created = hour.replace(hour=hr, minute=30)
+            usage = LLMUsage.objects.create(
+                model=model,
+                success=success,
+                completion_tokens=tokens,
+                total_tokens=tokens,
+                cost=cost,
+                started_at=created - timedelta(seconds=e2e),
+            )
+            LLMUsage.objects.filter(id=usage.id).update(created_at=created)
+
+        n = aggregate_usage_to_series(
+            "hour",
+            start_date=hour,
+            end_date=hour.replace(hour=23),
+        )
+
+        assert n == 2
+        m1 = LLMUsageSeries.objects.get(model="m1")
+        assert m1.bucket == hour
+        assert m1.call_count == 2
+        assert m1.success_count == 1
+        assert m1.total_tokens == 30
+        assert float(m1.total_cost) == 0.5
+        assert m1.avg_e2e_latency_sec == 6
+        assert m1.avg_output_tps == 2.5
+        assert m1.avg_ttft_sec is None
+        m2 = LLMUsageSeries.objects.get(model="m2")
+        assert m2.bucket == hour.replace(hour=8)
+        assert m2.call_count == 1
+
+    def test_rerun_updates_existing_rows(self):
+        hour = django_tz.make_aware(datetime(2026, 2, 21, 7, 0, 0))
+        LLMUsageSeries.objects.create(
+            granularity=LLMUsageSeries.Granularity.HOUR,
+            bucket=hour,
+            model="m1",
+            call_count=99,
+            total_tokens=999,
+        )
+        usage = LLMUsage.objects.create(model="m1", total_tokens=7)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=hour.replace(minute=10)
+        )
+
+        aggregate_usage_to_series(
+            "hour", start_date=hour, end_date=hour.replace(minute=59)
+        )
+        aggregate_usage_to_series(
+            "hour", start_date=hour, end_date=hour.replace(minute=59)
+        )
+
+        row = LLMUsageSeries.objects.get()
+        assert row.call_count == 1
+        assert row.total_tokens == 7
+
+    def test_empty_and_unknown_models_share_one_series_row(self):
+        hour = django_tz.make_aware(datetime(2026, 2, 21, 7, 0, 0))
+        for model, tokens in (("", 3), ("unknown", 4)):
+            usage = LLMUsage.objects.create(model=model, total_tokens=tokens)
+            LLMUsage.objects.filter(id=usage.id).update(
+                created_at=hour.replace(minute=10)
+            )
+
+        n = aggregate_usage_to_series(
+            "hour", start_date=hour, end_date=hour.replace(minute=59)
+        )
+
+        assert n == 1
+        row = LLMUsageSeries.objects.get()
+        assert row.model == "unknown"
+        assert row.call_count == 2
+        assert row.total_tokens == 7
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestAggregationWatermark:
+    def test_default_run_records_watermark(self):
+        now = django_tz.make_aware(datetime(2026, 2, 21, 9, 20, 0))
+
+        _run_one_granularity("hour", now=now)
+
+        mark = LLMUsageSeriesWatermark.objects.get(granularity="hour")
+        assert mark.aggregated_until == now
+
+    def test_hour_run_starts_from_watermark_bucket(self):
+        now = django_tz.make_aware(datetime(2026, 2, 21, 9, 20, 0))
+        LLMUsageSeriesWatermark.objects.create(
+            granularity="hour", aggregated_until=now - timedelta(minutes=30)
+        )
+        # Inside the default 2h window but before the watermarked hour.
+        usage = LLMUsage.objects.create(model="m1", total_tokens=5)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=now.replace(hour=7, minute=40)
+        )
+
+        assert _run_one_granularity("hour", now=now) == 0
+        assert not LLMUsageSeries.objects.exists()
+
+    def test_day_run_skipped_once_window_is_final(self):
+        now = django_tz.make_aware(datetime(2026, 2, 21, 9, 20, 0))
+        LLMUsageSeriesWatermark.objects.create(
+            granularity="day", aggregated_until=now - timedelta(hours=1)
+        )
+
+        assert _run_one_granularity("day", now=now) == 0
+        mark = LLMUsageSeriesWatermark.objects.get(granularity="day")
+        assert mark.aggregated_until == now - timedelta(hours=1)
+
+    def test_day_window_reaggregated_within_write_horizon(self, settings):
+        settings.AGENTCORE_METERING_USAGE_BUFFER_MAX_AGE = 5
+        now = django_tz.make_aware(datetime(2026, 2, 21, 9, 20, 0))
+        _, end_dt = agg_task._default_range("day", now)
+        # The last run happened 20 minutes after the window closed; a retried
+        # save_llm_usage_task inserts a row from that window afterwards.
+        LLMUsageSeriesWatermark.objects.create(
+            granularity="day", aggregated_until=end_dt + timedelta(minutes=20)
+        )
+        usage = LLMUsage.objects.create(model="m1", total_tokens=5)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=end_dt - timedelta(minutes=5)
+        )
+
+        assert agg_task._watermark_overlap() >= timedelta(minutes=30)
+        assert _run_one_granularity("day", now=now) == 1
+        row = LLMUsageSeries.objects.get(granularity="day")
+        assert row.total_tokens == 5
+
+    def test_empty_range_skips_aggregation_but_advances_watermark(
+        self, monkeypatch
+    ):
+        now = django_tz.make_aware(datetime(2026, 2, 21, 9, 20, 0))
+
+        def fail(**kwargs):
+            raise AssertionError("aggregate_usage_to_series called")
+
+        monkeypatch.setattr(agg_task, "aggregate_usage_to_series", fail)
+
+        assert _run_one_granularity("hour", now=now) == 0
+        mark = LLMUsageSeriesWatermark.objects.get(granularity="hour")
+        assert mark.aggregated_until == now
+
+    def test_explicit_range_ignores_watermark(self):
+        hour = django_tz.make_aware(datetime(2026, 2, 21, 7, 0, 0))
+        usage = LLMUsage.objects.create(model="m1", total_tokens=5)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=hour.replace(minute=10)
+        )
+
+        n = _run_one_granularity(
+            "hour",
+            hour.isoformat(),
+            hour.replace(minute=59).isoformat(),
+        )
+
+        assert n == 1
+        assert not LLMUsageSeriesWatermark.objects.exists()
+
+
+@pytest.mark.unit
+class TestGranularityRuns:
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_runs_all_granularities_in_order(
+        self, settings, monkeypatch, parallel
+    ):
+        settings.AGENTCORE_METERING_PARALLEL_AGG = parallel
+        now = django_tz.now()
+        calls = []
+
+        def fake_run(granularity, now=None):
+            calls.append((granularity, now))
+            return len(granularity)
+
+        monkeypatch.setattr(agg_task, "_run_one_granularity", fake_run)
+
+        results = [(g, run()) for g, run in _granularity_runs(now)]
+
+        assert results == [("hour", 4), ("day", 3), ("month", 5)]
+        assert sorted(calls) == sorted(
+            [("hour", now), ("day", now), ("month", now)]
+        )
+
+    def test_parallel_error_propagates(self, settings, monkeypatch):
+        settings.AGENTCORE_METERING_PARALLEL_AGG = True
+
+        def fake_run(granularity, now=None):
+            if granularity == "day":
+                raise RuntimeError("boom")
+            return 1
+
+        monkeypatch.setattr(agg_task, "_run_one_granularity", fake_run)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            for _, run in _granularity_runs(django_tz.now()):
+                run()
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestTaskNoOpRuns:
+    def test_invalid_granularity_returns_before_task_registration(self):
+        # agentcore_task is not installed here; reaching the registration
+        # import would raise.
+        out = aggregate_llm_usage_series_task("week")
+
+        assert out == {"upserted": 0, "error": "invalid_granularity"}
+
+    def test_tasks_autoretry_only_transient_errors(self):
+        from django.db import OperationalError
+
+        for task in (
+            aggregate_llm_usage_series_task,
+            cleanup_old_llm_usage_task,
+        ):
+            assert OperationalError in task.autoretry_for
+            assert Exception not in task.autoretry_for
+            assert ValueError not in task.autoretry_for
+
+    def test_disabled_cleanup_returns_before_task_registration(
+        self, settings
+    ):
+        settings.AGENTCORE_METERING_CLEANUP_ENABLED = False
+
+        out = cleanup_old_llm_usage_task()
+
+        assert out["skipped"] is True
+        assert out["reason"] == "cleanup_disabled"
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestSeriesFallback:
+    def test_empty_range_skips_grouped_fallback(
+        self, django_assert_num_queries
+    ):
+        with django_assert_num_queries(2):
+            out = get_series_for_charts_with_fallback(
+                "day",
+                start_date=_parse_date("2026-02-21"),
+                end_date=_parse_end_date("2026-02-21"),
+            )
+        assert out == []
+
+    def test_falls_back_to_usage_when_series_missing(self):
+        usage = LLMUsage.objects.create(model="m1", total_tokens=4)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=django_tz.make_aware(datetime(2026, 2, 21, 7, 5, 0))
+        )
+        out = get_series_for_charts_with_fallback(
+            "day",
+            start_date=_parse_date("2026-02-21"),
+            end_date=_parse_end_date("2026-02-21"),
+        )
+        assert [r["total_tokens"] for r in out] == [4]
+
+
+@pytest.mark.unit
+@pytest.mark.django_db(transaction=True)
+class TestGetTokenStatsFromQueryParallel:
+    def test_parallel_flag_returns_same_payload(self, settings):
+        usage = LLMUsage.objects.create(model="m1", total_tokens=12)
+        LLMUsage.objects.filter(id=usage.id).update(
+            created_at=django_tz.make_aware(datetime(2026, 2, 21, 7, 45, 0))
+        )
+        params = {
+            "granularity": "day",
+            "start_date": "2026-02-21",
+            "end_date": "2026-02-21",
+        }
+        serial = get_token_stats_from_query(params)
+
+        settings.AGENTCORE_METERING_PARALLEL_AGG = True
+        parallel = get_token_stats_from_query(params)
+
+        assert parallel == serial
+        assert parallel["summary"]["total_tokens"] == 12
+
+    def test_parallel_flag_propagates_value_error(self, settings):
+        settings.AGENTCORE_METERING_PARALLEL_AGG = True
+        with pytest.raises(ValueError, match="Unsupported granularity"):
+            get_token_stats_from_query({"granularity": "bad"})
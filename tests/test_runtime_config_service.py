@@ -188,6 +188,64 @@ class TestRuntimeConfigService:
         msg = str(exc_info.value)
         assert "No LLM config" in msg or "admin" in msg.lower()
 
+    @override_settings(AGENTCORE_METERING_LLM_PARAMS_CACHE_TTL=60)
+    def test_get_litellm_params_cache_reuses_and_invalidates_on_save(self):
+        rc.clear_litellm_params_cache()
+        cfg = LLMConfig.objects.create(
+            scope=LLMConfig.Scope.GLOBAL,
+            user=None,
+            model_type=LLMConfig.MODEL_TYPE_LLM,
+            provider="openai",
+            config={"api_key": "key-1", "model": "gpt-4o-mini"},
+            is_active=True,
+        )
+        first = rc.get_litellm_params()
+        first["api_key"] = "mutated"
+
+        with patch.object(rc, "get_config_from_db") as mock_get:
+            cached = rc.get_litellm_params()
+        mock_get.assert_not_called()
+        assert cached["api_key"] == "key-1"
+
+        cfg.config = {"api_key": "key-2", "model": "gpt-4o-mini"}
+        cfg.save()
+        assert rc.get_litellm_params()["api_key"] == "key-2"
+        rc.clear_litellm_params_cache()
+
+    @override_settings(AGENTCORE_METERING_LLM_PARAMS_CACHE_TTL=60)
+    def test_user_config_change_only_drops_that_users_entries(
+        self, django_user_model
+    ):
+        rc.clear_litellm_params_cache()
+        user = django_user_model.objects.create_user(
+            username="u_cache", email="u_cache@example.com", password="pass"
+        )
+        LLMConfig.objects.create(
+            scope=LLMConfig.Scope.GLOBAL,
+            user=None,
+            model_type=LLMConfig.MODEL_TYPE_LLM,
+            provider="openai",
+            config={"api_key": "global-key", "model": "gpt-4o-mini"},
+            is_active=True,
+        )
+        rc.get_litellm_params()
+        rc.get_litellm_params(user_id=user.id)
+
+        LLMConfig.objects.create(
+            scope=LLMConfig.Scope.USER,
+            user=user,
+            model_type=LLMConfig.MODEL_TYPE_LLM,
+            provider="openai",
+            config={"api_key": "user-key", "model": "gpt-4o-mini"},
+            is_active=True,
+        )
+
+        assert rc.get_litellm_params(user_id=user.id)["api_key"] == "user-key"
+        with patch.object(rc, "get_config_from_db") as mock_get:
+            assert rc.get_litellm_params()["api_key"] == "global-key"
+        mock_get.assert_not_called()
+        rc.clear_litellm_params_cache()
+
     def test_build_litellm_params_preserves_explicit_zero_values(self):
         params = rc.build_litellm_params_from_config(
             "openai",